@@ -1,216 +1,444 @@
 import tkinter as tk
-from tkinter import colorchooser, messagebox, ttk
-from tkcalendar import Calendar
-import webbrowser
+from tkinter import colorchooser, filedialog, messagebox, ttk
+import calendar
+import contextlib
+import datetime
+import importlib
+import os
 import random
-import json, os
-import requests
-
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib.pyplot as plt
+import threading
+from model import Autosave, Event, Film, Link, Stat, Task, open_model
+from profiling import LagMonitor, Profiler
+from theme import Theme
+from title_index import TitleIndex
+from widgets import ViewCache, VirtualList
+
+# Modules lourds (matplotlib, tkcalendar, requests) : importés à la première
+# ouverture de Films, Statistiques ou Agenda, ou en arrière-plan après le
+# premier affichage (désactivable avec APPERSO_PRELOAD=0)
+HEAVY_MODULES = ("charts", "linkcheck", "matplotlib.backends.backend_tkagg", "model.series", "posters",
+                 "tkcalendar", "tmdb")
+
+# Listes affichées par chaque section : la vue en cache est rafraîchie si
+# l'une d'elles a changé pendant qu'elle était cachée
+SECTION_STORES = {
+    "Agenda": ("agenda_events", "recurring_events"),
+    "Liens": ("web_links",),
+    "Films": ("films",),
+    "Statistiques": ("stats",),
+}
+# Liste -> section qui l'affiche (la to-do est sur l'accueil)
+STORE_SECTIONS = {store: name for name, stores in SECTION_STORES.items() for store in stores}
+
+
+# Choix de répétition proposés par l'agenda -> règle du modèle (model/agenda.py)
+REPEAT_CHOICES = {
+    "Une fois": "",
+    "Chaque jour": "daily",
+    "Chaque semaine": "weekly",
+    "Chaque mois": "monthly",
+    "Chaque année": "yearly",
+}
+
+
+# Chemins chronométrés quand les mesures sont actives (APPERSO_PROFILE=1 ou panneau F12)
+PROFILED = (
+    "load_data", "apply_theme", "show_home", "show_section",
+    "render_todo", "render_films", "render_links", "render_stats",
+    "update_film_stats", "update_stats_chart", "update_stats_series", "agenda_mark_month",
+)
+# Sauvegarde auto : préparation sur le thread Tk, écriture sur le sien
+AUTOSAVE_PROFILED = ("checkpoint", "write")
+
+
+# Graphiques dessinés dans le thread Tk (par défaut) ou en PNG dans un
+# processus à part, avec cache des images (APPERSO_CHARTS=process)
+CHARTS_IN_PROCESS = os.environ.get("APPERSO_CHARTS") == "process"
+
+
+# Vues du graphique des statistiques -> période de la courbe (None : camembert du mois)
+STATS_VIEWS = {
+    "Mois en cours": None,
+    "Par couleur": "color",
+    "Par jour": "day",
+    "Par semaine": "week",
+    "Par mois": "month",
+}
+
+
+# Taille des vignettes d'affiche (posters.py) ; les films sans affiche
+# gardent une image vide de cette taille, sans rien charger
+POSTER_SIZE = (32, 48)
+
+
+# Profils (--profile NOM) : un dossier chacun, un fichier par section lu
+# à la première ouverture de la section (model.ShardedStorage)
+PROFILES_DIR = "profiles"
+
+
+# Exports proposés dans les paramètres -> (extension, liste exportée en CSV)
+EXPORTS = {
+    "Tout (JSON Lines)": (".jsonl", None),
+    "Films (CSV)": (".csv", "films"),
+    "Statistiques (CSV)": (".csv", "stats"),
+    "Agenda (ICS)": (".ics", None),
+}
 
 
 class PersonalApp(tk.Tk):
-    def __init__(self, username="Utilisateur"):
+    def __init__(self, username="Utilisateur", storage_path="app_data.db", sharded=False):
         super().__init__()
 
+        # Mesures désactivées par défaut : sans elles, rien n'est chronométré
+        self.profiler = Profiler()
+        self.lag_monitor = LagMonitor(self, self.profiler)
+        self.debug_panel = None
+        self.autosave = None  # créée avec le modèle, plus bas
+        if os.environ.get("APPERSO_PROFILE") == "1":
+            self.set_profiling(True)
+        self.bind_all("<F12>", self.open_debug_panel)
+
         # Configurable state
         self.username = username
         self.primary_color = "#0b2545"
         self.bg_color = "#ffffff"
 
+        # Données : listes typées todo, agenda, links, stats, films ; voir model/
+        self.model = open_model(storage_path, sharded)
+        self.load_data()
+
+        # Couleurs par rôle : un changement ne touche que les widgets abonnés
+        self.theme = Theme(background=self.bg_color, primary=self.primary_color, text="black")
+
         # Window config
         self.title("Application personnelle")
         self.geometry("900x700")
         self.minsize(700, 600)
+        self.theme.bind(self, bg="background")
 
         # Main container
-        self.main_frame = tk.Frame(self, bg=self.bg_color)
+        self.main_frame = self.theme.bind(tk.Frame(self), bg="background")
         self.main_frame.pack(fill="both", expand=True)
 
         # Settings button
-        self.settings_btn = tk.Button(self, text="⚙",
-                                      font=("Helvetica Neue", 14, "bold"),
-                                      bg=self.bg_color, bd=0,
-                                      command=self.open_settings,
-                                      relief="flat", padx=6, pady=4)
+        self.settings_btn = self.theme.bind(
+            tk.Button(self, text="⚙", font=("Helvetica Neue", 14, "bold"), bd=0,
+                      command=self.open_settings, relief="flat", padx=6, pady=4),
+            bg="background")
         self.settings_btn.place(relx=0.97, rely=0.05, anchor="ne")
 
-        # Data stores
-        self.todo_tasks = []
-        self.agenda_events = {}
-        self.web_links = []
-        self.stats = []
-        self.films = []  # liste de dicts {"title":..., "status":...}
-
-        # Charger les données sauvegardées
-        self.load_data()
-
-        # Sauvegarde auto à la fermeture
+        # Écrans construits gardés en vie entre deux navigations ; chaque
+        # section y enregistre de quoi montrer un élément (recherche globale)
+        self.views = ViewCache(self.main_frame, self.model.version)
+        self.reveal = {}
+        self._index_id = None  # construction de l'index de recherche en cours
+
+        # Lots de modifications (batch) : l'affichage n'est rafraîchi
+        # qu'une fois, au prochain moment libre
+        self._batching = 0
+        self._refresh_id = None
+        self.import_job = None  # import en cours, fermé à la sortie
+        self.film_selection = set()  # films cochés
+        self.stat_selection = set()  # statistiques cochées
+
+        # Recherche de films (TMDb) hors du thread Tk, index local des titres
+        self._tmdb = None
+        self._posters = None  # vignettes des affiches, chargées pour les lignes visibles
+        self.no_poster = tk.PhotoImage(master=self, width=POSTER_SIZE[0], height=POSTER_SIZE[1])
+        data_dir = storage_path if sharded else os.path.dirname(storage_path)
+        self.title_index = TitleIndex(
+            os.path.join(data_dir, "film_titles.idx"), seed=lambda: [f.title for _, f in self.model.films.items()])
+
+        self._chart_renderer = None
+
+        # Vérification des liens en parallèle : dernier état connu par URL
+        self._link_checker = None
+        self.link_status = {}
+
+        # Sauvegarde auto : quelques secondes sans modification, le journal
+        # est mis sur disque (l'instantané à la compaction), sur un thread à part
+        self.autosave = Autosave(self.model.storage, self.after, self.after_cancel)
+        if self.profiler.enabled:
+            self.set_profiling(True)  # la sauvegarde auto est chronométrée à son tour
         self.protocol("WM_DELETE_WINDOW", self.on_close)
 
         # Build UI
         self.show_home()
+        if os.environ.get("APPERSO_PRELOAD", "1") != "0":
+            self.after(300, self.preload_modules)
+
+    def preload_modules(self):
+        def worker():
+            for name in HEAVY_MODULES:
+                try:
+                    importlib.import_module(name)
+                except ImportError:
+                    pass
+        threading.Thread(target=worker, name="preload", daemon=True).start()
+
+    def build_search_index(self, event=None):
+        # Index de la recherche globale construit par tranches, entre deux
+        # évènements, à partir du moment où le champ de recherche a le focus :
+        # il lit toutes les sections. Une recherche lancée avant la fin le
+        # termine d'un coup
+        if event is not None and self._index_id is not None:
+            return
+        self._index_id = None
+        if not self.model.index.ready and next(self.model.index_steps(), True) is None:
+            self._index_id = self.after(1, self.build_search_index)
+
+    @property
+    def chart_renderer(self):
+        if self._chart_renderer is None:
+            from charts import ChartRenderer
+            self._chart_renderer = ChartRenderer()
+        return self._chart_renderer
+
+    @property
+    def link_checker(self):
+        if self._link_checker is None:
+            from linkcheck import LinkChecker
+            self._link_checker = LinkChecker()
+        return self._link_checker
+
+    @property
+    def posters(self):
+        if self._posters is None:
+            from posters import PosterCache, PosterFetcher
+            self._posters = PosterCache(self, PosterFetcher(thumb=POSTER_SIZE))
+        return self._posters
+
+    @property
+    def tmdb(self):
+        if self._tmdb is None:
+            from tmdb import TmdbClient
+            self._tmdb = TmdbClient()
+        return self._tmdb
 
     # ---------- Persistance ----------
-    def save_data(self):
-        data = {
-            "todo_tasks": self.todo_tasks,
-            "agenda_events": self.agenda_events,
-            "web_links": self.web_links,
-            "stats": self.stats,
-            "films": self.films,
+    def load_data(self):
+        settings = self.model.load({
             "username": self.username,
             "primary_color": self.primary_color,
             "bg_color": self.bg_color,
-        }
-        with open("app_data.json", "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-
-    def load_data(self):
-        if os.path.exists("app_data.json"):
-            with open("app_data.json", "r", encoding="utf-8") as f:
-                data = json.load(f)
-                self.todo_tasks = data.get("todo_tasks", [])
-                self.agenda_events = data.get("agenda_events", {})
-                self.web_links = data.get("web_links", [])
-                self.stats = data.get("stats", [])
-                self.films = data.get("films", [])
-                self.username = data.get("username", self.username)
-                self.primary_color = data.get("primary_color", self.primary_color)
-                self.bg_color = data.get("bg_color", self.bg_color)
+        })
+        self.username = settings["username"]
+        self.primary_color = settings["primary_color"]
+        self.bg_color = settings["bg_color"]
+
+    # ---------- Lots de modifications ----------
+    @contextlib.contextmanager
+    def batch(self):
+        """Lot de modifications : une transaction du modèle. Dans un lot, les
+        méthodes d'ajout, de modification et de suppression ne touchent pas
+        l'affichage ; les listes changées sont notées par leur version, et la
+        vue affichée est rafraîchie une seule fois après le lot (after_idle)."""
+        self._batching += 1
+        try:
+            with self.model.batch():
+                yield
+        finally:
+            self._batching -= 1
+            if not self._batching:
+                self.schedule_refresh()
+
+    def schedule_refresh(self):
+        # La vue affichée est rafraîchie au prochain moment libre, une fois
+        if self._refresh_id is None:
+            self._refresh_id = self.after_idle(self.refresh_views)
+
+    def refresh_views(self):
+        # Aussi appelé avant de changer d'écran, pour ne pas quitter une vue pas à jour
+        if self._refresh_id is not None:
+            self.after_cancel(self._refresh_id)
+            self._refresh_id = None
+            self.views.refresh()
 
     def on_close(self):
-        self.save_data()
+        # Les tranches déjà importées sont validées ; le reste du fichier est abandonné
+        if self.import_job is not None:
+            self.import_job.close()
+        if self._tmdb is not None:
+            self._tmdb.close()
+        if self._posters is not None:
+            self._posters.close()
+        if self._link_checker is not None:
+            self._link_checker.close()
+        if self._chart_renderer is not None:
+            self._chart_renderer.close()
+        self.title_index.save()
+        self.title_index.close()
+        # Seul ce qui a changé depuis le dernier instantané reste, déjà dans le journal
+        self.autosave.close()
+        self.model.close()
         self.destroy()
 
     # ---------- Films ----------
-    def render_films(self, container, stats_label, chart_container):
-        for widget in container.winfo_children():
-            widget.destroy()
-
-        for idx, film in enumerate(self.films):
-            row = tk.Frame(container, bg="white")
-            row.pack(fill="x", pady=2)
-
-            title_label = tk.Label(row, text=film["title"], font=("Helvetica Neue", 14), bg="white")
-            title_label.pack(side="left", padx=5)
-
-            status_var = tk.StringVar(value=film.get("status", "Neutre"))
-            combo = ttk.Combobox(row, textvariable=status_var,
-                                 values=["Bien", "Mauvais", "Neutre"], state="readonly", width=10)
-            combo.pack(side="left", padx=10)
-
-            def update_status(event=None, i=idx, var=status_var):
-                self.films[i]["status"] = var.get()
-                self.update_film_stats(stats_label, chart_container)
-            combo.bind("<<ComboboxSelected>>", update_status)
-
-            del_btn = tk.Button(row, text="Supprimer",
-                                command=lambda i=idx: self.delete_film(i, container, stats_label, chart_container),
-                                relief="flat", bg="#e74c3c", fg="white")
-            del_btn.pack(side="right", padx=5)
+    def make_film_row(self, parent, film_list, stats_label, film_chart):
+        row = tk.Frame(parent, bg="white")
+
+        row.selected_var = tk.BooleanVar()
+        tk.Checkbutton(row, variable=row.selected_var, bg="white",
+                       command=lambda: self.select_film(row.key, row.selected_var.get())).pack(side="left")
+        row.poster_label = tk.Label(row, bg="white")
+        row.poster_label.pack(side="left", padx=(0, 5))
+
+        row.title_label = tk.Label(row, font=("Helvetica Neue", 14), bg="white")
+        row.title_label.pack(side="left", padx=5)
+
+        row.status_var = tk.StringVar()
+        combo = ttk.Combobox(row, textvariable=row.status_var,
+                             values=["Bien", "Mauvais", "Neutre"], state="readonly", width=10)
+        combo.pack(side="left", padx=10)
+
+        def update_status(event=None):
+            film = self.model.films.get(row.key).replace(status=row.status_var.get())
+            self.model.films.update(row.key, film)
+            film_list.update(row.key, film)
+            self.views.mark_fresh("films")
+            self.update_film_stats(stats_label, film_chart)
+        combo.bind("<<ComboboxSelected>>", update_status)
+
+        del_btn = tk.Button(row, text="Supprimer",
+                            command=lambda: self.delete_film(row.key, film_list, stats_label, film_chart),
+                            relief="flat", bg="#e74c3c", fg="white")
+        del_btn.pack(side="right", padx=5)
+        return row
+
+    def fill_film_row(self, row, key, film):
+        row.selected_var.set(key in self.film_selection)
+        row.title_label.config(text=film.title)
+        row.status_var.set(film.status)
+        # Appelé pour les seules lignes visibles : les affiches des autres
+        # films ne sont pas chargées, et sans affiche rien n'est créé
+        if not film.poster:
+            row.poster_label.config(image=self.no_poster)
+            return
+        image = self.posters.get(film.poster)
+        row.poster_label.config(image=image or self.no_poster)
+        if image is None:
+            self.posters.request(film.poster, lambda image: self.show_poster(row, film.poster, image))
+
+    def show_poster(self, row, path, image):
+        # La ligne a pu être recyclée pour un autre film pendant le chargement
+        if getattr(row.value, "poster", None) == path:
+            row.poster_label.config(image=image)
+
+    def select_film(self, key, selected):
+        if selected:
+            self.film_selection.add(key)
+        else:
+            self.film_selection.discard(key)
 
-        self.update_film_stats(stats_label, chart_container)
+    def render_films(self, film_list, stats_label, film_chart):
+        film_list.set_items(self.model.films.items())
+        self.update_film_stats(stats_label, film_chart)
 
-    def add_film(self, title_entry, container, stats_label, chart_container):
+    def add_film(self, title_entry, film_list, stats_label, film_chart):
         title = title_entry.get().strip()
         if not title:
             return
-        self.films.append({"title": title, "status": "Neutre"})
+        # Id et affiche TMDb si le titre vient d'une suggestion
+        movie = self.tmdb.movie(title)
+        film = Film(title, tmdb_id=movie[0], poster=movie[1]) if movie else Film(title)
+        key = self.model.films.add(film)
+        self.title_index.add(title)
         title_entry.delete(0, tk.END)
-        self.render_films(container, stats_label, chart_container)
-
-    def delete_film(self, index, container, stats_label, chart_container):
-        self.films.pop(index)
-        self.render_films(container, stats_label, chart_container)
+        if not self._batching:
+            film_list.insert(key, film)
+            self.views.mark_fresh("films")
+            self.update_film_stats(stats_label, film_chart)
+
+    def delete_film(self, key, film_list, stats_label, film_chart):
+        self.model.films.delete(key)
+        self.film_selection.discard(key)
+        if not self._batching:
+            film_list.remove(key)
+            self.views.mark_fresh("films")
+            self.update_film_stats(stats_label, film_chart)
+
+    def delete_selected_films(self, film_list, stats_label, film_chart):
+        with self.batch():
+            for key in list(self.film_selection):
+                self.delete_film(key, film_list, stats_label, film_chart)
 
     def search_movies(self, query):
-        api_key = "..."  # <-- mets ici ta clé TMDb
-        url = "https://api.themoviedb.org/3/search/movie"
-        params = {"api_key": api_key, "query": query, "language": "fr-FR"}
-        try:
-            r = requests.get(url, params=params)
-            if r.status_code == 200:
-                data = r.json()
-                return [m["title"] for m in data.get("results", [])]
-            else:
-                return []
-        except Exception:
-            return []
-
-    def update_film_stats(self, stats_label, chart_container):
-        total = len(self.films)
-        bien = sum(1 for f in self.films if f["status"] == "Bien")
-        mauvais = sum(1 for f in self.films if f["status"] == "Mauvais")
-        neutre = sum(1 for f in self.films if f["status"] == "Neutre")
+        # Bloquant : appelé depuis le pool de self.tmdb
+        titles = self.tmdb.search(query)
+        self.title_index.add(*titles)
+        return titles
+
+    def suggest_movies(self, query, remote=()):
+        # Titres TMDb d'abord, puis ceux de l'index local
+        local = self.title_index.search(query)
+        return list(remote) + [t for t in local if t not in remote]
+
+    def update_film_stats(self, stats_label, film_chart):
+        # Compteurs tenus à jour par le modèle : rien n'est reparcouru
+        counts = self.model.film_status.counts
+        total = self.model.film_status.count
+        bien = counts.get("Bien", 0)
+        mauvais = counts.get("Mauvais", 0)
+        neutre = counts.get("Neutre", 0)
         stats_label.config(text=f"Total: {total} | Bien: {bien} | Mauvais: {mauvais} | Neutres: {neutre}")
 
         # --- Graphe ---
-        for child in chart_container.winfo_children():
-            child.destroy()
-
-        fig = plt.Figure(figsize=(4, 3), dpi=100)
-        ax = fig.add_subplot(111)
-
-        if total > 0:
-            sizes = [bien, mauvais, neutre]
-            labels = ["Bien", "Mauvais", "Neutre"]
-            colors = ["#2ecc71", "#e74c3c", "#95a5a6"]
-            ax.pie(sizes, labels=labels, colors=colors, autopct="%1.0f%%", startangle=90)
-            ax.axis('equal')
-        else:
-            ax.text(0.5, 0.5, 'Aucun film', horizontalalignment='center', verticalalignment='center')
-            ax.axis('off')
-
-        canvas = FigureCanvasTkAgg(fig, master=chart_container)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True)
+        film_chart.update([bien, mauvais, neutre], ["#2ecc71", "#e74c3c", "#95a5a6"],
+                          labels=["Bien", "Mauvais", "Neutre"])
 
     # ---------- Core ----------
-    def clear_main(self):
-        for widget in self.main_frame.winfo_children():
-            widget.destroy()
-
     def show_home(self):
-        self.clear_main()
-        self.main_frame.configure(bg=self.bg_color)
+        self.refresh_views()
+        self.views.show("home", self.build_home, deps=("todo_tasks", "settings"))
 
-        top_frame = tk.Frame(self.main_frame, bg=self.bg_color)
+    def build_home(self, view):
+        theme = self.theme
+        theme.bind(view, bg="background")
+        top_frame = theme.bind(tk.Frame(view), bg="background")
         top_frame.pack(fill="x", padx=20, pady=10)
 
-        greeting = tk.Label(top_frame, text=f"Bonjour {self.username}",
-                            font=("Helvetica Neue", 20, "bold"),
-                            bg=self.bg_color, fg="black")
+        greeting = theme.bind(tk.Label(top_frame, text=f"Bonjour {self.username}",
+                                       font=("Helvetica Neue", 20, "bold")),
+                              bg="background", fg="text")
         greeting.pack(side="left", anchor="n", padx=5)
 
-        todo_frame = tk.LabelFrame(self.main_frame, text="To-do-list",
-                                   font=("Helvetica Neue", 16, "bold"),
-                                   bg=self.bg_color, fg=self.primary_color,
-                                   bd=2, relief="groove", padx=10, pady=10)
+        self.build_search(view)
+
+        todo_frame = theme.bind(tk.LabelFrame(view, text="To-do-list",
+                                              font=("Helvetica Neue", 16, "bold"),
+                                              bd=2, relief="groove", padx=10, pady=10),
+                                bg="background", fg="primary")
         todo_frame.pack(fill="both", padx=20, pady=10, expand=True)
 
-        self.todo_container = tk.Frame(todo_frame, bg="white")
-        self.todo_container.pack(fill="both", expand=True)
+        self.todo_list = VirtualList(todo_frame, self.make_todo_row, self.fill_todo_row)
+        self.todo_list.pack(fill="both", expand=True)
         self.render_todo()
 
-        modify_frame = tk.LabelFrame(self.main_frame, text="Modifier To-do-list",
-                                     font=("Helvetica Neue", 14, "bold"),
-                                     bg=self.bg_color, fg=self.primary_color,
-                                     bd=2, relief="groove", padx=10, pady=10)
+        modify_frame = theme.bind(tk.LabelFrame(view, text="Modifier To-do-list",
+                                                font=("Helvetica Neue", 14, "bold"),
+                                                bd=2, relief="groove", padx=10, pady=10),
+                                  bg="background", fg="primary")
         modify_frame.pack(fill="x", padx=20, pady=10)
 
         self.modify_entry = tk.Entry(modify_frame, font=("Helvetica Neue", 12))
         self.modify_entry.pack(side="left", fill="x", expand=True, padx=5, pady=5)
 
-        save_btn = tk.Button(modify_frame, text="Ajouter",
-                             command=self.add_task,
-                             bg=self.primary_color, fg="white",
-                             font=("Helvetica Neue", 12, "bold"),
-                             relief="flat", bd=0, padx=10, pady=5)
+        save_btn = theme.bind(tk.Button(modify_frame, text="Ajouter",
+                                        command=self.add_task, fg="white",
+                                        font=("Helvetica Neue", 12, "bold"),
+                                        relief="flat", bd=0, padx=10, pady=5),
+                              bg="primary")
         save_btn.pack(side="right", padx=5)
 
-        sections_frame = tk.Frame(self.main_frame, bg=self.bg_color)
+        bulk_frame = theme.bind(tk.Frame(todo_frame), bg="background")
+        bulk_frame.pack(fill="x", pady=(5, 0))
+        theme.bind(tk.Button(bulk_frame, text="Tout valider", command=self.complete_all_tasks,
+                             fg="white", relief="flat", bd=0, padx=10, pady=3),
+                   bg="primary").pack(side="left", padx=(0, 5))
+        tk.Button(bulk_frame, text="Effacer les tâches validées", command=self.clear_completed_tasks,
+                  relief="flat", bd=0, padx=10, pady=3, bg="#e74c3c", fg="white").pack(side="left")
+
+        sections_frame = theme.bind(tk.Frame(view), bg="background")
         sections_frame.pack(fill="both", expand=True, padx=20, pady=20)
 
         sections = [
@@ -221,12 +449,11 @@ class PersonalApp(tk.Tk):
         ]
 
         for i, (label, target) in enumerate(sections):
-            btn = tk.Button(sections_frame, text=label,
-                            command=lambda t=target: self.show_section(t),
-                            bg=self.primary_color, fg="white",
-                            font=("Helvetica Neue", 14, "bold"),
-                            relief="flat", bd=0,
-                            padx=20, pady=20)
+            btn = theme.bind(tk.Button(sections_frame, text=label,
+                                       command=lambda t=target: self.show_section(t),
+                                       fg="white", font=("Helvetica Neue", 14, "bold"),
+                                       relief="flat", bd=0, padx=20, pady=20),
+                             bg="primary")
             btn.grid(row=i // 2, column=i % 2, padx=15, pady=15, sticky="nsew")
 
         for col in range(2):
@@ -234,250 +461,504 @@ class PersonalApp(tk.Tk):
         for row in range(2):
             sections_frame.grid_rowconfigure(row, weight=1)
 
-        self.apply_theme()
+        def refresh():
+            greeting.config(text=f"Bonjour {self.username}")
+            self.render_todo()
+        return refresh
+
+    # ---------- Recherche ----------
+    def build_search(self, view):
+        search_frame = self.theme.bind(tk.Frame(view), bg="background")
+        search_frame.pack(fill="x", padx=20)
+        self.theme.bind(tk.Label(search_frame, text="Rechercher :", font=("Helvetica Neue", 12)),
+                        bg="background", fg="text").pack(side="left", padx=5)
+        entry = tk.Entry(search_frame, font=("Helvetica Neue", 12))
+        entry.pack(side="left", fill="x", expand=True, padx=5)
+        results = tk.Listbox(view, font=("Helvetica Neue", 12), height=6)
+        hits = []
+
+        def on_type(event):
+            if event.keysym in ("Up", "Down", "Left", "Right", "Return", "Escape", "Tab"):
+                return
+            hits[:] = self.model.search(entry.get()) if entry.get().strip() else []
+            results.delete(0, tk.END)
+            for hit in hits:
+                section = STORE_SECTIONS.get(hit.store, "To-do")
+                label = f"{hit.key}  {hit.label}" if hit.store == "agenda_events" else hit.label
+                results.insert(tk.END, f"{section} · {label}")
+            if hits:
+                results.pack(fill="x", padx=25, pady=(2, 0), after=search_frame)
+            else:
+                results.pack_forget()
+
+        def open_hit(event=None):
+            sel = results.curselection()
+            if hits:
+                self.open_search_hit(hits[sel[0] if sel else 0])
+
+        entry.bind("<FocusIn>", self.build_search_index)
+        entry.bind("<KeyRelease>", on_type)
+        entry.bind("<Return>", open_hit)
+        entry.bind("<Down>", lambda e: (results.focus_set(), results.selection_set(0)))
+        results.bind("<Return>", open_hit)
+        results.bind("<Double-Button-1>", open_hit)
+
+    def open_search_hit(self, hit):
+        section = STORE_SECTIONS.get(hit.store)
+        if section is None:
+            self.show_home()
+            self.todo_list.see(hit.key)
+            return
+        self.show_section(section)
+        self.reveal[section](hit.store, hit.key)
 
     # ---------- To-do ----------
+    def make_todo_row(self, parent):
+        row = tk.Frame(parent, bg="white", padx=5)
+        row.status_label = tk.Label(row, font=("Helvetica Neue", 14), bg="white")
+        row.status_label.pack(side="left", padx=5)
+        row.text_label = tk.Label(row, font=("Helvetica Neue", 14), bg="white", anchor="w")
+        row.text_label.pack(side="left", fill="x", expand=True, padx=5)
+        check_btn = self.theme.bind(tk.Button(row, text="Valider",
+                                              command=lambda: self.update_task(row.key, "✅"),
+                                              relief="flat", fg="white"),
+                                    bg="primary")
+        check_btn.pack(side="right", padx=2)
+        cross_btn = self.theme.bind(tk.Button(row, text="Refuser",
+                                              command=lambda: self.update_task(row.key, "❌"),
+                                              relief="flat", fg="white"),
+                                    bg="primary")
+        cross_btn.pack(side="right", padx=2)
+        del_btn = tk.Button(row, text="Supprimer",
+                            command=lambda: self.delete_task(row.key),
+                            relief="flat", bg="#e74c3c", fg="white")
+        del_btn.pack(side="right", padx=8)
+        return row
+
+    def fill_todo_row(self, row, key, task):
+        row.status_label.config(text=task.status)
+        row.text_label.config(text=task.text)
+
     def render_todo(self):
-        for widget in self.todo_container.winfo_children():
-            widget.destroy()
-        for idx, (task, status) in enumerate(self.todo_tasks):
-            row = tk.Frame(self.todo_container, bg="white")
-            row.pack(fill="x", padx=5, pady=2)
-            status_label = tk.Label(row, text=status, font=("Helvetica Neue", 14), bg="white")
-            status_label.pack(side="left", padx=5)
-            text_label = tk.Label(row, text=task, font=("Helvetica Neue", 14), bg="white", anchor="w")
-            text_label.pack(side="left", fill="x", expand=True, padx=5)
-            check_btn = tk.Button(row, text="Valider",
-                                  command=lambda i=idx: self.update_task(i, "✅"),
-                                  relief="flat", bg=self.primary_color, fg="white")
-            check_btn.pack(side="right", padx=2)
-            cross_btn = tk.Button(row, text="Refuser",
-                                  command=lambda i=idx: self.update_task(i, "❌"),
-                                  relief="flat", bg=self.primary_color, fg="white")
-            cross_btn.pack(side="right", padx=2)
-            del_btn = tk.Button(row, text="Supprimer",
-                                command=lambda i=idx: self.delete_task(i),
-                                relief="flat", bg="#e74c3c", fg="white")
-            del_btn.pack(side="right", padx=8)
+        self.todo_list.set_items(self.model.todo.items())
 
     def add_task(self):
         text = self.modify_entry.get().strip()
         if not text:
             return
-        self.todo_tasks.append((text, ""))
+        task = Task(text)
+        key = self.model.todo.add(task)
         self.modify_entry.delete(0, tk.END)
-        self.render_todo()
-
-    def update_task(self, index, status):
-        task, _ = self.todo_tasks[index]
-        self.todo_tasks[index] = (task, status)
-        self.render_todo()
-
-    def delete_task(self, index):
-        self.todo_tasks.pop(index)
-        self.render_todo()
+        if not self._batching:
+            self.todo_list.insert(key, task)
+            self.views.mark_fresh("todo_tasks")
+
+    def update_task(self, key, status):
+        task = self.model.todo.get(key).replace(status=status)
+        self.model.todo.update(key, task)
+        if not self._batching:
+            self.todo_list.update(key, task)
+            self.views.mark_fresh("todo_tasks")
+
+    def delete_task(self, key):
+        self.model.todo.delete(key)
+        if not self._batching:
+            self.todo_list.remove(key)
+            self.views.mark_fresh("todo_tasks")
+
+    def complete_all_tasks(self):
+        with self.batch():
+            for key, task in self.model.todo.items():
+                if task.status != "✅":
+                    self.update_task(key, "✅")
+
+    def clear_completed_tasks(self):
+        with self.batch():
+            for key, _ in self.model.todo.with_status("✅"):
+                self.delete_task(key)
 
     # ---------- Agenda ----------
-    def agenda_add_event(self, date, entry, listbox):
+    def agenda_add_event(self, date, entry, repeat, on_change):
         text = entry.get().strip()
         if not text:
             return
-        self.agenda_events.setdefault(date, []).append(text)
+        self.model.agenda.add(Event(date, text), repeat)
         entry.delete(0, tk.END)
-        self.agenda_refresh_list(date, listbox)
+        if not self._batching:
+            on_change()
+            self.views.mark_fresh("agenda_events", "recurring_events")
 
-    def agenda_delete_event(self, date, listbox):
+    def agenda_delete_event(self, date, listbox, on_change):
         sel = listbox.curselection()
         if not sel:
             return
         idx = sel[0]
-        self.agenda_events[date].pop(idx)
-        self.agenda_refresh_list(date, listbox)
+        # Une occurrence d'un récurrent : c'est toute la règle qui serait supprimée
+        if self.model.agenda.is_recurring(date, idx) and not messagebox.askyesno(
+                "Supprimer évènement", "Cet évènement se répète : supprimer toutes ses occurrences, "
+                                       "passées et à venir ?"):
+            return
+        self.model.agenda.delete(date, idx)
+        if not self._batching:
+            on_change()
+            self.views.mark_fresh("agenda_events", "recurring_events")
 
     def agenda_refresh_list(self, date, listbox):
         listbox.delete(0, tk.END)
-        for ev in self.agenda_events.get(date, []):
-            listbox.insert(tk.END, ev)
+        for ev in self.model.agenda.on(date):
+            listbox.insert(tk.END, ev.text)
+
+    def agenda_refresh_upcoming(self, listbox):
+        listbox.delete(0, tk.END)
+        for ev in self.model.agenda.upcoming(7):
+            listbox.insert(tk.END, f"{ev.date}  {ev.text}")
+
+    def agenda_mark_month(self, cal):
+        # Seul le mois affiché est calculé ; les marques sont refaites à
+        # chaque changement de mois
+        cal.calevent_remove("all")
+        month, year = cal.get_displayed_month()
+        for day, texts in self.model.agenda.month(year, month).items():
+            cal.calevent_create(datetime.date.fromisoformat(day), "\n".join(texts), "busy")
 
     # ---------- Liens ----------
-    def add_link(self, title_entry, url_entry, desc_entry, container):
+    def add_link(self, title_entry, url_entry, desc_entry, link_list):
         title, url, desc = title_entry.get().strip(), url_entry.get().strip(), desc_entry.get().strip()
         if not title or not url:
             return
-        self.web_links.append((title, url, desc))
+        link = Link(title, url, desc)
+        key = self.model.links.add(link)
+        if not self._batching:
+            link_list.insert(key, link)
+            self.views.mark_fresh("web_links")
         title_entry.delete(0, tk.END)
         url_entry.delete(0, tk.END)
         desc_entry.delete(0, tk.END)
-        self.render_links(container)
-
-    def render_links(self, container):
-        for widget in container.winfo_children():
-            widget.destroy()
-        for title, url, desc in self.web_links:
-            row = tk.Frame(container, bg="white", pady=5)
-            row.pack(fill="x", padx=5)
-            link_btn = tk.Button(row, text=title, fg="blue", cursor="hand2",
+
+    def make_link_row(self, parent):
+        row = tk.Frame(parent, bg="white", padx=5)
+        row.link_btn = tk.Button(row, fg="blue", cursor="hand2",
                                  font=("Helvetica Neue", 14, "underline"),
-                                 relief="flat", bg="white",
-                                 command=lambda u=url: webbrowser.open(u))
-            link_btn.pack(side="left", padx=5)
-            desc_label = tk.Label(row, text=desc, font=("Helvetica Neue", 12),
+                                 relief="flat", bg="white")
+        row.link_btn.pack(side="left", padx=5)
+        row.check_label = tk.Label(row, font=("Helvetica Neue", 11), bg="white", anchor="e")
+        row.check_label.pack(side="right", padx=5)
+        row.desc_label = tk.Label(row, font=("Helvetica Neue", 12),
                                   bg="white", fg="black", anchor="w")
-            desc_label.pack(side="left", fill="x", expand=True, padx=10)
+        row.desc_label.pack(side="left", fill="x", expand=True, padx=10)
+        return row
+
+    def fill_link_row(self, row, key, link):
+        row.link_btn.config(text=link.title, command=lambda: self.open_link(link.url))
+        row.desc_label.config(text=link.desc)
+        # Résultat de la dernière vérification : code, redirection, titre de la page
+        status = self.link_status.get(link.url)
+        if status is None:
+            row.check_label.config(text="")
+        elif not status.ok:
+            row.check_label.config(text=f"✗ {status.error or status.status}", fg="#e74c3c")
+        else:
+            text = f"→ {status.final_url}" if status.redirected else status.title or str(status.status)
+            row.check_label.config(text="✓ " + (text if len(text) <= 40 else text[:39] + "…"), fg="#2ecc71")
+
+    def check_links(self, link_list, button, progress_label):
+        from linkcheck import CheckAll
+
+        def on_result(key, status):
+            self.link_status[status.url] = status
+            if key in link_list.values:
+                link_list.refill(key)
+            progress_label.config(text=f"{job.done}/{job.total} vérifiés")
+
+        def on_done():
+            button.config(state="normal")
+            progress_label.config(text=f"{job.total} vérifiés, {job.broken} en erreur")
+
+        items = [(key, link.url) for key, link in self.model.links.items()]
+        if not items:
+            return
+        button.config(state="disabled")
+        progress_label.config(text=f"0/{len(items)} vérifiés")
+        job = CheckAll(link_list, self.link_checker, items, on_result, on_done)
+
+    def open_link(self, url):
+        import webbrowser
+        webbrowser.open(url)
+
+    def render_links(self, link_list):
+        link_list.set_items(self.model.links.items())
+
+    # ---------- Graphiques ----------
+    def make_chart(self, master, kind, **options):
+        """Graphique `kind` (charts.CHARTS) avec `update(...)` ; clic droit pour l'exporter."""
+        from charts import CHARTS, ChartCanvas, ImageChart
+        if CHARTS_IN_PROCESS:
+            chart = ImageChart(master, self.chart_renderer, kind, facecolor=lambda: self.theme["background"],
+                               **options)
+            self.theme.watch(chart.widget, "background", lambda color: chart.refresh())
+        else:
+            chart = ChartCanvas(master, CHARTS[kind](**options))
+        chart.widget.bind("<Button-3>", lambda e: self.export_chart(chart))
+        return chart
+
+    def export_chart(self, chart):
+        path = filedialog.asksaveasfilename(
+            title="Exporter le graphique", defaultextension=".png",
+            filetypes=[("PNG", "*.png"), ("SVG", "*.svg"), ("PDF", "*.pdf")])
+        if not path:
+            return
+        try:
+            chart.export(path)
+        except (OSError, ValueError) as exc:
+            messagebox.showerror("Erreur", str(exc))
 
     # ---------- Statistiques ----------
-    def render_stats(self, tree, swatches_frame, canvas_container):
-        for item in tree.get_children():
-            tree.delete(item)
-        for w in swatches_frame.winfo_children():
-            w.destroy()
-        total = 0.0
-        for i, s in enumerate(self.stats):
-            tree.insert("", "end", iid=str(i), values=(s["title"], f"{s['value']:.2f}"))
-            total += s["value"]
-            sw = tk.Frame(swatches_frame, bg=self.bg_color)
-            sw.pack(fill="x", pady=2)
-            color_box = tk.Frame(sw, width=26, height=18, bg=s["color"], bd=1, relief="sunken")
-            color_box.pack(side="left", padx=5)
-            lbl = tk.Label(sw, text=f"{s['title']} — {s['value']:.2f}€", bg=self.bg_color, anchor="w")
-            lbl.pack(side="left", padx=6)
-
-        for child in canvas_container.winfo_children():
-            child.destroy()
-        fig = plt.Figure(figsize=(4, 3), dpi=100)
-        ax = fig.add_subplot(111)
-        if self.stats and total > 0:
-            labels = [s["title"] for s in self.stats]
-            sizes = [s["value"] for s in self.stats]
-            colors = [s["color"] for s in self.stats]
-            ax.pie(sizes, labels=None, colors=colors, startangle=90, wedgeprops={"edgecolor": "w"})
-            ax.axis('equal')
-            ax.legend([f"{l}: {v:.2f}€" for l, v in zip(labels, sizes)],
-                      loc='center left', bbox_to_anchor=(1, 0.5))
-            ax.set_title(f"Total: {total:.2f}€")
+    def current_period(self):
+        # Mois en cours : le camembert s'y limite, l'historique complet passe
+        # par la liste et les courbes
+        today = datetime.date.today()
+        last = calendar.monthrange(today.year, today.month)[1]
+        return today.replace(day=1).isoformat(), today.replace(day=last).isoformat()
+
+    def make_stat_row(self, parent):
+        row = tk.Frame(parent, bg="white")
+        row.selected_var = tk.BooleanVar()
+        tk.Checkbutton(row, variable=row.selected_var, bg="white",
+                       command=lambda: self.select_stat(row.key, row.selected_var.get())).pack(side="left")
+        row.color_box = tk.Frame(row, width=26, height=18, bd=1, relief="sunken")
+        row.color_box.pack(side="left", padx=5)
+        row.date_label = tk.Label(row, width=10, anchor="w", bg="white")
+        row.date_label.pack(side="left", padx=5)
+        row.value_label = tk.Label(row, anchor="e", bg="white")
+        row.value_label.pack(side="right", padx=10)
+        row.title_label = tk.Label(row, anchor="w", bg="white")
+        row.title_label.pack(side="left", fill="x", expand=True, padx=5)
+        return row
+
+    def fill_stat_row(self, row, key, s):
+        row.selected_var.set(key in self.stat_selection)
+        row.color_box.config(bg=s.color)
+        row.date_label.config(text=s.date)
+        row.title_label.config(text=s.title)
+        row.value_label.config(text=f"{s.value:.2f}€")
+
+    def select_stat(self, key, selected):
+        if selected:
+            self.stat_selection.add(key)
         else:
-            ax.text(0.5, 0.5, 'Aucune donnée', horizontalalignment='center', verticalalignment='center')
-            ax.axis('off')
-        canvas = FigureCanvasTkAgg(fig, master=canvas_container)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True)
+            self.stat_selection.discard(key)
+
+    def render_stats(self, stat_list):
+        # Tout l'historique : seules les lignes visibles sont créées
+        stat_list.set_items(self.model.stats.items())
+
+    def update_stats_chart(self, stats_chart, by_color=False):
+        if by_color:
+            # Sommes par couleur tenues à jour par le modèle
+            sums = self.model.spending_by_color.sums
+            stats_chart.update(list(sums.values()), list(sums),
+                               title=f"Total : {self.model.spending_by_color.total:.2f}€")
+            return
+        # Parts du mois en cours seulement, lues par période dans l'index des dates
+        start, end = self.current_period()
+        stats = [s for _, s in self.model.stats.between("date", start, end)]
+        labels = [s.title for s in stats]
+        sizes = [s.value for s in stats]
+        colors = [s.color for s in stats]
+        # Total du mois lu dans les sommes par jour : au plus 31 lectures
+        first = datetime.date.fromisoformat(start)
+        days = self.model.spending.sums
+        total = sum(days.get((first + datetime.timedelta(days=i)).isoformat(), 0.0)
+                    for i in range(int(end[-2:])))
+        stats_chart.update(sizes, colors, title=f"Mois en cours : {total:.2f}€",
+                           legend=[f"{l}: {v:.2f}€" for l, v in zip(labels, sizes)])
+
+    def update_stats_series(self, series_chart, period):
+        # Totaux par période en NumPy à partir des sommes par jour tenues à
+        # jour par le modèle ; la courbe est réduite à la largeur en pixels
+        from model.series import PERIODS, totals
+        dates, values = totals(self.model.spending.sums, period)
+        series_chart.update(dates, values,
+                            title=f"Par {PERIODS[period]} — total {self.model.spending.total:.2f}€")
 
     # ---------- Sections ----------
     def show_section(self, name):
-        self.clear_main()
-        self.main_frame.configure(bg=self.bg_color)
-
-        title = tk.Label(self.main_frame, text=name,
-                         font=("Helvetica Neue", 22, "bold"),
-                         bg=self.bg_color, fg="black")
+        self.refresh_views()
+        self.views.show(name, lambda view: self.build_section(view, name), deps=SECTION_STORES[name])
+
+    def build_section(self, view, name):
+        theme = self.theme
+        theme.bind(view, bg="background")
+        title = theme.bind(tk.Label(view, text=name, font=("Helvetica Neue", 22, "bold")),
+                           bg="background", fg="text")
         title.pack(pady=20)
 
-        content_frame = tk.Frame(self.main_frame, bg=self.bg_color)
+        content_frame = theme.bind(tk.Frame(view), bg="background")
         content_frame.pack(fill="both", expand=True, padx=20, pady=20)
 
         if name == "Agenda":
+            from tkcalendar import Calendar
             cal = Calendar(content_frame, selectmode="day", date_pattern="yyyy-mm-dd")
             cal.pack(pady=10)
+            theme.watch(cal, "primary", lambda color: cal.tag_config("busy", background=color, foreground="white"))
             listbox = tk.Listbox(content_frame, font=("Helvetica Neue", 12), height=8, width=50)
             listbox.pack(pady=10)
-            entry = tk.Entry(content_frame, font=("Helvetica Neue", 12))
-            entry.pack(pady=5, fill="x")
+            entry_row = theme.bind(tk.Frame(content_frame), bg="background")
+            entry_row.pack(pady=5, fill="x")
+            entry = tk.Entry(entry_row, font=("Helvetica Neue", 12))
+            entry.pack(side="left", fill="x", expand=True)
+            repeat_var = tk.StringVar(value="Une fois")
+            ttk.Combobox(entry_row, textvariable=repeat_var, values=list(REPEAT_CHOICES),
+                         state="readonly", width=14).pack(side="left", padx=5)
+            def update_events(event=None):
+                self.agenda_refresh_list(cal.get_date(), listbox)
+                self.agenda_refresh_upcoming(upcoming)
+                self.agenda_mark_month(cal)
             add_btn = tk.Button(content_frame, text="Ajouter évènement",
-                                command=lambda: self.agenda_add_event(cal.get_date(), entry, listbox),
-                                bg=self.primary_color, fg="white")
+                                command=lambda: self.agenda_add_event(
+                                    cal.get_date(), entry, REPEAT_CHOICES[repeat_var.get()], update_events),
+                                fg="white")
+            theme.bind(add_btn, bg="primary")
             add_btn.pack(pady=2)
             del_btn = tk.Button(content_frame, text="Supprimer évènement",
-                                command=lambda: self.agenda_delete_event(cal.get_date(), listbox),
-                                bg=self.primary_color, fg="white")
+                                command=lambda: self.agenda_delete_event(cal.get_date(), listbox, update_events),
+                                fg="white")
+            theme.bind(del_btn, bg="primary")
             del_btn.pack(pady=2)
-            def update_events(event=None):
-                self.agenda_refresh_list(cal.get_date(), listbox)
-            cal.bind("<<CalendarSelected>>", update_events)
+            theme.bind(tk.Label(content_frame, text="À venir (7 jours)", font=("Helvetica Neue", 12, "bold")),
+                       bg="background", fg="text").pack(pady=(10, 0))
+            upcoming = tk.Listbox(content_frame, font=("Helvetica Neue", 12), height=5, width=50)
+            upcoming.pack(pady=5)
+            cal.bind("<<CalendarSelected>>", lambda e: self.agenda_refresh_list(cal.get_date(), listbox))
+            cal.bind("<<CalendarMonthChanged>>", lambda e: self.agenda_mark_month(cal))
+            def reveal(store, key):
+                date = key if store == "agenda_events" else self.model.agenda.next_date(key)
+                day = datetime.date.fromisoformat(date)
+                cal.selection_set(day)
+                cal.see(day)
+                update_events()
+            update_events()
+            refresh = update_events
 
         elif name == "Liens":
-            form = tk.Frame(content_frame, bg=self.bg_color)
+            form = theme.bind(tk.Frame(content_frame), bg="background")
             form.pack(fill="x", pady=5)
-            tk.Label(form, text="Titre:", bg=self.bg_color).grid(row=0, column=0, sticky="w")
+            theme.bind(tk.Label(form, text="Titre:"), bg="background").grid(row=0, column=0, sticky="w")
             title_entry = tk.Entry(form)
             title_entry.grid(row=0, column=1, sticky="ew", padx=5)
-            tk.Label(form, text="URL:", bg=self.bg_color).grid(row=1, column=0, sticky="w")
+            theme.bind(tk.Label(form, text="URL:"), bg="background").grid(row=1, column=0, sticky="w")
             url_entry = tk.Entry(form)
             url_entry.grid(row=1, column=1, sticky="ew", padx=5)
-            tk.Label(form, text="Description:", bg=self.bg_color).grid(row=2, column=0, sticky="w")
+            theme.bind(tk.Label(form, text="Description:"), bg="background").grid(row=2, column=0, sticky="w")
             desc_entry = tk.Entry(form)
             desc_entry.grid(row=2, column=1, sticky="ew", padx=5)
             form.grid_columnconfigure(1, weight=1)
-            container = tk.Frame(content_frame, bg="white", bd=1, relief="solid")
-            container.pack(fill="both", expand=True, pady=10)
+            link_list = VirtualList(content_frame, self.make_link_row, self.fill_link_row,
+                                    row_height=44, bd=1, relief="solid")
+            link_list.pack(fill="both", expand=True, pady=10)
             add_btn = tk.Button(form, text="Ajouter lien",
-                                command=lambda: self.add_link(title_entry, url_entry, desc_entry, container),
-                                bg=self.primary_color, fg="white")
+                                command=lambda: self.add_link(title_entry, url_entry, desc_entry, link_list),
+                                fg="white")
+            theme.bind(add_btn, bg="primary")
             add_btn.grid(row=3, column=0, columnspan=2, pady=5)
-            self.render_links(container)
+            check_frame = theme.bind(tk.Frame(content_frame), bg="background")
+            check_frame.pack(fill="x", before=link_list)
+            check_btn = theme.bind(tk.Button(check_frame, text="Vérifier les liens", fg="white",
+                                             command=lambda: self.check_links(link_list, check_btn, check_label)),
+                                   bg="primary")
+            check_btn.pack(side="left")
+            check_label = theme.bind(tk.Label(check_frame, text="", font=("Helvetica Neue", 11)),
+                                     bg="background", fg="text")
+            check_label.pack(side="left", padx=10)
+            self.render_links(link_list)
+            reveal = lambda store, key: link_list.see(key)
+            refresh = lambda: self.render_links(link_list)
 
         elif name == "Films":
-            form = tk.Frame(content_frame, bg=self.bg_color)
+            from tmdb import DebouncedSearch
+            form = theme.bind(tk.Frame(content_frame), bg="background")
             form.pack(fill="x", pady=5)
-            tk.Label(form, text="Titre du film:", bg=self.bg_color).grid(row=0, column=0, sticky="w")
+            theme.bind(tk.Label(form, text="Titre du film:"), bg="background").grid(row=0, column=0, sticky="w")
             
             film_entry = ttk.Combobox(form)
             film_entry.grid(row=0, column=1, sticky="ew", padx=5)
 
+            def show_suggestions(remote):
+                film_entry["values"] = self.suggest_movies(film_entry.get().strip(), remote)
+
+            lookup = DebouncedSearch(film_entry, self.tmdb.executor, self.search_movies, show_suggestions)
+
             def on_type(event):
+                if event.keysym in ("Up", "Down", "Left", "Right", "Return", "Escape", "Tab"):
+                    return
                 query = film_entry.get().strip()
-                if len(query) >= 3:  # attendre au moins 3 caractères
-                    suggestions = self.search_movies(query)
-                    film_entry["values"] = suggestions
+                if len(query) < 3:  # attendre au moins 3 caractères
+                    lookup.cancel()
+                    return
+                cached = self.tmdb.cached(query)
+                if cached is not None:
+                    lookup.cancel()
+                    show_suggestions(cached)
+                else:
+                    # Suggestions locales tout de suite, TMDb en arrière-plan
+                    show_suggestions(())
+                    lookup.schedule(query)
 
             film_entry.bind("<KeyRelease>", on_type)
             
-            container = tk.Frame(content_frame, bg="white", bd=1, relief="solid")
-            container.pack(fill="both", expand=True, pady=10)
-            stats_label = tk.Label(content_frame, text="", font=("Helvetica Neue", 12),
-                                   bg=self.bg_color, fg="black")
+            film_list = VirtualList(
+                content_frame,
+                lambda parent: self.make_film_row(parent, film_list, stats_label, film_chart),
+                self.fill_film_row, row_height=52, bd=1, relief="solid")
+            film_list.pack(fill="both", expand=True, pady=10)
+            stats_label = theme.bind(tk.Label(content_frame, text="", font=("Helvetica Neue", 12)),
+                                     bg="background", fg="text")
             stats_label.pack(pady=5)
-            chart_container = tk.Frame(content_frame, bg=self.bg_color)
+            chart_container = theme.bind(tk.Frame(content_frame), bg="background")
             chart_container.pack(fill="both", expand=True, pady=10)
+            film_chart = self.make_chart(chart_container, "pie", empty_text="Aucun film", autopct="%1.0f%%")
             add_btn = tk.Button(form, text="Ajouter film",
-                                command=lambda: self.add_film(film_entry, container, stats_label, chart_container),
-                                bg=self.primary_color, fg="white")
+                                command=lambda: self.add_film(film_entry, film_list, stats_label, film_chart),
+                                fg="white")
+            theme.bind(add_btn, bg="primary")
             add_btn.grid(row=1, column=0, columnspan=2, pady=5)
-            self.render_films(container, stats_label, chart_container)
+            tk.Button(form, text="Supprimer la sélection", bg="#e74c3c", fg="white", relief="flat",
+                      command=lambda: self.delete_selected_films(film_list, stats_label, film_chart)
+                      ).grid(row=2, column=0, columnspan=2, pady=(0, 5))
+            self.render_films(film_list, stats_label, film_chart)
+            reveal = lambda store, key: film_list.see(key)
+            refresh = lambda: self.render_films(film_list, stats_label, film_chart)
 
         elif name == "Statistiques":
-            form = tk.Frame(content_frame, bg=self.bg_color)
+            from tkcalendar import DateEntry
+            form = theme.bind(tk.Frame(content_frame), bg="background")
             form.pack(fill="x", pady=5)
-            tk.Label(form, text="Titre:", bg=self.bg_color).grid(row=0, column=0, sticky="w")
+            theme.bind(tk.Label(form, text="Titre:"), bg="background").grid(row=0, column=0, sticky="w")
             stat_title = tk.Entry(form)
             stat_title.grid(row=0, column=1, sticky="ew", padx=5)
-            tk.Label(form, text="Valeur (€):", bg=self.bg_color).grid(row=1, column=0, sticky="w")
+            theme.bind(tk.Label(form, text="Valeur (€):"), bg="background").grid(row=1, column=0, sticky="w")
             stat_value = tk.Entry(form)
             stat_value.grid(row=1, column=1, sticky="ew", padx=5)
+            theme.bind(tk.Label(form, text="Date:"), bg="background").grid(row=2, column=0, sticky="w")
+            stat_date = DateEntry(form, date_pattern="yyyy-mm-dd", width=12)
+            stat_date.grid(row=2, column=1, sticky="w", padx=5)
             chosen_color_var = tk.StringVar(value="#%06x" % random.randint(0, 0xFFFFFF))
             def pick_color():
                 c = colorchooser.askcolor(title="Choisir couleur pour cette valeur")[1]
                 if c:
                     chosen_color_var.set(c)
                     color_preview.configure(bg=c)
-            color_btn = tk.Button(form, text="Choisir couleur", command=pick_color,
-                                  bg=self.primary_color, fg="white")
+            color_btn = theme.bind(tk.Button(form, text="Choisir couleur", command=pick_color,
+                                             fg="white"),
+                                   bg="primary")
             color_btn.grid(row=0, column=2, rowspan=2, padx=8)
             color_preview = tk.Frame(form, width=36, height=24, bg=chosen_color_var.get(), bd=1, relief="sunken")
             color_preview.grid(row=0, column=3, rowspan=2, padx=5)
             form.grid_columnconfigure(1, weight=1)
-            list_frame = tk.Frame(content_frame, bg=self.bg_color)
-            list_frame.pack(fill="both", expand=True, pady=10)
-            columns = ("titre", "valeur")
-            tree = ttk.Treeview(list_frame, columns=columns, show="headings", height=6)
-            tree.heading("titre", text="Titre")
-            tree.heading("valeur", text="Valeur (€)")
-            tree.column("titre", anchor="w")
-            tree.column("valeur", anchor="e", width=120)
-            tree.pack(side="left", fill="both", expand=True, padx=(0, 5))
-            right_panel = tk.Frame(list_frame, bg=self.bg_color)
-            right_panel.pack(side="right", fill="y")
-            swatches_frame = tk.Frame(right_panel, bg=self.bg_color)
-            swatches_frame.pack(fill="y", pady=5)
+            # Chaque ligne porte sa pastille de couleur
+            stat_list = VirtualList(content_frame, self.make_stat_row, self.fill_stat_row,
+                                    row_height=30, bd=1, relief="solid")
+            stat_list.pack(fill="both", expand=True, pady=10)
             def add_stat():
                 title = stat_title.get().strip()
                 val_raw = stat_value.get().strip().replace(',', '.')
@@ -489,103 +970,286 @@ class PersonalApp(tk.Tk):
                     messagebox.showerror("Erreur", "Valeur non valide. Utilisez un nombre.")
                     return
                 color = chosen_color_var.get() or ("#%06x" % random.randint(0, 0xFFFFFF))
-                self.stats.append({"title": title, "value": val, "color": color})
+                stat = Stat(title, val, color, stat_date.get_date().isoformat())
+                key = self.model.stats.add(stat)
+                stat_list.insert(key, stat)
+                self.views.mark_fresh("stats")
                 stat_title.delete(0, tk.END)
                 stat_value.delete(0, tk.END)
                 chosen_color_var.set("#%06x" % random.randint(0, 0xFFFFFF))
                 color_preview.configure(bg=chosen_color_var.get())
-                self.render_stats(tree, swatches_frame, canvas_container)
+                show_chart()
             def del_stat():
-                sel = tree.selection()
-                if not sel:
+                if not self.stat_selection:
                     return
-                idx = int(sel[0])
-                try:
-                    self.stats.pop(idx)
-                except Exception:
-                    pass
-                self.render_stats(tree, swatches_frame, canvas_container)
-            add_btn = tk.Button(form, text="Ajouter", command=add_stat,
-                                bg=self.primary_color, fg="white")
-            add_btn.grid(row=2, column=0, columnspan=2, pady=6)
+                with self.model.batch():
+                    for key in list(self.stat_selection):
+                        self.model.stats.delete(key)
+                        stat_list.remove(key)
+                        self.views.mark_fresh("stats")
+                self.stat_selection.clear()
+                show_chart()
+            add_btn = theme.bind(tk.Button(form, text="Ajouter", command=add_stat, fg="white"),
+                                 bg="primary")
+            add_btn.grid(row=3, column=0, columnspan=2, pady=6)
             del_btn = tk.Button(form, text="Supprimer sélection", command=del_stat,
                                 bg="#e74c3c", fg="white")
-            del_btn.grid(row=2, column=2, columnspan=2, pady=6)
-            canvas_container = tk.Frame(content_frame, bg=self.bg_color)
-            canvas_container.pack(fill="both", expand=True)
-            self.render_stats(tree, swatches_frame, canvas_container)
-
-        back_btn = tk.Button(self.main_frame, text="Retour",
-                             command=lambda: self.show_home(),
-                             bg=self.primary_color, fg="white",
-                             font=("Helvetica Neue", 12, "bold"),
-                             relief="flat", bd=0, padx=15, pady=8)
+            del_btn.grid(row=3, column=2, columnspan=2, pady=6)
+            view_var = tk.StringVar(value=next(iter(STATS_VIEWS)))
+            view_box = ttk.Combobox(content_frame, textvariable=view_var, values=list(STATS_VIEWS),
+                                    state="readonly", width=16)
+            view_box.pack(anchor="e")
+            pie_container = theme.bind(tk.Frame(content_frame), bg="background")
+            stats_chart = self.make_chart(pie_container, "pie", wedgeprops={"edgecolor": "w"})
+            series_container = theme.bind(tk.Frame(content_frame), bg="background")
+            series_chart = self.make_chart(series_container, "line", empty_text="Aucune dépense datée")
+            def show_chart(event=None):
+                # Un seul graphique affiché ; la courbe n'est recalculée que visible
+                period = STATS_VIEWS[view_var.get()]
+                pie = period in (None, "color")
+                shown, hidden = (pie_container, series_container) if pie else (series_container, pie_container)
+                hidden.pack_forget()
+                shown.pack(fill="both", expand=True)
+                if pie:
+                    self.update_stats_chart(stats_chart, by_color=period == "color")
+                else:
+                    self.update_stats_series(series_chart, period)
+            view_box.bind("<<ComboboxSelected>>", show_chart)
+            self.render_stats(stat_list)
+            show_chart()
+            reveal = lambda store, key: stat_list.see(key)
+            def refresh():
+                self.render_stats(stat_list)
+                show_chart()
+
+        back_btn = theme.bind(tk.Button(view, text="Retour",
+                                        command=lambda: self.show_home(), fg="white",
+                                        font=("Helvetica Neue", 12, "bold"),
+                                        relief="flat", bd=0, padx=15, pady=8),
+                              bg="primary")
         back_btn.pack(pady=10)
-        self.apply_theme()
+        self.reveal[name] = reveal
+        return refresh
 
     # ---------- Theme ----------
     def apply_theme(self):
-        try: self.configure(bg=self.bg_color)
-        except tk.TclError: pass
-        try: self.main_frame.configure(bg=self.bg_color)
-        except tk.TclError: pass
-        try: self.settings_btn.configure(bg=self.bg_color)
-        except tk.TclError: pass
-        def recurse_set_bg(parent):
-            for child in parent.winfo_children():
+        # Seuls les widgets abonnés aux rôles sont reconfigurés
+        self.theme.set("background", self.bg_color)
+        self.theme.set("primary", self.primary_color)
+
+    # ---------- Import / export ----------
+    def import_file(self, button, progress, status_label):
+        from model.transfer import ImportJob
+        path = filedialog.askopenfilename(
+            title="Importer", filetypes=[("Données", "*.csv *.ics *.jsonl"), ("Tous les fichiers", "*")])
+        if not path:
+            return
+        try:
+            job = ImportJob(self.model, path)
+        except (OSError, ValueError) as exc:
+            messagebox.showerror("Erreur", str(exc))
+            return
+        self.import_job = job
+        button.configure(state="disabled")
+        progress.configure(value=0)
+        progress.pack(pady=5, before=status_label)
+
+        def step():
+            # Une tranche par tour de boucle : la fenêtre reste réactive ; la
+            # vue affichée est rafraîchie une fois à la fin, les vues cachées
+            # à leur affichage
+            try:
+                more = job.step()
+            except (OSError, ValueError) as exc:
+                messagebox.showerror("Erreur", str(exc))
+                more = False
+            progress.configure(value=job.fraction * 100)
+            if more:
+                self.after(1, step)
+                return
+            self.import_job = None
+            self.schedule_refresh()
+            progress.pack_forget()
+            button.configure(state="normal")
+            self.title_index.add(*job.titles)
+            status_label.config(text=f"{job.added} élément(s) importé(s), {job.skipped} ignoré(s)")
+        step()
+
+    def export_file(self, kind, status_label):
+        from model.transfer import export
+        ext, store = EXPORTS[kind]
+        path = filedialog.asksaveasfilename(title="Exporter", defaultextension=ext,
+                                            filetypes=[(kind, "*" + ext)])
+        if not path:
+            return
+        try:
+            count = export(self.model, path, store)
+        except (OSError, ValueError) as exc:
+            messagebox.showerror("Erreur", str(exc))
+            return
+        status_label.config(text=f"{count} élément(s) exporté(s)")
+
+    # ---------- Débogage ----------
+    def set_profiling(self, enabled):
+        if enabled:
+            self.profiler.instrument(self, PROFILED)
+            if self.autosave is not None:
+                self.profiler.instrument(self.autosave, AUTOSAVE_PROFILED, prefix="autosave_")
+            self.lag_monitor.start()
+        else:
+            self.profiler.restore()
+            self.lag_monitor.stop()
+
+    def open_debug_panel(self, event=None):
+        # Fenêtre cachée (F12) : centiles par chemin, rafraîchis chaque seconde
+        if self.debug_panel is not None and self.debug_panel.winfo_exists():
+            self.debug_panel.lift()
+            return
+        panel = self.debug_panel = tk.Toplevel(self)
+        panel.title("Débogage")
+        columns = ("count", "p50", "p95", "p99", "max")
+        tree = ttk.Treeview(panel, columns=columns, height=14)
+        tree.heading("#0", text="Chemin")
+        tree.column("#0", width=200)
+        for column, text in zip(columns, ("Appels", "p50 (ms)", "p95 (ms)", "p99 (ms)", "max (ms)")):
+            tree.heading(column, text=text)
+            tree.column(column, width=80, anchor="e")
+        tree.pack(fill="both", expand=True, padx=10, pady=10)
+        buttons = tk.Frame(panel)
+        buttons.pack(fill="x", padx=10, pady=(0, 10))
+        enabled_var = tk.BooleanVar(value=self.profiler.enabled)
+        tk.Checkbutton(buttons, text="Mesurer", variable=enabled_var,
+                       command=lambda: self.set_profiling(enabled_var.get())).pack(side="left")
+
+        def toggle_cprofile():
+            if self.profiler.profiling:
+                path = filedialog.asksaveasfilename(title="Enregistrer le profil", defaultextension=".prof",
+                                                    filetypes=[("cProfile", "*.prof")])
                 try:
-                    if isinstance(child, (tk.Frame, tk.LabelFrame)):
-                        child.configure(bg=self.bg_color)
-                    elif isinstance(child, tk.Label):
-                        child.configure(bg=self.bg_color)
-                except tk.TclError: pass
-                recurse_set_bg(child)
-        recurse_set_bg(self.main_frame)
+                    self.profiler.stop_cprofile(path)
+                except OSError as exc:
+                    messagebox.showerror("Erreur", str(exc))
+            else:
+                self.profiler.start_cprofile()
+            cprofile_btn.config(text="Arrêter cProfile…" if self.profiler.profiling else "Lancer cProfile")
+
+        def export_json():
+            path = filedialog.asksaveasfilename(title="Exporter les mesures", defaultextension=".json",
+                                                filetypes=[("JSON", "*.json")])
+            if not path:
+                return
+            try:
+                self.profiler.export_json(path)
+            except OSError as exc:
+                messagebox.showerror("Erreur", str(exc))
+
+        cprofile_btn = tk.Button(buttons, command=toggle_cprofile,
+                                 text="Arrêter cProfile…" if self.profiler.profiling else "Lancer cProfile")
+        cprofile_btn.pack(side="left", padx=5)
+        tk.Button(buttons, text="Exporter JSON…", command=export_json).pack(side="left", padx=5)
+        tk.Button(buttons, text="Vider", command=self.profiler.clear).pack(side="left", padx=5)
+
+        def refresh():
+            if not panel.winfo_exists():
+                return
+            summary = self.profiler.summary()
+            for name in set(tree.get_children()) - set(summary):
+                tree.delete(name)
+            for name, row in sorted(summary.items()):
+                values = (row["count"], *(f"{row[k]:.1f}" for k in ("p50", "p95", "p99", "max")))
+                if tree.exists(name):
+                    tree.item(name, values=values)
+                else:
+                    tree.insert("", "end", iid=name, text=name, values=values)
+            panel.after(1000, refresh)
+        refresh()
 
     # ---------- Settings ----------
     def open_settings(self):
-        self.clear_main()
-        self.main_frame.configure(bg=self.bg_color)
-        tk.Label(self.main_frame, text="Paramètres",
-                 font=("Helvetica Neue", 22, "bold"),
-                 bg=self.bg_color, fg="black").pack(pady=20)
-        tk.Label(self.main_frame, text="Nom d'utilisateur:",
-                 font=("Helvetica Neue", 14), bg=self.bg_color).pack(pady=5)
-        name_entry = tk.Entry(self.main_frame, font=("Helvetica Neue", 14))
+        self.views.show("settings", self.build_settings, deps=("settings",))
+
+    def build_settings(self, view):
+        theme = self.theme
+        theme.bind(view, bg="background")
+        theme.bind(tk.Label(view, text="Paramètres", font=("Helvetica Neue", 22, "bold")),
+                   bg="background", fg="text").pack(pady=20)
+        theme.bind(tk.Label(view, text="Nom d'utilisateur:", font=("Helvetica Neue", 14)),
+                   bg="background").pack(pady=5)
+        name_entry = tk.Entry(view, font=("Helvetica Neue", 14))
         name_entry.insert(0, self.username)
         name_entry.pack(pady=5)
         def save_name():
             self.username = name_entry.get().strip() or "Utilisateur"
+            self.model.set_setting("username", self.username)
             self.show_home()
-        tk.Button(self.main_frame, text="Changer le nom", command=save_name,
-                  bg=self.primary_color, fg="white",
-                  font=("Helvetica Neue", 12, "bold")).pack(pady=10)
+        theme.bind(tk.Button(view, text="Changer le nom", command=save_name, fg="white",
+                             font=("Helvetica Neue", 12, "bold")),
+                   bg="primary").pack(pady=10)
         def change_bg():
             color = colorchooser.askcolor(title="Choisir couleur de fond")[1]
             if color:
                 self.bg_color = color
+                self.model.set_setting("bg_color", color)
                 self.apply_theme()
-        tk.Button(self.main_frame, text="Changer couleur fond",
-                  command=change_bg, bg=self.primary_color, fg="white",
-                  font=("Helvetica Neue", 12, "bold")).pack(pady=5)
+        theme.bind(tk.Button(view, text="Changer couleur fond", command=change_bg, fg="white",
+                             font=("Helvetica Neue", 12, "bold")),
+                   bg="primary").pack(pady=5)
         def change_primary():
             color = colorchooser.askcolor(title="Choisir couleur des cases")[1]
             if color:
                 self.primary_color = color
-                self.show_home()
-                self.open_settings()
-        tk.Button(self.main_frame, text="Changer couleur cases",
-                  command=change_primary, bg=self.primary_color, fg="white",
-                  font=("Helvetica Neue", 12, "bold")).pack(pady=5)
-        back_btn = tk.Button(self.main_frame, text="Retour",
-                             command=lambda: self.show_home(),
-                             bg=self.primary_color, fg="white",
+                self.model.set_setting("primary_color", color)
+                self.apply_theme()
+        theme.bind(tk.Button(view, text="Changer couleur cases", command=change_primary, fg="white",
+                             font=("Helvetica Neue", 12, "bold")),
+                   bg="primary").pack(pady=5)
+
+        transfer_frame = theme.bind(tk.Frame(view), bg="background")
+        transfer_frame.pack(pady=(15, 5))
+        import_btn = theme.bind(tk.Button(transfer_frame, text="Importer…", fg="white",
+                                          font=("Helvetica Neue", 12, "bold"),
+                                          command=lambda: self.import_file(import_btn, progress, transfer_status)),
+                                bg="primary")
+        import_btn.pack(side="left", padx=5)
+        export_var = tk.StringVar(value=next(iter(EXPORTS)))
+        ttk.Combobox(transfer_frame, textvariable=export_var, values=list(EXPORTS),
+                     state="readonly", width=18).pack(side="left", padx=5)
+        theme.bind(tk.Button(transfer_frame, text="Exporter…", fg="white",
                              font=("Helvetica Neue", 12, "bold"),
-                             relief="flat", bd=0, padx=15, pady=8)
+                             command=lambda: self.export_file(export_var.get(), transfer_status)),
+                   bg="primary").pack(side="left", padx=5)
+        progress = ttk.Progressbar(view, length=300, maximum=100)
+        transfer_status = theme.bind(tk.Label(view, text="", font=("Helvetica Neue", 11)),
+                                     bg="background", fg="text")
+        transfer_status.pack(pady=2)
+
+        back_btn = theme.bind(tk.Button(view, text="Retour",
+                                        command=lambda: self.show_home(), fg="white",
+                                        font=("Helvetica Neue", 12, "bold"),
+                                        relief="flat", bd=0, padx=15, pady=8),
+                              bg="primary")
         back_btn.pack(pady=20)
-        self.apply_theme()
+
+        def refresh():
+            name_entry.delete(0, tk.END)
+            name_entry.insert(0, self.username)
+        return refresh
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Application personnelle")
+    parser.add_argument("--profile", help=f"profil à ouvrir (dossier {PROFILES_DIR}/NOM) ; "
+                                          "sans profil, app_data.db")
+    args = parser.parse_args()
+    if args.profile is None:
+        app = PersonalApp(username="Théo")
+    else:
+        if args.profile in ("", ".", "..") or os.path.basename(args.profile) != args.profile:
+            parser.error(f"nom de profil non valide : {args.profile!r}")
+        app = PersonalApp(username="Théo", storage_path=os.path.join(PROFILES_DIR, args.profile), sharded=True)
+    app.mainloop()
 
 
 if __name__ == "__main__":
-    app = PersonalApp(username="Théo")
-    app.mainloop()
+    main()
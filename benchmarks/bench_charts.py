@@ -0,0 +1,149 @@
+"""Latence par mise à jour des graphiques : nouvelle figure vs PieChart réutilisé.
+
+    python benchmarks/bench_charts.py [--updates 200] [--tk] [--process]
+
+Sans --tk, les deux variantes dessinent sur un canvas Agg (pas d'affichage
+requis) ; avec --tk, elles passent par FigureCanvasTkAgg comme dans l'appli.
+Avec --process, mesure aussi le rendu en PNG dans un processus à part
+(APPERSO_CHARTS=process) : attente d'un nouveau rendu, et coût sur le
+thread Tk (empreinte + cache) quand les données reviennent.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import matplotlib
+
+COLORS = ["#2ecc71", "#e74c3c", "#95a5a6"]
+LABELS = ["Bien", "Mauvais", "Neutre"]
+
+
+def random_counts():
+    return [random.randint(0, 50) for _ in range(3)]
+
+
+def report(name, samples):
+    if not samples:
+        print(f"{name:<28} aucune mesure")
+        return
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{name:<28} médiane {statistics.median(samples) * 1000:7.2f} ms   p95 {p95 * 1000:7.2f} ms")
+
+
+def bench_agg(updates):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    from charts import PieChart
+
+    before = []
+    for _ in range(updates):
+        start = time.perf_counter()
+        fig = Figure(figsize=(4, 3), dpi=100)
+        ax = fig.add_subplot(111)
+        ax.pie(random_counts(), labels=LABELS, colors=COLORS, autopct="%1.0f%%", startangle=90)
+        ax.axis("equal")
+        FigureCanvasAgg(fig).draw()
+        before.append(time.perf_counter() - start)
+
+    chart = PieChart("Aucun film", autopct="%1.0f%%")
+    canvas = FigureCanvasAgg(chart.figure)
+    after = []
+    for _ in range(updates):
+        start = time.perf_counter()
+        chart.set_data(random_counts(), COLORS, labels=LABELS)
+        canvas.draw()
+        after.append(time.perf_counter() - start)
+    return before, after
+
+
+def bench_tk(updates):
+    import tkinter as tk
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+    from matplotlib.figure import Figure
+    from charts import ChartCanvas, PieChart
+
+    root = tk.Tk()
+    container = tk.Frame(root)
+    container.pack(fill="both", expand=True)
+    root.update()
+
+    before = []
+    for _ in range(updates):
+        start = time.perf_counter()
+        for child in container.winfo_children():
+            child.destroy()
+        fig = Figure(figsize=(4, 3), dpi=100)
+        ax = fig.add_subplot(111)
+        ax.pie(random_counts(), labels=LABELS, colors=COLORS, autopct="%1.0f%%", startangle=90)
+        ax.axis("equal")
+        canvas = FigureCanvasTkAgg(fig, master=container)
+        canvas.draw()
+        canvas.get_tk_widget().pack(fill="both", expand=True)
+        root.update()
+        before.append(time.perf_counter() - start)
+
+    for child in container.winfo_children():
+        child.destroy()
+    view = ChartCanvas(container, PieChart("Aucun film", autopct="%1.0f%%"))
+    after = []
+    for _ in range(updates):
+        start = time.perf_counter()
+        # Trois changements dans le même tour de boucle : un seul dessin
+        for _ in range(3):
+            view.update(random_counts(), COLORS, labels=LABELS)
+        root.update()
+        after.append(time.perf_counter() - start)
+    root.destroy()
+    return before, after
+
+
+def bench_process(updates):
+    from charts import ChartRenderer
+
+    renderer = ChartRenderer()
+    renderer.render("warm-up", ("pie", {}, ([1], COLORS[:1]), {}, (400, 300), "white")).result()
+    counts = [random_counts() for _ in range(20)]
+    specs = [("pie", {"empty_text": "Aucun film", "autopct": "%1.0f%%"}, (c, COLORS), {"labels": LABELS},
+              (400, 300), "white") for c in counts]
+    rendered, cached = [], []
+    # Chaque jeu de données est rendu une fois, puis toutes les mises à
+    # jour le retrouvent en cache, quel que soit --updates
+    for spec in specs:
+        start = time.perf_counter()
+        key = renderer.key(spec)
+        renderer.collect(key, renderer.render(key, spec))
+        rendered.append(time.perf_counter() - start)
+    for i in range(updates):
+        spec = specs[i % len(specs)]
+        start = time.perf_counter()
+        renderer.get(renderer.key(spec))
+        cached.append(time.perf_counter() - start)
+    renderer.close()
+    return rendered, cached
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--updates", type=int, default=200)
+    parser.add_argument("--tk", action="store_true", help="mesurer avec FigureCanvasTkAgg")
+    parser.add_argument("--process", action="store_true", help="mesurer aussi le rendu dans un processus")
+    args = parser.parse_args()
+    if not args.tk:
+        matplotlib.use("Agg")
+    before, after = (bench_tk if args.tk else bench_agg)(args.updates)
+    report("nouvelle figure par màj", before)
+    report("PieChart réutilisé", after)
+    if args.process:
+        rendered, cached = bench_process(args.updates)
+        report("processus : nouveau PNG", rendered)
+        report("processus : PNG en cache", cached)
+
+
+if __name__ == "__main__":
+    main()
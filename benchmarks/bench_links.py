@@ -0,0 +1,94 @@
+"""Vérification des liens contre des serveurs HTTP locaux : un par un vs en
+parallèle, puis depuis le cache.
+
+    python benchmarks/bench_links.py [--links 100] [--hosts 10] [--latency 50]
+
+Chaque serveur (un port = un hôte) répond après `--latency` ms : une page
+HTML avec titre, une redirection ou une 404 selon le chemin.
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from linkcheck import LinkChecker
+
+
+class Handler(BaseHTTPRequestHandler):
+    latency = 0.05
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        if self.path.startswith("/redirect/"):
+            self.send_response(302)
+            self.send_header("Location", "/page/" + self.path.rsplit("/", 1)[1])
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if self.path.startswith("/missing/"):
+            self.send_error(404)
+            return
+        body = f"<html><head><title>Page {self.path}</title></head><body>{'x' * 4096}</body></html>".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(count):
+    servers = []
+    for _ in range(count):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+    return servers
+
+
+def urls(servers, n):
+    kinds = ("page", "page", "page", "redirect", "missing")
+    return [f"http://127.0.0.1:{servers[i % len(servers)].server_port}/{kinds[i % len(kinds)]}/{i}"
+            for i in range(n)]
+
+
+def run(checker, links):
+    start = time.perf_counter()
+    results = list(checker.executor.map(checker.check, links))
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--links", type=int, default=100)
+    parser.add_argument("--hosts", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=50, help="ms par réponse")
+    args = parser.parse_args()
+    Handler.latency = args.latency / 1000
+    servers = serve(args.hosts)
+    links = urls(servers, args.links)
+
+    for name, options in (("un par un", {"workers": 1, "interval": 0}),
+                          ("en parallèle", {})):
+        checker = LinkChecker(**options)
+        elapsed, results = run(checker, links)
+        ok = sum(r.ok for r in results)
+        redirected = sum(r.redirected for r in results)
+        titled = sum(bool(r.title) for r in results)
+        print(f"{name:<14} {elapsed:6.2f} s   {ok} ok, {redirected} redirigés, {titled} titres, "
+              f"{len(results) - ok} en erreur")
+        elapsed, _ = run(checker, links)
+        print(f"{'  cache':<14} {elapsed * 1000:6.2f} ms")
+        checker.close()
+    for server in servers:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
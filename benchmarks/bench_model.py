@@ -0,0 +1,140 @@
+"""Couche de données sans Tk : ajout, modification, suppression, chargement,
+sauvegarde, agrégats et recherche à 1k, 10k et 100k éléments, mémoire par
+enregistrement.
+
+    python benchmarks/bench_model.py [--sizes 1000,10000,100000] [--backend sqlite|json|sharded|all]
+
+Chaque taille tourne dans un dossier temporaire neuf. Les temps par
+opération sont des moyennes sur un échantillon de `--ops` opérations.
+« accueil seul » rouvre les données et ne lit que la to-do, comme le
+premier écran ; « mémoire » est ce qui reste alloué après chaque chargement.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model import Film, Stat, Task, open_model
+
+STATUSES = ("Bien", "Mauvais", "Neutre")
+BACKENDS = {"sqlite": "bench.db", "json": "bench.json", "sharded": "bench"}
+
+
+def records(n):
+    films = [Film(f"Film {i}", random.choice(STATUSES)) for i in range(n)]
+    stats = [Stat(f"Dépense {i}", random.uniform(1, 500), "#%06x" % random.randint(0, 0xFFFFFF))
+             for i in range(n)]
+    tasks = [Task(f"Tâche {i}") for i in range(n)]
+    return films, stats, tasks
+
+
+def per_op(seconds, count):
+    return f"{seconds / max(count, 1) * 1e6:9.1f} µs/op"
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def timed_memory(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return elapsed, size, result
+
+
+def memory_per_record(n):
+    # Taille des enregistrements eux-mêmes (chaînes comprises)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    films = [Film(f"Film {i}", STATUSES[i % 3]) for i in range(n)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del films
+    return size / n
+
+
+def bench(backend, n, ops):
+    films, stats, tasks = records(n)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, BACKENDS[backend])
+        model = open_model(path, backend == "sharded")
+        model.load({})
+        model.film_status.count, model.spending.count  # agrégats calculés, puis tenus à jour
+
+        elapsed, keys = timed(lambda: [model.films.add(f) for f in films])
+        print(f"  ajout          {per_op(elapsed, n)}   ({elapsed:.2f} s pour {n})")
+        for s in stats:
+            model.stats.add(s)
+        for t in tasks:
+            model.todo.add(t)
+
+        sample = random.sample(keys, min(ops, n))
+        elapsed, _ = timed(lambda: [model.films.update(k, Film(f"Film {k}", "Bien")) for k in sample])
+        print(f"  modification   {per_op(elapsed, len(sample))}")
+
+        elapsed, _ = timed(lambda: model.films.count_by("status"))
+        print(f"  agrégat statut {elapsed * 1000:9.2f} ms")
+        elapsed, _ = timed(lambda: sum(s.value for _, s in model.stats.items()))
+        print(f"  total stats    {elapsed * 1000:9.2f} ms")
+        elapsed, _ = timed(lambda: (dict(model.film_status.counts), model.spending.total))
+        print(f"  agrégats tenus {elapsed * 1e6:9.1f} µs")
+
+        elapsed, _ = timed(lambda: model.search("film"))
+        print(f"  index recherche{elapsed * 1000:9.2f} ms   (construction, 3 × {n} documents)")
+        elapsed, _ = timed(lambda: [model.search(q) for q in ("depense 12", "tach", "film 99999")])
+        print(f"  recherche      {elapsed / 3 * 1000:9.2f} ms/requête")
+
+        model.films.add(Film("Dernier"))
+        elapsed, write = timed(model.storage.checkpoint)
+        print(f"  préparation    {elapsed * 1000:9.2f} ms   (sauvegarde auto, thread Tk)")
+        elapsed, _ = timed(write)
+        print(f"  écriture       {elapsed * 1000:9.2f} ms   (sauvegarde auto : fsync du journal ou report du WAL)")
+        elapsed, _ = timed(model.save)
+        print(f"  sauvegarde     {elapsed * 1000:9.2f} ms")
+        model.close()
+
+        model = open_model(path, backend == "sharded")
+        elapsed, size, _ = timed_memory(lambda: (model.load({}), model.todo.items()))
+        print(f"  accueil seul   {elapsed * 1000:9.2f} ms   mémoire {size / 2**20:6.1f} Mio")
+        model.close()
+
+        model = open_model(path, backend == "sharded")
+        elapsed, size, _ = timed_memory(lambda: (model.load({}), model.films.items(), model.stats.items(),
+                                                 model.todo.items()))
+        print(f"  chargement     {elapsed * 1000:9.2f} ms   mémoire {size / 2**20:6.1f} Mio   (3 × {n} éléments)")
+
+        sample = random.sample(keys, min(ops, n))
+        elapsed, _ = timed(lambda: [model.films.delete(k) for k in sample])
+        print(f"  suppression    {per_op(elapsed, len(sample))}")
+        model.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--backend", choices=[*BACKENDS, "all"], default="all")
+    parser.add_argument("--ops", type=int, default=1000, help="opérations mesurées (modif., suppr.)")
+    args = parser.parse_args()
+    random.seed(0)
+    backends = list(BACKENDS) if args.backend == "all" else [args.backend]
+    for n in (int(size) for size in args.sizes.split(",")):
+        print(f"{n} éléments — mémoire par Film : {memory_per_record(n):.0f} octets")
+        for backend in backends:
+            print(f" {backend}")
+            bench(backend, n, args.ops)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Vignettes des affiches contre un serveur d'images local : téléchargement,
+lecture du cache disque et décodage, un par un vs dans le pool.
+
+    python benchmarks/bench_posters.py [--posters 200] [--latency 50] [--workers 4]
+
+Le serveur répond après `--latency` ms avec une affiche JPEG 92x138 (taille
+« w92 » de TMDb) ; les chemins « /missing… » renvoient une 404. Le cache
+disque est un dossier temporaire, vidé entre les deux passes à froid.
+"""
+import argparse
+import io
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from posters import PosterFetcher
+
+
+def make_poster():
+    image = Image.new("RGB", (92, 138))
+    image.putdata([(x * 7 % 256, y * 3 % 256, (x + y) % 256) for y in range(138) for x in range(92)])
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=85)
+    return buffer.getvalue()
+
+
+class Handler(BaseHTTPRequestHandler):
+    latency = 0.05
+    poster = b""
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        if "/missing" in self.path:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Length", str(len(self.poster)))
+        self.end_headers()
+        self.wfile.write(self.poster)
+
+    def log_message(self, *args):
+        pass
+
+
+def run(fetcher, paths, workers):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(fetcher.fetch, paths))
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posters", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=50, help="ms par réponse")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    Handler.latency = args.latency / 1000
+    Handler.poster = make_poster()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    paths = [f"/{'missing' if i % 20 == 19 else 'poster'}{i}.jpg" for i in range(args.posters)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, workers in (("un par un", 1), ("dans le pool", args.workers)):
+            directory = os.path.join(tmp, name.replace(" ", "_"))
+            fetcher = PosterFetcher(directory, base_url, workers=workers)
+            elapsed, results = run(fetcher, paths, workers)
+            found = [r for r in results if r is not None]
+            print(f"{name:<14} {elapsed:6.2f} s   {len(found)} vignettes, {len(results) - len(found)} introuvables")
+            # Les introuvables ne sont pas redemandées (PosterCache.missing)
+            cached = [path for path, r in zip(paths, results) if r is not None]
+            elapsed, _ = run(fetcher, cached, workers)
+            print(f"{'  disque':<14} {elapsed * 1000:6.1f} ms ({elapsed / len(cached) * 1e6:.0f} µs par affiche)")
+            fetcher.close()
+            shutil.rmtree(directory)
+        size = len(found[0])
+        print(f"vignette décodée : {size} octets ; 200 en mémoire (maxsize par défaut) : "
+              f"{size * 200 / 1024:.0f} Kio, quel que soit le nombre de films")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
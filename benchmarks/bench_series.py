@@ -0,0 +1,90 @@
+"""Courbes des statistiques : totaux par période (NumPy), réduction LTTB et
+dessin, comparés au budget d'une image (16 ms).
+
+    python benchmarks/bench_series.py [--entries 100000] [--years 5] [--width 800]
+
+Les dépenses sont réparties au hasard sur `--years` années ; le dessin se
+fait sur un canvas Agg (pas d'affichage requis). « sans réduction » trace
+la série complète, pour comparaison ; le reste du dessin (axes, graduations)
+ne dépend pas de la longueur de la série.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.dates import date2num
+
+from charts import LineChart
+from model import Stat, open_model
+from model.series import totals
+
+FRAME = 0.016
+
+
+def report(name, samples, extra=""):
+    median = statistics.median(samples)
+    flag = "" if median <= FRAME else "  > 1 image"
+    print(f"  {name:<24} {median * 1000:8.2f} ms{flag}{extra}")
+
+
+def repeat(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=100000)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--width", type=int, default=800, help="largeur du graphique en pixels")
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+    random.seed(0)
+
+    start = date.today() - timedelta(days=365 * args.years)
+    with tempfile.TemporaryDirectory() as tmp:
+        model = open_model(os.path.join(tmp, "bench.db"))
+        model.load({})
+        with model.batch():
+            for i in range(args.entries):
+                day = start + timedelta(days=random.randrange(365 * args.years))
+                model.stats.add(Stat(f"Dépense {i}", random.uniform(1, 200), "#3498db", day.isoformat()))
+        model.close()
+
+        model = open_model(os.path.join(tmp, "bench.db"))
+        elapsed = time.perf_counter()
+        model.load({})
+        sums = model.spending.sums
+        elapsed = time.perf_counter() - elapsed
+        print(f"{args.entries} dépenses, {len(sums)} jours — sommes par jour au chargement : "
+              f"{elapsed * 1000:.1f} ms")
+        model.close()
+
+    chart = LineChart(figsize=(args.width / 100, 3), dpi=100)
+    canvas = FigureCanvasAgg(chart.figure)
+    canvas.draw()
+    for period in ("day", "week", "month"):
+        x, y = totals(sums, period)
+        print(f" {period} ({len(x)} points)")
+        report("totaux NumPy", repeat(lambda: totals(sums, period), args.runs))
+        report("réduction LTTB", repeat(lambda: chart.set_data(x, y), args.runs),
+               f"   ({chart.points} points tracés)")
+        report("dessin", repeat(canvas.draw, args.runs))
+        chart.line.set_data(date2num(x), y)
+        report("dessin sans réduction", repeat(canvas.draw, args.runs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Temps de démarrage : import du module et temps jusqu'au premier affichage.
+
+    python benchmarks/bench_startup.py [--runs 10]
+
+Chaque mesure tourne dans un interpréteur neuf (imports à froid). Le temps
+jusqu'au premier affichage demande un écran ; il est sauté sinon.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ("matplotlib", "tkcalendar", "requests")
+
+IMPORT_CODE = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+import {module}
+print(json.dumps({{"seconds": time.perf_counter() - start,
+                  "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+FIRST_FRAME_CODE = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+import tkinter
+try:
+    import Apperso
+    app = Apperso.PersonalApp(storage_path="bench.db")
+except tkinter.TclError as exc:
+    print(json.dumps({{"error": str(exc)}}))
+    sys.exit()
+app.update()
+elapsed = time.perf_counter() - start
+heavy = [m for m in {heavy!r} if m in sys.modules]
+app.on_close()
+print(json.dumps({{"seconds": elapsed, "heavy": heavy}}))
+"""
+
+
+def run(code, cwd):
+    env = dict(os.environ, APPERSO_PRELOAD="0")
+    out = subprocess.run([sys.executable, "-c", code], cwd=cwd, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def measure(label, code, runs, cwd):
+    results = [run(code, cwd) for _ in range(runs)]
+    if "error" in results[0]:
+        print(f"{label:<32} ignoré ({results[0]['error']})")
+        return
+    median = statistics.median(r["seconds"] for r in results) * 1000
+    heavy = ", ".join(results[0]["heavy"]) or "aucun"
+    print(f"{label:<32} médiane {median:8.1f} ms   modules lourds chargés : {heavy}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as cwd:
+        measure("import tkinter", IMPORT_CODE.format(root=ROOT, module="tkinter", heavy=HEAVY), args.runs, cwd)
+        measure("import Apperso", IMPORT_CODE.format(root=ROOT, module="Apperso", heavy=HEAVY), args.runs, cwd)
+        measure("premier affichage (accueil)", FIRST_FRAME_CODE.format(root=ROOT, heavy=HEAVY), args.runs, cwd)
+
+
+if __name__ == "__main__":
+    main()
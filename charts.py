@@ -0,0 +1,365 @@
+import base64
+import hashlib
+import io
+import math
+import multiprocessing
+import pickle
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from matplotlib.dates import AutoDateLocator, ConciseDateFormatter, date2num
+from matplotlib.figure import Figure
+
+
+class PieChart:
+    """Camembert dont la figure est créée une fois.
+
+    `set_data` déplace les parts existantes (angles, couleurs, textes) ; les
+    artistes ne sont recréés que si le nombre de parts change. Sans Tk, pour
+    pouvoir être mesuré avec un canvas Agg.
+    """
+
+    def __init__(self, empty_text="Aucune donnée", autopct=None, wedgeprops=None,
+                 figsize=(4, 3), dpi=100):
+        self.figure = Figure(figsize=figsize, dpi=dpi)
+        self.ax = self.figure.add_subplot(111)
+        self.autopct = autopct
+        self.wedgeprops = wedgeprops
+        self.wedges, self.texts, self.autotexts = [], [], []
+        self.legend = None
+        self.empty = self.ax.text(0.5, 0.5, empty_text, horizontalalignment="center",
+                                  verticalalignment="center", transform=self.ax.transAxes)
+        self._frame()
+
+    def _frame(self):
+        self.ax.axis("off")
+        self.ax.set_aspect("equal")
+        self.ax.set_xlim(-1.25, 1.25)
+        self.ax.set_ylim(-1.25, 1.25)
+
+    def set_data(self, sizes, colors, labels=None, title="", legend=None):
+        total = sum(sizes)
+        empty = total <= 0
+        self.empty.set_visible(empty)
+        for artist in self.wedges + self.texts + self.autotexts:
+            artist.set_visible(not empty)
+        if self.legend is not None:
+            self.legend.remove()
+            self.legend = None
+        self.ax.set_title("" if empty else title)
+        if empty:
+            return
+
+        if len(sizes) != len(self.wedges) or bool(labels) != bool(self.texts):
+            self._rebuild(sizes, colors, labels)
+        else:
+            self._move(sizes, colors, labels, total)
+        if legend:
+            self.legend = self.ax.legend(self.wedges, legend, loc="center left", bbox_to_anchor=(1, 0.5))
+
+    def _rebuild(self, sizes, colors, labels):
+        for artist in self.wedges + self.texts + self.autotexts:
+            artist.remove()
+        parts = tuple(self.ax.pie(sizes, labels=labels, colors=colors, autopct=self.autopct,
+                                  startangle=90, wedgeprops=self.wedgeprops))
+        self.wedges, self.texts = list(parts[0]), list(parts[1])
+        self.autotexts = list(parts[2]) if len(parts) > 2 else []
+        if not labels:
+            for text in self.texts:
+                text.remove()
+            self.texts = []
+        self._frame()
+
+    def _move(self, sizes, colors, labels, total):
+        # Mêmes positions que Axes.pie (startangle=90, labeldistance=1.1, pctdistance=0.6)
+        theta = 90.0
+        for i, (wedge, size) in enumerate(zip(self.wedges, sizes)):
+            span = 360.0 * size / total
+            wedge.set_theta1(theta)
+            wedge.set_theta2(theta + span)
+            wedge.set_facecolor(colors[i])
+            mid = math.radians(theta + span / 2)
+            x, y = math.cos(mid), math.sin(mid)
+            if self.texts:
+                self.texts[i].set_text(labels[i])
+                self.texts[i].set_position((1.1 * x, 1.1 * y))
+                self.texts[i].set_horizontalalignment("left" if x > 0 else "right")
+            if self.autotexts:
+                self.autotexts[i].set_text(self.autopct % (100.0 * size / total))
+                self.autotexts[i].set_position((0.6 * x, 0.6 * y))
+            theta += span
+
+
+def lttb(x, y, threshold):
+    """Réduit une courbe à `threshold` points (Largest-Triangle-Three-Buckets).
+
+    Premier et dernier points gardés ; entre les deux, chaque tranche garde
+    le point qui forme le plus grand triangle avec le point retenu avant et
+    la moyenne de la tranche suivante : pics et creux restent visibles.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)  # tranches [edges[i], edges[i + 1])
+    counts = np.diff(edges)
+    # Moyennes de toutes les tranches d'un coup ; le dernier point sert de tranche finale
+    mean_x = np.append(np.add.reduceat(x[:n - 1], edges[:-1]) / counts, x[-1]).tolist()
+    mean_y = np.append(np.add.reduceat(y[:n - 1], edges[:-1]) / counts, y[-1]).tolist()
+    bounds = edges.tolist()
+    # Petites tranches : boucle Python sur des floats, plus rapide que
+    # NumPy sur quelques points ; grandes tranches : NumPy
+    small = n < 32 * threshold
+    if small:
+        xs, ys = x.tolist(), y.tolist()
+    keep = [0]
+    a = 0
+    for i in range(threshold - 2):
+        start, end = bounds[i], bounds[i + 1]
+        ax, ay = float(x[a]), float(y[a])
+        dx, dy = mean_x[i + 1] - ax, mean_y[i + 1] - ay
+        if small:
+            best = -1.0
+            for j in range(start, end):
+                area = abs(dx * (ys[j] - ay) - (xs[j] - ax) * dy)
+                if area > best:
+                    a, best = j, area
+        else:
+            a = start + int(np.abs(dx * (y[start:end] - ay) - (x[start:end] - ax) * dy).argmax())
+        keep.append(a)
+    keep.append(n - 1)
+    return x[keep], y[keep]
+
+
+class LineChart:
+    """Courbe datée dont la figure est créée une fois.
+
+    `set_data` réduit la série par `lttb` à un point par pixel de largeur
+    des axes avant de la tracer : le coût du dessin ne dépend plus de la
+    longueur de l'historique. Sans Tk, comme `PieChart`.
+    """
+
+    def __init__(self, empty_text="Aucune donnée", color="#0b2545", figsize=(4, 3), dpi=100):
+        self.figure = Figure(figsize=figsize, dpi=dpi)
+        self.ax = self.figure.add_subplot(111)
+        locator = AutoDateLocator()
+        self.ax.xaxis.set_major_locator(locator)
+        self.ax.xaxis.set_major_formatter(ConciseDateFormatter(locator))
+        (self.line,) = self.ax.plot([], [], color=color, linewidth=1.2)
+        self.empty = self.ax.text(0.5, 0.5, empty_text, horizontalalignment="center",
+                                  verticalalignment="center", transform=self.ax.transAxes)
+        self.points = 0  # points réellement tracés
+
+    def set_data(self, dates, values, title=""):
+        empty = len(dates) == 0
+        self.empty.set_visible(empty)
+        self.line.set_visible(not empty)
+        self.ax.set_title("" if empty else title)
+        if empty:
+            self.points = 0
+            return
+        x, y = lttb(date2num(dates), np.asarray(values, dtype=float), max(int(self.ax.bbox.width), 3))
+        self.line.set_data(x, y)
+        self.points = len(x)
+        self.ax.relim()
+        self.ax.autoscale_view()
+
+
+class ChartCanvas:
+    """Affiche un `PieChart` ou un `LineChart` dans Tk ; les mises à jour
+    d'un même tour de boucle sont fusionnées en un seul `set_data` +
+    `draw_idle`."""
+
+    def __init__(self, master, chart):
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+        self.chart = chart
+        self.canvas = FigureCanvasTkAgg(chart.figure, master=master)
+        self.widget = self.canvas.get_tk_widget()
+        self.widget.pack(fill="both", expand=True)
+        self._pending = None
+
+    def update(self, *args, **kwargs):
+        if self._pending is None:
+            # Planifié sur la fenêtre principale : le canvas peut être détruit entre-temps
+            self.widget.winfo_toplevel().after_idle(self._flush)
+        self._pending = (args, kwargs)
+
+    def _flush(self):
+        args, kwargs = self._pending
+        self._pending = None
+        if self.widget.winfo_exists():
+            self.chart.set_data(*args, **kwargs)
+            self.canvas.draw_idle()
+
+    def export(self, path):
+        """Enregistre le graphique affiché (format d'après l'extension)."""
+        self.chart.figure.savefig(path, bbox_inches="tight")
+
+
+# ---------- Rendu hors du thread Tk ----------
+CHARTS = {"pie": PieChart, "line": LineChart}
+
+
+def _warm_up():
+    # Import de matplotlib dans le processus, avant le premier graphique
+    import matplotlib.backends.backend_agg  # noqa: F401
+
+
+def render_chart(spec, path=None):
+    """Dessine `spec` avec Agg ; renvoie le PNG, ou l'écrit dans `path`
+    (format d'après l'extension). Exécuté dans un processus du pool."""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    kind, options, args, kwargs, (width, height), facecolor = spec
+    dpi = 100
+    chart = CHARTS[kind](figsize=(width / dpi, height / dpi), dpi=dpi, **options)
+    chart.figure.set_facecolor(facecolor)
+    FigureCanvasAgg(chart.figure)
+    chart.set_data(*args, **kwargs)
+    if path is not None:
+        chart.figure.savefig(path, facecolor=facecolor)
+        return None
+    buffer = io.BytesIO()
+    chart.figure.savefig(buffer, format="png", facecolor=facecolor)
+    return buffer.getvalue()
+
+
+class ChartRenderer:
+    """Pool de processus qui dessine les graphiques en PNG, et cache LRU
+    des images par empreinte des données, options, taille et couleurs :
+    des données inchangées ne sont jamais redessinées."""
+
+    def __init__(self, workers=1, maxsize=64):
+        # spawn : pas de fork d'un processus qui a déjà Tk et des threads
+        self.executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        self.executor.submit(_warm_up)
+        self.maxsize = maxsize
+        self.cache = OrderedDict()  # empreinte -> PNG
+        self.hits = self.misses = 0
+        self._running = {}  # empreinte -> Future, pour ne pas dessiner deux fois la même image
+
+    @staticmethod
+    def key(spec):
+        return hashlib.blake2b(pickle.dumps(spec), digest_size=16).hexdigest()
+
+    def get(self, key):
+        png = self.cache.get(key)
+        if png is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.cache.move_to_end(key)
+        return png
+
+    def put(self, key, png):
+        self.cache[key] = png
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.maxsize:
+            self.cache.popitem(last=False)
+
+    def render(self, key, spec):
+        """Future du PNG de `spec` ; mis en cache une fois reçu par `collect`."""
+        future = self._running.get(key)
+        if future is None or future.cancelled():
+            future = self._running[key] = self.executor.submit(render_chart, spec)
+        return future
+
+    def collect(self, key, future):
+        # Appelé sur le thread Tk quand `future` est terminé ; relance son exception
+        if self._running.get(key) is future:
+            del self._running[key]
+        png = future.result()
+        self.put(key, png)
+        return png
+
+    def export(self, spec, path):
+        self.executor.submit(render_chart, spec, path).result()
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class ImageChart:
+    """Même interface que `ChartCanvas`, mais le graphique est dessiné en
+    PNG par un `ChartRenderer` et affiché dans un Label : le thread Tk ne
+    fait que calculer l'empreinte et décoder l'image.
+
+    Une image arrivée après une mise à jour plus récente est ignorée.
+    `facecolor()` donne la couleur de fond courante (thème).
+    """
+
+    def __init__(self, master, renderer, kind, facecolor=lambda: "white", poll=30, **options):
+        import tkinter as tk
+
+        self.renderer = renderer
+        self.kind = kind
+        self.options = options
+        self.facecolor = facecolor
+        self.poll = poll
+        self.widget = tk.Label(master, bd=0)
+        self.widget.pack(fill="both", expand=True)
+        self.widget.bind("<Configure>", lambda e: self.refresh())
+        self.image = None
+        self._data = None  # (args, kwargs) de la dernière mise à jour
+        self._scheduled = False
+        self._generation = 0
+        self._future = None  # dessin attendu pour la dernière mise à jour
+
+    def update(self, *args, **kwargs):
+        self._data = (args, kwargs)
+        self.refresh()
+
+    def refresh(self):
+        """Redessine la dernière mise à jour (taille ou thème changés) ; une
+        seule fois par tour de boucle."""
+        if self._data is not None and not self._scheduled:
+            self._scheduled = True
+            self.widget.winfo_toplevel().after_idle(self._render)
+
+    def _spec(self):
+        width, height = self.widget.winfo_width(), self.widget.winfo_height()
+        if width <= 1 or height <= 1:  # pas encore placé
+            width, height = 400, 300
+        args, kwargs = self._data
+        return self.kind, self.options, args, kwargs, (width, height), self.facecolor()
+
+    def _render(self):
+        self._scheduled = False
+        if not self.widget.winfo_exists():
+            return
+        spec = self._spec()
+        key = self.renderer.key(spec)
+        self._generation += 1
+        if self._future is not None:
+            self._future.cancel()  # pas encore commencé : inutile (redimensionnement...)
+            self._future = None
+        png = self.renderer.get(key)
+        if png is not None:
+            self._show(png)
+        else:
+            self._future = self.renderer.render(key, spec)
+            self._wait(key, self._future, self._generation)
+
+    def _wait(self, key, future, generation):
+        if not future.done():
+            self.widget.after(self.poll, self._wait, key, future, generation)
+            return
+        try:
+            png = self.renderer.collect(key, future)
+        except Exception:  # annulé ou dessin impossible : l'image précédente reste
+            return
+        if generation == self._generation and self.widget.winfo_exists():
+            self._future = None
+            self._show(png)
+
+    def _show(self, png):
+        import tkinter as tk
+
+        self.image = tk.PhotoImage(master=self.widget, data=base64.b64encode(png))
+        self.widget.configure(image=self.image)
+
+    def export(self, path):
+        """Enregistre le graphique affiché (format d'après l'extension)."""
+        if self._data is not None:
+            self.renderer.export(self._spec(), path)
@@ -0,0 +1,199 @@
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from html import unescape
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from model import Record
+from tmdb import TTLCache
+
+_TITLE = re.compile(rb"<title[^>]*>(.*?)</title", re.IGNORECASE | re.DOTALL)
+
+
+class LinkStatus(Record):
+    __slots__ = ("url", "status", "final_url", "title", "error")
+
+    def __init__(self, url: str, status: int = 0, final_url: str = "", title: str = "", error: str = ""):
+        self.url = url
+        self.status = status  # code HTTP, 0 si pas de réponse
+        self.final_url = final_url  # après redirections
+        self.title = title  # <title> de la page HTML
+        self.error = error
+
+    @property
+    def ok(self):
+        return 200 <= self.status < 400
+
+    @property
+    def redirected(self):
+        return bool(self.final_url) and self.final_url.rstrip("/") != self.url.rstrip("/")
+
+
+class LinkChecker:
+    """Vérifie des liens : code HTTP, URL finale et titre de la page.
+
+    Pool de `workers` threads partageant une session HTTP (connexions
+    gardées par hôte) ; par hôte, au plus `per_host` requêtes en même temps
+    et une nouvelle toutes les `interval` secondes. Une seule requête GET
+    par lien, dont on ne lit que les `max_bytes` premiers octets des pages
+    HTML pour le titre. Résultats en cache LRU+TTL, erreurs comprises.
+    """
+
+    def __init__(self, timeout=(3.05, 5), workers=8, per_host=2, interval=0.2, max_bytes=65536,
+                 cache=None):
+        self.timeout = timeout
+        self.per_host = per_host
+        self.interval = interval
+        self.max_bytes = max_bytes
+        self.cache = cache if cache is not None else TTLCache(maxsize=1024, ttl=900)
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = "Apperso (vérification des liens)"
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=per_host)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="links")
+        self._hosts = {}  # hôte -> [sémaphore, heure de la prochaine requête permise]
+        self._lock = threading.Lock()
+
+    def _wait_turn(self, host):
+        # Réserve un créneau pour `host` et renvoie son sémaphore, à relâcher après la requête
+        with self._lock:
+            slot = self._hosts.get(host)
+            if slot is None:
+                slot = self._hosts[host] = [threading.BoundedSemaphore(self.per_host), 0.0]
+        slot[0].acquire()
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, slot[1])
+            slot[1] = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+        return slot[0]
+
+    def check(self, url):
+        """État du lien `url` ; bloquant, à appeler hors du thread Tk."""
+        status = self.cache.get(url)
+        if status is not None:
+            return status
+        try:
+            semaphore = self._wait_turn(urlsplit(url).netloc.lower())
+            try:
+                r = self.session.get(url, timeout=self.timeout, stream=True, allow_redirects=True)
+                try:
+                    title = self._title(r) if "html" in r.headers.get("Content-Type", "") else ""
+                finally:
+                    r.close()
+            finally:
+                semaphore.release()
+            status = LinkStatus(url, r.status_code, r.url, title)
+        except requests.Timeout:
+            status = LinkStatus(url, error="délai dépassé")
+        except requests.ConnectionError:
+            status = LinkStatus(url, error="connexion impossible")
+        except (requests.exceptions.InvalidURL, requests.exceptions.MissingSchema,
+                requests.exceptions.InvalidSchema):
+            status = LinkStatus(url, error="URL non valide")
+        except (requests.RequestException, ValueError) as exc:
+            status = LinkStatus(url, error=str(exc) or type(exc).__name__)
+        self.cache.put(url, status)
+        return status
+
+    def _title(self, response):
+        head = b""
+        for chunk in response.iter_content(8192):
+            head += chunk
+            match = _TITLE.search(head)
+            if match:
+                text = match.group(1).decode(response.encoding or "utf-8", errors="replace")
+                return " ".join(unescape(text).split())
+            if len(head) >= self.max_bytes:
+                break
+        return ""
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+
+
+class CheckAll:
+    """Vérifie des liens (clé, url) dans le pool de `checker`.
+
+    Chaque URL n'est vérifiée qu'une fois ; `on_result(clé, LinkStatus)` est
+    appelé sur le thread Tk au fur et à mesure des réponses, puis `on_done()`.
+    `broken` compte les URL en erreur de cette vérification.
+    """
+
+    def __init__(self, widget, checker, items, on_result, on_done=None, poll=50):
+        self.widget = widget
+        self.on_result = on_result
+        self.on_done = on_done
+        self.poll = poll
+        self.keys = {}  # url -> clés des liens qui la pointent
+        for key, url in items:
+            self.keys.setdefault(url, []).append(key)
+        self.total = len(self.keys)
+        self.done = 0
+        self.broken = 0
+        self._results = queue.SimpleQueue()
+        self._futures = [checker.executor.submit(self._check, checker, url) for url in self.keys]
+        self._after_id = widget.after(poll, self._drain)
+        self._bind_id = widget.bind("<Destroy>", lambda e: self._destroyed(), add="+")
+
+    def _check(self, checker, url):
+        try:
+            status = checker.check(url)
+        except Exception as exc:  # le compte des réponses doit aboutir
+            status = LinkStatus(url, error=str(exc) or type(exc).__name__)
+        self._results.put(status)
+
+    def _drain(self):
+        self._after_id = None
+        try:
+            while True:
+                status = self._results.get_nowait()
+                self.done += 1
+                if not status.ok:
+                    self.broken += 1
+                for key in self.keys[status.url]:
+                    self.on_result(key, status)
+        except queue.Empty:
+            pass
+        if self.done < self.total:
+            self._after_id = self.widget.after(self.poll, self._drain)
+            return
+        self._unbind()
+        if self.on_done is not None:
+            self.on_done()
+
+    def cancel(self):
+        self._unbind()
+        self._stop()
+
+    def _stop(self):
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+        for future in self._futures:
+            future.cancel()
+
+    def _destroyed(self):
+        # Les liaisons partent avec le widget ; reste la commande Tcl
+        self.widget.deletecommand(self._bind_id)
+        self._bind_id = None
+        self._stop()
+
+    def _unbind(self):
+        # unbind(séquence, id) retire tous les gestionnaires de la séquence
+        # avant Python 3.13 : on ne retire que la ligne du nôtre
+        if self._bind_id is None:
+            return
+        script = self.widget.bind("<Destroy>")
+        self.widget.bind("<Destroy>", "\n".join(
+            line for line in script.split("\n") if self._bind_id not in line))
+        self.widget.deletecommand(self._bind_id)
+        self._bind_id = None
@@ -0,0 +1,8 @@
+"""Données de l'application, utilisables sans affichage (voir benchmarks/bench_model.py)."""
+from .agenda import REPEATS, AgendaStore, occurrences
+from .aggregates import Aggregate
+from .autosave import Autosave
+from .records import Event, Film, Link, Record, RecurringEvent, Stat, Task
+from .search import Hit, SearchIndex, fold, tokenize
+from .storage import JsonStorage, ShardedStorage, SqliteStorage, Storage, open_storage
+from .stores import Model, RecordStore, open_model
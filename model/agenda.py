@@ -0,0 +1,137 @@
+import heapq
+from itertools import repeat
+from calendar import monthrange
+from datetime import date as Date, timedelta
+
+from .records import Event, RecurringEvent
+
+# Règle de récurrence -> (jours, mois) entre deux occurrences
+REPEATS = {
+    "daily": (1, 0),
+    "weekly": (7, 0),
+    "monthly": (0, 1),
+    "yearly": (0, 12),
+}
+
+
+def occurrences(rule, start, end):
+    """Dates (AAAA-MM-JJ) de `rule` de `start` à `end` inclus, produites à la demande.
+
+    On saute directement à la première occurrence de la période : le coût
+    ne dépend que du nombre d'occurrences rendues, pas de l'ancienneté de
+    la règle. Un 31 ou un 29 février est sauté les mois qui n'en ont pas.
+    """
+    first = Date.fromisoformat(rule.date)
+    start = max(Date.fromisoformat(start), first)
+    end = Date.fromisoformat(end)
+    days, months = REPEATS[rule.repeat]
+    if days:
+        current = first + timedelta(days=-(-(start - first).days // days) * days)
+        while current <= end:
+            yield current.isoformat()
+            current += timedelta(days=days)
+        return
+    k = ((start.year - first.year) * 12 + start.month - first.month) // months
+    while True:
+        year, month = divmod(first.month - 1 + k * months, 12)
+        year, month = first.year + year, month + 1
+        if (year, month) > (end.year, end.month):
+            return
+        k += 1
+        if first.day > monthrange(year, month)[1]:
+            continue
+        current = Date(year, month, first.day)
+        if current > end:
+            return
+        if current >= start:
+            yield current.isoformat()
+
+
+class AgendaStore:
+    """Évènements de l'agenda : ponctuels et récurrents.
+
+    Les ponctuels sont adressés par date puis position dans la journée et
+    lus par période dans l'index trié du stockage. Les récurrents sont des
+    règles (`RecurringEvent`) développées seulement sur la période demandée.
+    """
+
+    def __init__(self, storage, recurring, search=None):
+        self.storage = storage
+        self.recurring = recurring  # RecordStore des RecurringEvent
+        self.search = search  # une journée = un document de la recherche globale
+        self._rules = None  # (version, règles) : relues quand la liste a changé
+
+    def _reindex(self, date):
+        if self.search is None or not self.search.live:
+            return
+        texts = self.storage.events_on(date)
+        if texts:
+            self.search.put(("agenda_events", date), [", ".join(texts)])
+        else:
+            self.search.remove(("agenda_events", date))
+
+    def documents(self):
+        # Une journée par document, pour SearchIndex.build
+        days = {}
+        for date, text in self.storage.events_between("", "9999-12-31"):
+            days.setdefault(date, []).append(text)
+        return ((("agenda_events", date), [", ".join(texts)]) for date, texts in days.items())
+
+    def rules(self):
+        version = self.storage.version("recurring_events")
+        if self._rules is None or self._rules[0] != version:
+            self._rules = (version, self.recurring.items())
+        return self._rules[1]
+
+    def between(self, start, end):
+        """Évènements de `start` à `end` inclus (AAAA-MM-JJ), triés par date.
+
+        Le même jour, les ponctuels viennent d'abord, puis les récurrents
+        dans l'ordre de création : `delete` compte les positions ainsi.
+        """
+        once = self.storage.events_between(start, end)
+        repeated = [zip(occurrences(rule, start, end), repeat(rule.text)) for _, rule in self.rules()]
+        return [Event(date, text) for date, text in heapq.merge(once, *repeated, key=lambda e: e[0])]
+
+    def on(self, date):
+        return self.between(date, date)
+
+    def upcoming(self, days=7, today=None):
+        today = today or Date.today()
+        return self.between(today.isoformat(), (today + timedelta(days=days - 1)).isoformat())
+
+    def next_date(self, key, today=None):
+        """Prochaine occurrence de la règle `key` (sa première date si elle est passée)."""
+        rule = self.recurring.get(key)
+        today = (today or Date.today()).isoformat()
+        return next(occurrences(rule, today, "9999-12-31"), rule.date)
+
+    def month(self, year, month):
+        """{date: [textes]} des jours occupés du mois, pour le calendrier."""
+        last = monthrange(year, month)[1]
+        days = {}
+        for e in self.between(f"{year:04d}-{month:02d}-01", f"{year:04d}-{month:02d}-{last:02d}"):
+            days.setdefault(e.date, []).append(e.text)
+        return days
+
+    def add(self, event, repeat=""):
+        if repeat:
+            self.recurring.add(RecurringEvent(event.date, event.text, repeat))
+        else:
+            self.storage.add_event(event.date, event.text)
+            self._reindex(event.date)
+
+    def is_recurring(self, date, index):
+        """Vrai si le `index`-ième évènement de `on(date)` vient d'une règle."""
+        return index >= len(self.storage.events_on(date))
+
+    def delete(self, date, index):
+        """Supprime le `index`-ième évènement de `on(date)` ; pour un
+        récurrent, c'est la règle entière qui disparaît."""
+        once = len(self.storage.events_on(date))
+        if index < once:
+            self.storage.delete_event(date, index)
+            self._reindex(date)
+            return
+        keys = [key for key, rule in self.rules() if any(occurrences(rule, date, date))]
+        self.recurring.delete(keys[index - once])
@@ -0,0 +1,85 @@
+class Aggregate:
+    """Nombre d'éléments (et somme de `value`) par valeur du champ `by`.
+
+    Initialisé par `reset` avec un GROUP BY du stockage, puis tenu à jour
+    par le `RecordStore` à chaque ajout, modification et suppression : lire
+    `counts`, `sums`, `count` ou `total` ne parcourt jamais la liste.
+    `reset` peut aussi recevoir la fonction qui fait le GROUP BY : elle
+    n'est appelée qu'à la première lecture.
+    """
+
+    def __init__(self, by, value=None):
+        self.by = by
+        self.value = value
+        self._counts = {}
+        self._sums = {}
+        self._count = 0
+        self._total = 0.0
+        self._groups = None  # GROUP BY pas encore fait
+
+    def reset(self, groups):
+        # groups : {groupe: (nombre, somme)}, ou fonction qui les renvoie
+        if callable(groups):
+            self._groups = groups
+            return
+        self._groups = None
+        self._counts = {group: n for group, (n, _) in groups.items()}
+        self._sums = {group: total for group, (_, total) in groups.items()} if self.value else {}
+        self._count = sum(self._counts.values())
+        self._total = float(sum(self._sums.values()))
+
+    def _ready(self):
+        if self._groups is not None:
+            self.reset(self._groups())
+
+    @property
+    def counts(self):
+        self._ready()
+        return self._counts
+
+    @property
+    def sums(self):
+        self._ready()
+        return self._sums
+
+    @property
+    def count(self):
+        self._ready()
+        return self._count
+
+    @property
+    def total(self):
+        self._ready()
+        return self._total
+
+    def add(self, record):
+        # Pas encore calculé : le GROUP BY à venir verra déjà la modification
+        if self._groups is not None:
+            return
+        group = getattr(record, self.by)
+        self._counts[group] = self._counts.get(group, 0) + 1
+        self._count += 1
+        if self.value:
+            value = getattr(record, self.value)
+            self._sums[group] = self._sums.get(group, 0.0) + value
+            self._total += value
+
+    def remove(self, record):
+        if self._groups is not None:
+            return
+        group = getattr(record, self.by)
+        self._count -= 1
+        if self._counts[group] > 1:
+            self._counts[group] -= 1
+            if self.value:
+                value = getattr(record, self.value)
+                self._sums[group] -= value
+                self._total -= value
+            return
+        # Dernier élément du groupe : on repart de zéro plutôt que d'accumuler
+        # les erreurs d'arrondi
+        del self._counts[group]
+        if self.value:
+            self._total -= self._sums.pop(group)
+            if not self._count:
+                self._total = 0.0
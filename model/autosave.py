@@ -0,0 +1,81 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Autosave:
+    """Sauvegarde en arrière-plan, après un moment sans modification.
+
+    Chaque modification du stockage note l'heure (`Storage.on_change`).
+    `delay` secondes après la dernière, ou `max_delay` après la première
+    non sauvegardée si les modifications ne s'arrêtent pas,
+    `Storage.checkpoint` prépare l'écriture sur le thread appelant et elle
+    se fait sur un thread à part, une écriture à la fois. Les réveils passent par
+    `after(ms, fonction)` et `after_cancel(id)`, ceux de Tk dans l'appli.
+    """
+
+    def __init__(self, storage, after, after_cancel, delay=2.0, max_delay=10.0):
+        self.storage = storage
+        self.after = after
+        self.after_cancel = after_cancel
+        self.delay = delay
+        self.max_delay = max_delay
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="autosave")
+        self.future = None  # écriture en cours
+        self.error = None  # échec de la dernière écriture, retentée au réveil suivant
+        self._first = self._last = None  # première et dernière modification non sauvegardées
+        self._timer = None
+        storage.on_change = self.changed
+
+    def changed(self, store=None):
+        # Appelé à chaque modification : pas plus qu'un relevé d'heure
+        now = time.monotonic()
+        if self._first is None:
+            self._first = now
+        self._last = now
+        if self._timer is None:
+            self._schedule(self.delay)
+
+    def _schedule(self, seconds):
+        self._timer = self.after(max(int(seconds * 1000), 1), self._wake)
+
+    def _wake(self):
+        self._timer = None
+        if self.future is not None:
+            if not self.future.done():
+                self._schedule(self.delay)
+                return
+            self.error = self.future.exception()
+            self.future = None
+            if self.error is not None:
+                self.changed()  # on retentera
+                return
+        if self._first is None:
+            return
+        wait = min(self._last + self.delay, self._first + self.max_delay) - time.monotonic()
+        if wait > 0:
+            self._schedule(wait)
+            return
+        if self.storage.batching:  # lot en cours : on attend sa fin
+            self._schedule(self.delay)
+            return
+        self._first = self._last = None
+        write = self.checkpoint()
+        if write is not None:
+            self.future = self.executor.submit(self.write, write)
+            self._schedule(self.delay)  # pour relever le résultat
+
+    def checkpoint(self):
+        # Thread appelant ; méthode à part pour pouvoir la chronométrer
+        return self.storage.checkpoint()
+
+    def write(self, write):
+        # Thread de sauvegarde
+        write()
+
+    def close(self):
+        """Attend l'écriture en cours ; le reste est déjà dans le journal."""
+        if self._timer is not None:
+            self.after_cancel(self._timer)
+            self._timer = None
+        self.storage.on_change = None
+        self.executor.shutdown(wait=True)
@@ -0,0 +1,100 @@
+class Record:
+    """Base des enregistrements : champs dans `__slots__`, égalité par valeur.
+
+    Un enregistrement se traite comme une valeur : pour le modifier, `replace`
+    en renvoie une copie (les listes affichées comparent ancienne et nouvelle
+    valeur pour savoir quoi redessiner).
+    """
+
+    __slots__ = ()
+    SEARCH = ()  # champs indexés par la recherche globale, le titre d'abord
+
+    @classmethod
+    def from_value(cls, value):
+        # Valeur du stockage : dict (films, stats) ou tuple dans l'ordre des champs
+        if isinstance(value, dict):
+            return cls(**value)
+        return cls(*value)
+
+    def astuple(self):
+        return tuple(getattr(self, field) for field in self.__slots__)
+
+    def asdict(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def search_fields(self):
+        return [getattr(self, field) for field in self.SEARCH]
+
+    def replace(self, **changes):
+        return type(self)(**{**self.asdict(), **changes})
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.astuple() == other.astuple()
+
+    def __hash__(self):
+        return hash(self.astuple())
+
+    def __repr__(self):
+        fields = ", ".join(f"{field}={getattr(self, field)!r}" for field in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class Task(Record):
+    __slots__ = ("text", "status")
+    SEARCH = ("text",)
+
+    def __init__(self, text: str, status: str = ""):
+        self.text = text
+        self.status = status
+
+
+class Event(Record):
+    __slots__ = ("date", "text")
+
+    def __init__(self, date: str, text: str):
+        self.date = date  # AAAA-MM-JJ
+        self.text = text
+
+
+class Link(Record):
+    __slots__ = ("title", "url", "desc")
+    SEARCH = ("title", "url", "desc")
+
+    def __init__(self, title: str, url: str, desc: str = ""):
+        self.title = title
+        self.url = url
+        self.desc = desc
+
+
+class Stat(Record):
+    __slots__ = ("title", "value", "color", "date")
+    SEARCH = ("title",)
+
+    def __init__(self, title: str, value: float, color: str, date: str = ""):
+        self.title = title
+        self.value = value
+        self.color = color
+        self.date = date  # AAAA-MM-JJ
+
+
+class Film(Record):
+    __slots__ = ("title", "status", "tmdb_id", "poster")
+    SEARCH = ("title",)
+
+    def __init__(self, title: str, status: str = "Neutre", tmdb_id: int = 0, poster: str = ""):
+        self.title = title
+        self.status = status
+        self.tmdb_id = tmdb_id  # 0 si le film ne vient pas d'une suggestion TMDb
+        self.poster = poster  # chemin de l'affiche chez TMDb, ex. "/abc.jpg"
+
+
+class RecurringEvent(Record):
+    __slots__ = ("date", "text", "repeat")
+    SEARCH = ("text",)
+
+    def __init__(self, date: str, text: str, repeat: str):
+        self.date = date  # première occurrence, AAAA-MM-JJ
+        self.text = text
+        self.repeat = repeat  # voir model.agenda.REPEATS
@@ -0,0 +1,167 @@
+import heapq
+import math
+import re
+import unicodedata
+from bisect import bisect_left, insort
+
+from .records import Record
+
+TITLE_WEIGHT = 2.0  # poids des mots du premier champ (titre, texte)
+PREFIX_WEIGHT = 0.5  # un mot qui commence par le terme compte moitié
+MIN_PREFIX = 2  # en dessous, seul le mot exact est cherché
+
+
+_WORD = re.compile(r"\w+")
+_ACCENTS = re.compile("[\u0300-\u036f]")  # diacritiques combinants (é -> e + ´)
+
+
+def tokenize(text):
+    """Mots en minuscules sans accents."""
+    text = text.casefold()
+    if not text.isascii():
+        text = _ACCENTS.sub("", unicodedata.normalize("NFKD", text))
+    return _WORD.findall(text)
+
+
+def fold(text):
+    """Mots en minuscules sans accents, séparés par une espace."""
+    return " ".join(tokenize(text))
+
+
+class Hit(Record):
+    __slots__ = ("store", "key", "label", "score")
+
+    def __init__(self, store: str, key, label: str, score: float):
+        self.store = store
+        self.key = key
+        self.label = label
+        self.score = score
+
+
+class SearchIndex:
+    """Index inversé de la recherche globale.
+
+    Un document est identifié par (liste, clé) et décrit par ses champs
+    texte, le premier servant de libellé. Le vocabulaire est gardé trié pour
+    trouver par dichotomie les mots commençant par un terme. `put` et
+    `remove` ne touchent que les mots du document concerné.
+    """
+
+    def __init__(self):
+        self.postings = {}  # mot -> {document: poids}
+        self.vocabulary = []  # mots triés
+        self.docs = {}  # document -> (libellé, mots)
+        self.ready = False
+        self.building = False
+        self._touched = set()  # documents modifiés pendant la construction
+
+    @property
+    def live(self):
+        """Vrai dès que la construction a commencé : les modifications doivent suivre."""
+        return self.ready or self.building
+
+    def clear(self):
+        self.postings.clear()
+        self.vocabulary.clear()
+        self.docs.clear()
+        self.ready = self.building = False
+
+    def build(self, docs, chunk=2000):
+        """Indexe des paires (document, champs), par tranches : chaque pas
+        du générateur indexe `chunk` documents. Le vocabulaire n'est trié
+        qu'à la fin ; un document modifié entre-temps par `put` ou `remove`
+        garde sa version la plus récente."""
+        self.clear()
+        self.building = True
+        self._touched = set()
+        for i, (doc, fields) in enumerate(docs, 1):
+            if doc not in self._touched:
+                self._put(doc, fields, sort=False)
+            if i % chunk == 0:
+                yield
+        self.vocabulary = sorted(self.postings)
+        self._touched = set()
+        self.building = False
+        self.ready = True
+
+    def put(self, doc, fields):
+        if doc in self.docs:
+            self.remove(doc)
+        if self.building:
+            self._touched.add(doc)
+        self._put(doc, fields, sort=not self.building)
+
+    def _put(self, doc, fields, sort):
+        weights = {}
+        for i, text in enumerate(fields):
+            weight = TITLE_WEIGHT if i == 0 else 1.0
+            for token in tokenize(text):
+                weights[token] = weights.get(token, 0.0) + weight
+        postings = self.postings
+        for token, weight in weights.items():
+            posting = postings.get(token)
+            if posting is None:
+                posting = postings[token] = {}
+                if sort:
+                    insort(self.vocabulary, token)
+            posting[doc] = weight
+        self.docs[doc] = (fields[0], tuple(weights))
+
+    def remove(self, doc):
+        if self.building:
+            self._touched.add(doc)
+        entry = self.docs.pop(doc, None)
+        if entry is None:
+            return
+        for token in entry[1]:
+            posting = self.postings[token]
+            del posting[doc]
+            if not posting:
+                del self.postings[token]
+                if not self.building:
+                    del self.vocabulary[bisect_left(self.vocabulary, token)]
+
+    def _matches(self, term):
+        # (postings, facteur) des mots égaux au terme ou commençant par lui
+        if len(term) < MIN_PREFIX:
+            posting = self.postings.get(term)
+            return [(posting, 1.0)] if posting else []
+        matches = []
+        i = bisect_left(self.vocabulary, term)
+        while i < len(self.vocabulary) and self.vocabulary[i].startswith(term):
+            token = self.vocabulary[i]
+            matches.append((self.postings[token], 1.0 if token == term else PREFIX_WEIGHT))
+            i += 1
+        return matches
+
+    def search(self, query, limit=20):
+        """Documents contenant tous les termes (ou des mots qui en commencent
+        par eux), classés par poids × idf."""
+        terms = sorted(set(tokenize(query)), key=len, reverse=True)  # les plus sélectifs d'abord
+        if not terms:
+            return []
+        n = len(self.docs)
+        scores = None
+        for term in terms:
+            term_scores = {}
+            for posting, factor in self._matches(term):
+                factor *= math.log(1 + n / len(posting))  # idf du mot
+                if scores is not None:
+                    # Seuls les documents retenus par les termes précédents
+                    docs = posting.keys() & scores.keys()
+                    found = {doc: posting[doc] * factor for doc in docs}
+                else:
+                    found = {doc: weight * factor for doc, weight in posting.items()}
+                if not term_scores:
+                    term_scores = found
+                    continue
+                # Plusieurs mots commencent par le terme : on garde le meilleur
+                get = term_scores.get
+                term_scores.update({doc: score for doc, score in found.items() if score > get(doc, 0.0)})
+            if scores is not None:
+                term_scores = {doc: scores[doc] + score for doc, score in term_scores.items()}
+            scores = term_scores
+            if not scores:
+                return []
+        best = heapq.nlargest(limit, scores, key=scores.__getitem__)
+        return [Hit(doc[0], doc[1], self.docs[doc][0], scores[doc]) for doc in best]
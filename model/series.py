@@ -0,0 +1,40 @@
+"""Séries temporelles des statistiques, avec NumPy.
+
+Importé à la demande par l'écran Statistiques (NumPy est chargé avec
+matplotlib), d'où son absence de `model/__init__`.
+"""
+import numpy as np
+
+# Période -> libellé affiché
+PERIODS = {"day": "jour", "week": "semaine", "month": "mois"}
+
+
+def totals(sums, period="day"):
+    """(dates, totaux) par jour, semaine (du lundi) ou mois, à partir des
+    sommes par jour {AAAA-MM-JJ: somme} ; les périodes sans dépense valent 0.
+
+    `dates` est un tableau datetime64[D] (début de chaque période).
+    """
+    dated = {day: total for day, total in sums.items() if day}
+    if not dated:
+        return np.array([], dtype="datetime64[D]"), np.array([], dtype=float)
+    days = np.array(list(dated), dtype="datetime64[D]")
+    values = np.fromiter(dated.values(), dtype=float, count=len(dated))
+    if period == "month":
+        starts = days.astype("datetime64[M]")
+    elif period == "week":
+        # Le 1970-01-01 (jour 0) est un jeudi : lundi = jour - (jour + 3) % 7
+        starts = days - (days.astype(np.int64) + 3) % 7
+    else:
+        starts = days
+    first = starts.min()
+    if period == "week":
+        index = (starts - first).astype(np.int64) // 7
+    else:
+        index = (starts - first).astype(np.int64)
+    y = np.bincount(index, weights=values)
+    if period == "month":
+        x = (first + np.arange(len(y))).astype("datetime64[D]")
+    else:
+        x = first + np.arange(len(y)) * (7 if period == "week" else 1)
+    return x, y
@@ -0,0 +1,815 @@
+import json
+import os
+import shutil
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+import sqlite3
+from bisect import bisect_left, bisect_right, insort
+from datetime import date as Date
+
+
+# Colonnes de chaque liste ; films et stats sont des dicts, les autres des tuples
+TABLES = {
+    "todo_tasks": ("text", "status"),
+    "web_links": ("title", "url", "desc"),
+    "stats": ("title", "value", "color", "date"),
+    "films": ("title", "status", "tmdb_id", "poster"),
+    "recurring_events": ("date", "text", "repeat"),
+}
+DICT_STORES = ("stats", "films")
+# Liste -> fichier de la section qui l'affiche (ShardedStorage)
+SHARDS = {
+    "todo_tasks": "todo",
+    "agenda_events": "agenda",
+    "recurring_events": "agenda",
+    "web_links": "links",
+    "stats": "stats",
+    "films": "films",
+}
+
+
+def open_storage(path="app_data.db", sharded=False):
+    """Choisit le backend d'après l'extension, ou un dossier avec un fichier
+    par section si `sharded` ; migre l'ancien JSON vers SQLite."""
+    if sharded:
+        return ShardedStorage(path)
+    if path.endswith(".json"):
+        return JsonStorage(path)
+    legacy_path = os.path.splitext(path)[0] + ".json"
+    fresh = not os.path.exists(path)
+    storage = SqliteStorage(path)
+    if fresh and os.path.exists(legacy_path):
+        legacy = JsonStorage(legacy_path)
+        legacy.load({})
+        storage.import_data(legacy.data)
+        legacy.close()
+    return storage
+
+
+class Storage(ABC):
+    """Interface commune aux backends de stockage.
+
+    Chaque élément d'une liste (`TABLES`) a une clé entière stable, rendue
+    par `add` ; `items` renvoie des paires (clé, valeur) dans l'ordre d'ajout.
+    L'agenda est adressé par date puis par position dans la journée.
+    `version(store)` augmente à chaque modification (« settings » pour les
+    réglages), pour savoir si une vue affichée plus tôt est périmée.
+    """
+
+    def __init__(self):
+        self.versions = {}
+        self.batching = 0  # profondeur des lots en cours
+        self.on_change = None  # appelé avec le nom de la liste à chaque modification (Autosave)
+
+    @contextmanager
+    def batch(self):
+        """Regroupe des modifications : une transaction pour SQLite, une
+        écriture du journal pour JSON. Ce qui a été appliqué est gardé
+        même si le lot s'interrompt."""
+        self.begin_batch()
+        try:
+            yield
+        finally:
+            self.end_batch()
+
+    def begin_batch(self):
+        self.batching += 1
+
+    def end_batch(self):
+        self.batching -= 1
+        if not self.batching:
+            self.flush()
+
+    def flush(self):
+        pass
+
+    def version(self, store):
+        return self.versions.get(store, 0)
+
+    def touch(self, store):
+        self.versions[store] = self.versions.get(store, 0) + 1
+        if self.on_change is not None:
+            self.on_change(store)
+
+    def checkpoint(self):
+        """Renvoie l'écriture qui rend les dernières modifications durables
+        (instantané, fsync du journal, report du WAL), à appeler sur un
+        autre thread ; None si rien à écrire. Une seule écriture à la fois."""
+        return None
+
+    @abstractmethod
+    def load(self, settings):
+        """Ouvre le stockage et renvoie les réglages, `settings` servant de défauts."""
+
+    @abstractmethod
+    def set_setting(self, key, value):
+        ...
+
+    @abstractmethod
+    def items(self, store):
+        ...
+
+    @abstractmethod
+    def get(self, store, key):
+        ...
+
+    @abstractmethod
+    def add(self, store, value):
+        ...
+
+    @abstractmethod
+    def update(self, store, key, value):
+        ...
+
+    @abstractmethod
+    def delete(self, store, key):
+        ...
+
+    @abstractmethod
+    def with_status(self, store, status):
+        ...
+
+    @abstractmethod
+    def count_by(self, store, column):
+        ...
+
+    @abstractmethod
+    def between(self, store, column, start, end):
+        """Paires (clé, valeur) dont `column` va de `start` à `end` inclus."""
+
+    @abstractmethod
+    def group_by(self, store, column, value=None):
+        """{valeur de `column`: (nombre, somme de `value`)} ; somme 0 sans `value`."""
+
+    @abstractmethod
+    def events_on(self, date):
+        ...
+
+    @abstractmethod
+    def events_between(self, start, end):
+        """Évènements de `start` à `end` inclus, triés : liste de (date, texte)."""
+
+    @abstractmethod
+    def add_event(self, date, text):
+        ...
+
+    @abstractmethod
+    def delete_event(self, date, index):
+        ...
+
+    def save(self):
+        pass
+
+    def close(self):
+        pass
+
+
+# ---------- Journal ----------
+def apply_record(data, record):
+    """Rejoue une entrée du journal sur le dictionnaire de données."""
+    op = record["op"]
+    if op == "set":
+        data[record["key"]] = record["value"]
+        return
+    if record["store"] == "agenda_events":  # une liste par date
+        events = data["agenda_events"].setdefault(record["key"], [])
+        if op == "add":
+            events.append(record["value"])
+        elif op == "delete":
+            events.pop(record["index"])
+            if not events:
+                del data["agenda_events"][record["key"]]
+        return
+    store = data[record["store"]]
+    if op == "add":
+        key = record.get("id", data["next_id"])
+        store[key] = record["value"]
+        data["next_id"] = max(data["next_id"], key + 1)
+        return
+    # Les journaux antérieurs aux clés désignent l'élément par sa position
+    key = record["id"] if "id" in record else list(store)[record["index"]]
+    if op == "update":
+        store[key] = record["value"]
+    elif op == "delete":
+        del store[key]
+
+
+class JournalStore:
+    """Instantané JSON + journal en ajout seul (une ligne JSON par modification).
+
+    Chaque modification coûte l'écriture d'une ligne ; l'instantané complet
+    n'est réécrit qu'à la compaction, tous les `compact_every` enregistrements.
+
+    Le journal est découpé en segments numérotés (une ligne « segment » en
+    tête) et l'instantané note le numéro du premier segment qu'il ne
+    contient pas : `rotate` met le segment courant de côté (`.journal.old`)
+    et l'instantané peut s'écrire pendant que le suivant se remplit. Au
+    chargement, seuls les segments plus récents que l'instantané sont rejoués.
+    """
+
+    def __init__(self, path="app_data.json", compact_every=1000, on_snapshot=None):
+        self.path = path
+        self.journal_path = os.path.splitext(path)[0] + ".journal"
+        self.old_path = self.journal_path + ".old"
+        self.compact_every = compact_every
+        self.on_snapshot = on_snapshot  # appelé avant de rejouer le journal
+        self.pending = 0  # enregistrements depuis le dernier instantané
+        self.generation = 0  # numéro du segment courant
+        self.buffered = False  # pendant un lot : une seule écriture à la fin
+        self.synced = True  # journal sur disque (fsync) depuis le dernier ajout
+        self._journal = None
+
+    def load(self, defaults):
+        data = {k: v.copy() if isinstance(v, (list, dict)) else v for k, v in defaults.items()}
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                data.update(json.load(f))
+        self.generation = data.pop("generation", 0)
+        if self.on_snapshot is not None:
+            self.on_snapshot(data)
+        self.pending = 0
+        # Un .old restant est un segment dont l'instantané n'a pas abouti
+        since = self.generation
+        for path in (self.old_path, self.journal_path):
+            self._replay(path, data, since)
+        return data
+
+    def _replay(self, path, data, since):
+        if not os.path.exists(path):
+            return
+        with open(path, "rb+") as f:
+            good = 0
+            generation = 0  # journaux d'avant les segments
+            for line in f:
+                # Une ligne sans fin de ligne n'a pas fini d'être écrite, même
+                # si elle se lit : la suivante serait écrite à sa suite
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                good += len(line)
+                if record["op"] == "segment":
+                    generation = record["generation"]
+                    self.generation = max(self.generation, generation)
+                elif generation >= since:
+                    apply_record(data, record)
+                    self.pending += 1
+            # Dernière ligne tronquée par un crash : on la retire
+            f.truncate(good)
+
+    def _write(self, record):
+        self._journal.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    def append(self, record):
+        if self._journal is None:
+            self._journal = open(self.journal_path, "a", encoding="utf-8")
+            if not self._journal.tell():  # nouveau segment
+                self._write({"op": "segment", "generation": self.generation})
+        self._write(record)
+        if not self.buffered:
+            self._journal.flush()
+        self.pending += 1
+        self.synced = False
+
+    def flush(self):
+        if self._journal is not None:
+            self._journal.flush()
+
+    def needs_compaction(self):
+        return self.pending >= self.compact_every
+
+    def needs_snapshot(self):
+        # Compaction due, ou segment resté de côté par une écriture échouée
+        return self.needs_compaction() or os.path.exists(self.old_path)
+
+    def sync(self):
+        """Renvoie le fsync du journal, à lancer sur un autre thread ; None
+        s'il est déjà sur disque."""
+        if self.synced or self._journal is None:
+            return None
+        self._journal.flush()
+        self.synced = True
+        # Descripteur à part : le journal peut être fermé par `rotate` entre-temps
+        fd = os.dup(self._journal.fileno())
+
+        def write():
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        return write
+
+    def rotate(self, data):
+        """Commence un nouveau segment et renvoie l'écriture de l'instantané
+        `data` (qui ne doit plus changer), à lancer sur un autre thread."""
+        self.close()
+        if os.path.exists(self.journal_path):
+            if os.path.exists(self.old_path):
+                # L'écriture précédente a échoué : son segment reste à couvrir
+                with open(self.journal_path, "rb") as src, open(self.old_path, "ab") as dst:
+                    shutil.copyfileobj(src, dst)
+                os.remove(self.journal_path)
+            else:
+                os.replace(self.journal_path, self.old_path)
+        self.generation += 1
+        self.pending = 0
+        self.synced = True  # l'instantané couvre tout
+        snapshot = {**data, "generation": self.generation}
+        return lambda: self._write_snapshot(snapshot)
+
+    def _write_snapshot(self, data):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        # Le segment mis de côté n'est retiré qu'une fois l'instantané en place
+        if os.path.exists(self.old_path):
+            os.remove(self.old_path)
+
+    def compact(self, data):
+        self.rotate(data)()
+
+    def close(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+
+class JsonStorage(Storage):
+    """Tout en mémoire, persisté par un `JournalStore`.
+
+    Chaque liste est un dict clé -> valeur ; `next_id` donne la prochaine clé.
+    """
+
+    EMPTY = {**{store: {} for store in TABLES}, "agenda_events": {}, "next_id": 1}
+
+    def __init__(self, path="app_data.json", compact_every=1000):
+        super().__init__()
+        self.journal = JournalStore(path, compact_every, on_snapshot=self._with_keys)
+        self.data = None
+        self.dates = []  # dates de l'agenda triées, pour les requêtes par période
+
+    def _with_keys(self, data):
+        # JSON n'a que des clés texte ; les anciens fichiers stockent des listes
+        for store in TABLES:
+            items = data[store]
+            if isinstance(items, list):
+                data[store] = dict(enumerate(items, start=data["next_id"]))
+                data["next_id"] += len(items)
+            else:
+                data[store] = {int(key): value for key, value in items.items()}
+
+    def load(self, settings):
+        self.data = self.journal.load({**settings, **self.EMPTY})
+        self.dates = sorted(self.data["agenda_events"])
+        # Stats d'avant les dates : datées du jour de la mise à jour, en
+        # mémoire seulement (écrit au prochain instantané)
+        today = Date.today().isoformat()
+        for value in self.data["stats"].values():
+            value.setdefault("date", today)
+        # Films d'avant TMDb : sans affiche, ce que disent les valeurs par défaut
+        for value in self.data["films"].values():
+            value.setdefault("tmdb_id", 0)
+            value.setdefault("poster", "")
+        return {key: self.data[key] for key in settings}
+
+    def begin_batch(self):
+        super().begin_batch()
+        self.journal.buffered = True
+
+    def flush(self):
+        self.journal.buffered = False
+        self.journal.flush()
+        self._compact_if_needed()
+
+    def _compact_if_needed(self):
+        # Avec une sauvegarde auto (on_change), c'est elle qui compacte, hors du thread Tk
+        if self.on_change is None and self.journal.needs_compaction():
+            self.save()
+
+    def checkpoint(self):
+        # Chaque modification est déjà dans le journal : un fsync suffit, et
+        # l'instantané complet n'est réécrit qu'à la compaction
+        if self.batching:
+            return None
+        if not self.journal.needs_snapshot():
+            return self.journal.sync()
+        # Copie superficielle : les valeurs sont remplacées, jamais modifiées,
+        # sauf les listes de l'agenda
+        snapshot = {key: value.copy() if isinstance(value, dict) else value for key, value in self.data.items()}
+        snapshot["agenda_events"] = {date: list(texts) for date, texts in self.data["agenda_events"].items()}
+        return self.journal.rotate(snapshot)
+
+    def log(self, op, store=None, **fields):
+        record = {"op": op, **fields}
+        if store is not None:
+            record["store"] = store
+        apply_record(self.data, record)
+        self.touch(store or "settings")
+        self.journal.append(record)
+        # Pendant un lot, la compaction attend la fin (voir flush)
+        if not self.batching:
+            self._compact_if_needed()
+
+    def set_setting(self, key, value):
+        self.log("set", key=key, value=value)
+
+    def items(self, store):
+        return list(self.data[store].items())
+
+    def get(self, store, key):
+        return self.data[store][key]
+
+    def add(self, store, value):
+        key = self.data["next_id"]
+        self.log("add", store, id=key, value=value)
+        return key
+
+    def update(self, store, key, value):
+        self.log("update", store, id=key, value=value)
+
+    def delete(self, store, key):
+        self.log("delete", store, id=key)
+
+    def _column(self, store, column):
+        if store in DICT_STORES:
+            return lambda item: item[column]
+        pos = TABLES[store].index(column)
+        return lambda item: item[pos]
+
+    def with_status(self, store, status):
+        column = self._column(store, "status")
+        return [(key, item) for key, item in self.data[store].items() if column(item) == status]
+
+    def count_by(self, store, column):
+        key = self._column(store, column)
+        counts = {}
+        for item in self.data[store].values():
+            value = key(item)
+            counts[value] = counts.get(value, 0) + 1
+        return counts
+
+    def between(self, store, column, start, end):
+        key = self._column(store, column)
+        return [(k, item) for k, item in self.data[store].items() if start <= key(item) <= end]
+
+    def group_by(self, store, column, value=None):
+        key = self._column(store, column)
+        amount = self._column(store, value) if value else None
+        groups = {}
+        for item in self.data[store].values():
+            group = key(item)
+            n, total = groups.get(group, (0, 0.0))
+            groups[group] = (n + 1, total + amount(item) if amount else total)
+        return groups
+
+    def events_on(self, date):
+        return self.data["agenda_events"].get(date, [])
+
+    def events_between(self, start, end):
+        events = self.data["agenda_events"]
+        dates = self.dates[bisect_left(self.dates, start):bisect_right(self.dates, end)]
+        return [(date, text) for date in dates for text in events[date]]
+
+    def add_event(self, date, text):
+        if date not in self.data["agenda_events"]:
+            insort(self.dates, date)
+        self.log("add", "agenda_events", key=date, value=text)
+
+    def delete_event(self, date, index):
+        self.log("delete", "agenda_events", key=date, index=index)
+        if date not in self.data["agenda_events"]:
+            del self.dates[bisect_left(self.dates, date)]
+
+    def save(self):
+        # Compaction : nouvel instantané complet, journal remis à zéro
+        self.journal.compact(self.data)
+
+    def close(self):
+        self.journal.close()
+
+
+class ShardedStorage(Storage):
+    """Un dossier, un `JsonStorage` par section (`SHARDS`).
+
+    Seul le manifeste (les réglages) est lu à l'ouverture ; le fichier d'une
+    section l'est au premier accès à l'une de ses listes. Le temps de
+    démarrage et la mémoire ne dépendent que des sections ouvertes.
+    """
+
+    def __init__(self, directory, compact_every=1000):
+        self.directory = directory
+        self.compact_every = compact_every
+        self.shards = {}  # section -> JsonStorage déjà lu
+        self.manifest = JsonStorage(os.path.join(directory, "manifest.json"), compact_every)
+        super().__init__()
+        self.manifest.versions = self.versions
+
+    @property
+    def on_change(self):
+        return self.manifest.on_change
+
+    @on_change.setter
+    def on_change(self, callback):
+        for storage in self._opened():
+            storage.on_change = callback
+
+    def _opened(self):
+        return [self.manifest, *self.shards.values()]
+
+    def _shard(self, store):
+        name = SHARDS[store]
+        shard = self.shards.get(name)
+        if shard is None:
+            shard = JsonStorage(os.path.join(self.directory, name + ".json"), self.compact_every)
+            shard.load({})
+            # Versions communes ; une section ouverte pendant un lot y entre aussi
+            shard.versions = self.versions
+            shard.on_change = self.on_change
+            for _ in range(self.batching):
+                shard.begin_batch()
+            self.shards[name] = shard
+        return shard
+
+    def load(self, settings):
+        os.makedirs(self.directory, exist_ok=True)
+        return self.manifest.load(settings)
+
+    def begin_batch(self):
+        super().begin_batch()
+        for storage in self._opened():
+            storage.begin_batch()
+
+    def end_batch(self):
+        for storage in self._opened():
+            storage.end_batch()
+        super().end_batch()
+
+    def checkpoint(self):
+        writes = [write for write in (storage.checkpoint() for storage in self._opened()) if write is not None]
+        if not writes:
+            return None
+
+        def write_all():
+            for write in writes:
+                write()
+        return write_all
+
+    def set_setting(self, key, value):
+        self.manifest.set_setting(key, value)
+
+    def items(self, store):
+        return self._shard(store).items(store)
+
+    def get(self, store, key):
+        return self._shard(store).get(store, key)
+
+    def add(self, store, value):
+        return self._shard(store).add(store, value)
+
+    def update(self, store, key, value):
+        self._shard(store).update(store, key, value)
+
+    def delete(self, store, key):
+        self._shard(store).delete(store, key)
+
+    def with_status(self, store, status):
+        return self._shard(store).with_status(store, status)
+
+    def count_by(self, store, column):
+        return self._shard(store).count_by(store, column)
+
+    def between(self, store, column, start, end):
+        return self._shard(store).between(store, column, start, end)
+
+    def group_by(self, store, column, value=None):
+        return self._shard(store).group_by(store, column, value)
+
+    def events_on(self, date):
+        return self._shard("agenda_events").events_on(date)
+
+    def events_between(self, start, end):
+        return self._shard("agenda_events").events_between(start, end)
+
+    def add_event(self, date, text):
+        self._shard("agenda_events").add_event(date, text)
+
+    def delete_event(self, date, index):
+        self._shard("agenda_events").delete_event(date, index)
+
+    def save(self):
+        for storage in self._opened():
+            storage.save()
+
+    def close(self):
+        for storage in self._opened():
+            storage.close()
+
+
+# ---------- SQLite ----------
+class SqliteStorage(Storage):
+    """Une table par liste, index sur les colonnes interrogées.
+
+    La clé d'un élément est son rowid ; rien n'est gardé en mémoire.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS todo_tasks (
+            id INTEGER PRIMARY KEY, "text" TEXT NOT NULL, "status" TEXT NOT NULL DEFAULT '');
+        CREATE INDEX IF NOT EXISTS todo_tasks_status ON todo_tasks ("status");
+        CREATE TABLE IF NOT EXISTS agenda_events (
+            id INTEGER PRIMARY KEY, "date" TEXT NOT NULL, "text" TEXT NOT NULL);
+        CREATE INDEX IF NOT EXISTS agenda_events_date ON agenda_events ("date", id);
+        CREATE TABLE IF NOT EXISTS web_links (
+            id INTEGER PRIMARY KEY, "title" TEXT NOT NULL, "url" TEXT NOT NULL, "desc" TEXT NOT NULL DEFAULT '');
+        CREATE TABLE IF NOT EXISTS stats (
+            id INTEGER PRIMARY KEY, "title" TEXT NOT NULL, "value" REAL NOT NULL, "color" TEXT NOT NULL,
+            "date" TEXT NOT NULL DEFAULT '');
+        CREATE TABLE IF NOT EXISTS films (
+            id INTEGER PRIMARY KEY, "title" TEXT NOT NULL, "status" TEXT NOT NULL DEFAULT 'Neutre',
+            "tmdb_id" INTEGER NOT NULL DEFAULT 0, "poster" TEXT NOT NULL DEFAULT '');
+        CREATE INDEX IF NOT EXISTS films_status ON films ("status");
+        CREATE TABLE IF NOT EXISTS recurring_events (
+            id INTEGER PRIMARY KEY, "date" TEXT NOT NULL, "text" TEXT NOT NULL, "repeat" TEXT NOT NULL);
+    """
+
+    def __init__(self, path="app_data.db"):
+        super().__init__()
+        self.path = path
+        self.conn = None
+
+    def _connect(self):
+        if self.conn is None:
+            self.conn = sqlite3.connect(self.path)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.executescript(self.SCHEMA)
+            self._migrate()
+        return self.conn
+
+    def _migrate(self):
+        # Colonnes ajoutées depuis la création de la base
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(stats)")}
+        if "date" not in columns:
+            with self.conn:
+                self.conn.execute("""ALTER TABLE stats ADD COLUMN "date" TEXT NOT NULL DEFAULT ''""")
+                # Stats d'avant les dates : datées du jour de la mise à jour
+                self.conn.execute('UPDATE stats SET "date" = ?', (Date.today().isoformat(),))
+        self.conn.execute('CREATE INDEX IF NOT EXISTS stats_date ON stats ("date")')
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(films)")}
+        if "tmdb_id" not in columns:
+            with self.conn:
+                self.conn.execute('ALTER TABLE films ADD COLUMN "tmdb_id" INTEGER NOT NULL DEFAULT 0')
+                self.conn.execute("""ALTER TABLE films ADD COLUMN "poster" TEXT NOT NULL DEFAULT ''""")
+
+    @contextmanager
+    def _write(self):
+        # Hors lot, chaque modification est sa propre transaction
+        if self.batching:
+            yield
+        else:
+            with self.conn:
+                yield
+
+    def flush(self):
+        self.conn.commit()
+
+    def checkpoint(self):
+        # Chaque modification est déjà validée ; on reporte le WAL dans la
+        # base depuis une connexion à part, pour que le report automatique
+        # n'arrive pas au milieu d'une modification
+        path = self.path
+
+        def write():
+            conn = sqlite3.connect(path)
+            try:
+                conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+            finally:
+                conn.close()
+        return write
+
+    def load(self, settings):
+        loaded = dict(settings)
+        for key, value in self._connect().execute("SELECT key, value FROM settings"):
+            if key in loaded:
+                loaded[key] = json.loads(value)
+        return loaded
+
+    def import_data(self, data):
+        conn = self._connect()
+        with conn:
+            for store in TABLES:
+                conn.executemany(
+                    f"INSERT INTO {store} (id, {self._cols(store)}) VALUES (?, {', '.join('?' * len(TABLES[store]))})",
+                    ([key] + self._row(store, value) for key, value in data[store].items()))
+            conn.executemany('INSERT INTO agenda_events ("date", "text") VALUES (?, ?)',
+                             ((date, text) for date, texts in data.get("agenda_events", {}).items()
+                              for text in texts))
+            conn.executemany("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                             ((k, json.dumps(v)) for k, v in data.items()
+                              if k not in TABLES and k not in ("agenda_events", "next_id")))
+
+    @staticmethod
+    def _cols(store):
+        return ", ".join(f'"{c}"' for c in TABLES[store])
+
+    @classmethod
+    def _insert_sql(cls, store):
+        return f"INSERT INTO {store} ({cls._cols(store)}) VALUES ({', '.join('?' * len(TABLES[store]))})"
+
+    @staticmethod
+    def _row(store, value):
+        if store in DICT_STORES:
+            return [value[c] for c in TABLES[store]]
+        return list(value)
+
+    @staticmethod
+    def _value(store, row):
+        if store in DICT_STORES:
+            return dict(zip(TABLES[store], row))
+        return tuple(row)
+
+    def set_setting(self, key, value):
+        with self._write():
+            self.conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                              (key, json.dumps(value)))
+        self.touch("settings")
+
+    def items(self, store):
+        rows = self.conn.execute(f"SELECT id, {self._cols(store)} FROM {store} ORDER BY id")
+        return [(row[0], self._value(store, row[1:])) for row in rows]
+
+    def get(self, store, key):
+        row = self.conn.execute(f"SELECT {self._cols(store)} FROM {store} WHERE id = ?", (key,)).fetchone()
+        return self._value(store, row)
+
+    def add(self, store, value):
+        with self._write():
+            key = self.conn.execute(self._insert_sql(store), self._row(store, value)).lastrowid
+        self.touch(store)
+        return key
+
+    def update(self, store, key, value):
+        assignments = ", ".join(f'"{c}" = ?' for c in TABLES[store])
+        with self._write():
+            self.conn.execute(f"UPDATE {store} SET {assignments} WHERE id = ?", self._row(store, value) + [key])
+        self.touch(store)
+
+    def delete(self, store, key):
+        with self._write():
+            self.conn.execute(f"DELETE FROM {store} WHERE id = ?", (key,))
+        self.touch(store)
+
+    def with_status(self, store, status):
+        rows = self.conn.execute(f'SELECT id, {self._cols(store)} FROM {store} WHERE "status" = ? ORDER BY id',
+                                 (status,))
+        return [(row[0], self._value(store, row[1:])) for row in rows]
+
+    def count_by(self, store, column):
+        return dict(self.conn.execute(f'SELECT "{column}", COUNT(*) FROM {store} GROUP BY "{column}"'))
+
+    def between(self, store, column, start, end):
+        rows = self.conn.execute(
+            f'SELECT id, {self._cols(store)} FROM {store} WHERE "{column}" BETWEEN ? AND ? ORDER BY id',
+            (start, end))
+        return [(row[0], self._value(store, row[1:])) for row in rows]
+
+    def group_by(self, store, column, value=None):
+        total = f'TOTAL("{value}")' if value else "0.0"
+        rows = self.conn.execute(f'SELECT "{column}", COUNT(*), {total} FROM {store} GROUP BY "{column}"')
+        return {group: (n, total) for group, n, total in rows}
+
+    def events_on(self, date):
+        return [r[0] for r in self.conn.execute(
+            'SELECT "text" FROM agenda_events WHERE "date" = ? ORDER BY id', (date,))]
+
+    def events_between(self, start, end):
+        return self.conn.execute(
+            'SELECT "date", "text" FROM agenda_events WHERE "date" BETWEEN ? AND ? ORDER BY "date", id',
+            (start, end)).fetchall()
+
+    def add_event(self, date, text):
+        with self._write():
+            self.conn.execute('INSERT INTO agenda_events ("date", "text") VALUES (?, ?)', (date, text))
+        self.touch("agenda_events")
+
+    def delete_event(self, date, index):
+        with self._write():
+            self.conn.execute(
+                'DELETE FROM agenda_events WHERE id = '
+                '(SELECT id FROM agenda_events WHERE "date" = ? ORDER BY id LIMIT 1 OFFSET ?)',
+                (date, index))
+        self.touch("agenda_events")
+
+    def save(self):
+        self.conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
@@ -0,0 +1,160 @@
+from .agenda import AgendaStore
+from .aggregates import Aggregate
+from .records import Film, Link, RecurringEvent, Stat, Task
+from .search import SearchIndex
+from .storage import DICT_STORES, open_storage
+
+
+class RecordStore:
+    """Une liste du stockage vue comme des enregistrements typés.
+
+    Les clés sont celles du backend ; `items` renvoie des paires
+    (clé, enregistrement) dans l'ordre d'ajout. Les agrégats créés par
+    `aggregate` sont mis à jour à chaque modification faite par ce store.
+    """
+
+    def __init__(self, storage, name, record, search=None):
+        self.storage = storage
+        self.name = name
+        self.record = record
+        self.search = search  # SearchIndex tenu à jour, s'il est construit
+        self.aggregates = []
+        self._as_dict = name in DICT_STORES
+
+    def _reindex(self, key, record):
+        if self.search is None or not self.search.live:
+            return
+        if record is None:
+            self.search.remove((self.name, key))
+        else:
+            self.search.put((self.name, key), record.search_fields())
+
+    def documents(self):
+        # (document, champs) pour SearchIndex.build
+        return (((self.name, key), record.search_fields()) for key, record in self.items())
+
+    def _value(self, record):
+        return record.asdict() if self._as_dict else record.astuple()
+
+    def items(self):
+        from_value = self.record.from_value
+        return [(key, from_value(value)) for key, value in self.storage.items(self.name)]
+
+    def get(self, key):
+        return self.record.from_value(self.storage.get(self.name, key))
+
+    def add(self, record):
+        key = self.storage.add(self.name, self._value(record))
+        for aggregate in self.aggregates:
+            aggregate.add(record)
+        self._reindex(key, record)
+        return key
+
+    def update(self, key, record):
+        old = self.get(key) if self.aggregates else None
+        self.storage.update(self.name, key, self._value(record))
+        for aggregate in self.aggregates:
+            aggregate.remove(old)
+            aggregate.add(record)
+        self._reindex(key, record)
+
+    def delete(self, key):
+        old = self.get(key) if self.aggregates else None
+        self.storage.delete(self.name, key)
+        for aggregate in self.aggregates:
+            aggregate.remove(old)
+        self._reindex(key, None)
+
+    def with_status(self, status):
+        from_value = self.record.from_value
+        return [(key, from_value(value)) for key, value in self.storage.with_status(self.name, status)]
+
+    def count_by(self, field):
+        return self.storage.count_by(self.name, field)
+
+    def between(self, field, start, end):
+        from_value = self.record.from_value
+        return [(key, from_value(value)) for key, value in self.storage.between(self.name, field, start, end)]
+
+    def aggregate(self, by, value=None):
+        """Compteurs (et sommes de `value`) par `by`, calculés à la première lecture."""
+        aggregate = Aggregate(by, value)
+        self.aggregates.append(aggregate)
+        return aggregate
+
+    def reset_aggregates(self):
+        # GROUP BY fait à la première lecture : une liste jamais affichée n'est pas lue
+        for aggregate in self.aggregates:
+            aggregate.reset(lambda a=aggregate: self.storage.group_by(self.name, a.by, a.value))
+
+
+class Model:
+    """Données de l'application, sans Tk : une liste typée par section."""
+
+    def __init__(self, storage):
+        self.storage = storage
+        self.index = SearchIndex()
+        self.todo = RecordStore(storage, "todo_tasks", Task, self.index)
+        self.links = RecordStore(storage, "web_links", Link, self.index)
+        self.stats = RecordStore(storage, "stats", Stat, self.index)
+        self.films = RecordStore(storage, "films", Film, self.index)
+        self.agenda = AgendaStore(storage, RecordStore(storage, "recurring_events", RecurringEvent, self.index),
+                                  self.index)
+        # Listes par nom de stockage, agenda ponctuel à part (AgendaStore)
+        self.stores = {store.name: store for store in
+                       (self.todo, self.links, self.stats, self.films, self.agenda.recurring)}
+        # Résumés affichés par Films et Statistiques
+        self.film_status = self.films.aggregate("status")
+        self.spending = self.stats.aggregate("date", "value")  # dépenses par jour
+        self.spending_by_color = self.stats.aggregate("color", "value")  # et par couleur
+        self._index_steps = None
+
+    def load(self, settings):
+        settings = self.storage.load(settings)
+        for store in (self.todo, self.links, self.stats, self.films):
+            store.reset_aggregates()
+        self.index.clear()
+        self._index_steps = None
+        return settings
+
+    def index_steps(self):
+        """Construction de l'index de recherche, pas à pas (voir SearchIndex.build)."""
+        if self._index_steps is None:
+            stores = (self.todo, self.agenda, self.agenda.recurring, self.links, self.stats, self.films)
+            self._index_steps = self.index.build(doc for store in stores for doc in store.documents())
+        return self._index_steps
+
+    def search(self, query, limit=20):
+        """Recherche globale ; l'index est terminé au besoin puis tenu à
+        jour à chaque modification."""
+        if not self.index.ready:
+            for _ in self.index_steps():
+                pass
+        return self.index.search(query, limit)
+
+    def add(self, store, record):
+        """Ajoute `record` à la liste nommée `store` (agenda_events compris)."""
+        if store == "agenda_events":
+            self.agenda.add(record)
+        else:
+            self.stores[store].add(record)
+
+    def batch(self):
+        """Lot de modifications (voir Storage.batch)."""
+        return self.storage.batch()
+
+    def set_setting(self, key, value):
+        self.storage.set_setting(key, value)
+
+    def version(self, store):
+        return self.storage.version(store)
+
+    def save(self):
+        self.storage.save()
+
+    def close(self):
+        self.storage.close()
+
+
+def open_model(path="app_data.db", sharded=False):
+    return Model(open_storage(path, sharded))
@@ -0,0 +1,287 @@
+"""Import et export en flux : CSV (films, stats), ICS (agenda), JSON Lines (tout).
+
+Les fichiers sont lus ligne à ligne ; un `ImportJob` applique les
+enregistrements par tranches dans un seul lot de modifications.
+"""
+import csv
+import json
+import os
+import random
+import re
+from datetime import date as Date, datetime, timezone
+from itertools import islice
+
+from .agenda import REPEATS
+from .records import Event, Film, Link, RecurringEvent, Stat, Task
+
+# Liste du stockage -> type d'enregistrement (lignes JSON Lines)
+RECORDS = {
+    "todo_tasks": Task,
+    "agenda_events": Event,
+    "recurring_events": RecurringEvent,
+    "web_links": Link,
+    "stats": Stat,
+    "films": Film,
+}
+
+
+# ---------- Lecture ----------
+def read_csv(lines, store=None):
+    """(liste, enregistrement) par ligne ; None pour une ligne invalide.
+
+    Sans `store`, une colonne « value » désigne des stats, sinon des films ;
+    une stat sans date est datée du jour.
+    """
+    rows = csv.DictReader(lines)
+    if store is None:
+        store = "stats" if "value" in (rows.fieldnames or ()) else "films"
+    today = Date.today().isoformat()
+    for row in rows:
+        try:
+            title = row["title"].strip()
+            if not title:
+                raise ValueError(title)
+            if store == "stats":
+                value = float(row["value"].replace(",", "."))
+                color = (row.get("color") or "").strip() or "#%06x" % random.randint(0, 0xFFFFFF)
+                date = (row.get("date") or "").strip() or today
+                yield store, Stat(title, value, color, Date.fromisoformat(date).isoformat())
+            else:
+                yield store, Film(title, (row.get("status") or "").strip() or "Neutre",
+                                  int(row.get("tmdb_id") or 0), (row.get("poster") or "").strip())
+        except (KeyError, ValueError, AttributeError):
+            yield None
+
+
+def _unfold(lines):
+    # Une ligne ICS qui commence par une espace continue la précédente
+    current = None
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current is not None:
+        yield current
+
+
+def _ics_text(value):
+    return re.sub(r"\\([\\;,nN])", lambda m: "\n" if m.group(1) in "nN" else m.group(1), value)
+
+
+def read_ics(lines):
+    """Évènements VEVENT : DTSTART (date seule), SUMMARY et RRULE FREQ."""
+    event = None
+    for line in _unfold(lines):
+        name, _, value = line.partition(":")
+        name = name.split(";", 1)[0].upper()
+        if name == "BEGIN" and value.upper() == "VEVENT":
+            event = {}
+        elif name == "END" and value.upper() == "VEVENT" and event is not None:
+            start, text = event.get("DTSTART", ""), _ics_text(event.get("SUMMARY", "")).strip()
+            rule = dict(part.partition("=")[::2] for part in event.get("RRULE", "").upper().split(";"))
+            event = None
+            if len(start) < 8 or not start[:8].isdigit() or not text:
+                yield None
+                continue
+            date = f"{start[:4]}-{start[4:6]}-{start[6:8]}"
+            repeat = rule.get("FREQ", "").lower()
+            if repeat in REPEATS:
+                yield "recurring_events", RecurringEvent(date, text, repeat)
+            else:
+                yield "agenda_events", Event(date, text)
+        elif event is not None:
+            event[name] = value
+
+
+def _record(record, fields):
+    # Champs convertis aux types annotés de `record`, comme le fait read_csv :
+    # un mauvais type ne doit pas aller jusqu'au stockage ni aux agrégats
+    types = record.__init__.__annotations__
+    for name, value in fields.items():
+        kind = types[name]
+        if kind is str:
+            if not isinstance(value, str):
+                raise TypeError(name)
+        elif isinstance(value, bool):
+            raise TypeError(name)
+        else:
+            fields[name] = kind(value)
+    if "date" in fields:
+        fields["date"] = Date.fromisoformat(fields["date"]).isoformat()
+    if "repeat" in fields and fields["repeat"] not in REPEATS:
+        raise ValueError(fields["repeat"])
+    return record(**fields)
+
+
+def read_jsonl(lines):
+    """Une ligne par enregistrement : {"store": ..., champs...} ; une stat
+    sans date est datée du jour."""
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            fields = json.loads(line)
+            store = fields.pop("store")
+            if store == "stats" and not fields.get("date"):
+                fields["date"] = Date.today().isoformat()  # comme read_csv et le stockage
+            yield store, _record(RECORDS[store], fields)
+        except (ValueError, KeyError, TypeError, AttributeError):
+            yield None
+
+
+READERS = {".csv": read_csv, ".ics": read_ics, ".jsonl": read_jsonl}
+
+
+class ImportJob:
+    """Import d'un fichier lu en flux, appliqué par tranches.
+
+    `step(n)` applique au plus `n` enregistrements dans un lot, validé avant
+    de rendre la main, et renvoie False une fois le fichier terminé : entre
+    deux pas, l'appelant rend la main à la boucle Tk, et un import
+    interrompu garde les tranches déjà faites. `fraction` donne
+    l'avancement d'après la position dans le fichier.
+    """
+
+    def __init__(self, model, path):
+        reader = READERS.get(os.path.splitext(path)[1].lower())
+        if reader is None:
+            raise ValueError(f"Format non pris en charge : {path}")
+        self.model = model
+        self.file = open(path, "r", encoding="utf-8-sig", newline="")
+        self.size = max(os.fstat(self.file.fileno()).st_size, 1)
+        self.read = 0
+        self.records = reader(self._lines())
+        self.added = self.skipped = 0
+        self.titles = []  # films importés, pour l'autocomplétion
+        self.done = False
+
+    def _lines(self):
+        for line in self.file:
+            self.read += len(line)
+            yield line
+
+    @property
+    def fraction(self):
+        return 1.0 if self.done else min(self.read / self.size, 1.0)
+
+    def step(self, n=500):
+        if self.done:
+            return False
+        try:
+            count = 0
+            with self.model.batch():
+                for item in islice(self.records, n):
+                    count += 1
+                    if item is None:
+                        self.skipped += 1
+                        continue
+                    self.model.add(*item)
+                    if item[0] == "films":
+                        self.titles.append(item[1].title)
+                    self.added += 1
+        except csv.Error as exc:
+            self.close()
+            raise ValueError(f"CSV invalide : {exc}") from exc
+        except BaseException:
+            self.close()
+            raise
+        if count < n:
+            self.close()
+        return not self.done
+
+    def run(self):
+        while self.step():
+            pass
+        return self.added
+
+    def close(self):
+        if not self.done:
+            self.done = True
+            self.file.close()
+
+
+# ---------- Écriture ----------
+def _agenda(model):
+    return model.storage.events_between("", "9999-12-31")
+
+
+def write_jsonl(model, path):
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        for name, store in model.stores.items():
+            for _, record in store.items():
+                f.write(json.dumps({"store": name, **record.asdict()}, ensure_ascii=False) + "\n")
+                count += 1
+        for date, text in _agenda(model):
+            f.write(json.dumps({"store": "agenda_events", "date": date, "text": text}, ensure_ascii=False) + "\n")
+            count += 1
+    return count
+
+
+def write_csv(model, store, path):
+    records = model.stores[store]
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(records.record.__slots__)
+        for _, record in records.items():
+            writer.writerow(record.astuple())
+            count += 1
+    return count
+
+
+def _ics_escape(text):
+    return text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def _ics_line(f, line):
+    # Lignes de 75 octets au plus, repliées par CRLF + espace (qui compte)
+    data = line.encode("utf-8")
+    limit = 75
+    while len(data) > limit:
+        cut = limit
+        while data[cut] & 0xC0 == 0x80:  # pas au milieu d'un caractère
+            cut -= 1
+        f.write(data[:cut] + b"\r\n ")
+        data = data[cut:]
+        limit = 74
+    f.write(data + b"\r\n")
+
+
+def write_ics(model, path):
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    events = ((f"{date}-{i}", date, text, "") for i, (date, text) in enumerate(_agenda(model)))
+    rules = ((f"r{key}", rule.date, rule.text, rule.repeat) for key, rule in model.agenda.rules())
+    count = 0
+    with open(path, "wb") as f:
+        for line in ("BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//Apperso//Agenda//FR"):
+            _ics_line(f, line)
+        for source in (events, rules):
+            for uid, date, text, repeat in source:
+                _ics_line(f, "BEGIN:VEVENT")
+                _ics_line(f, f"UID:{uid}@apperso")
+                _ics_line(f, f"DTSTAMP:{stamp}")
+                _ics_line(f, f"DTSTART;VALUE=DATE:{date.replace('-', '')}")
+                _ics_line(f, f"SUMMARY:{_ics_escape(text)}")
+                if repeat:
+                    _ics_line(f, f"RRULE:FREQ={repeat.upper()}")
+                _ics_line(f, "END:VEVENT")
+                count += 1
+        _ics_line(f, "END:VCALENDAR")
+    return count
+
+
+def export(model, path, store=None):
+    """Écrit selon l'extension de `path` ; `store` choisit la liste d'un CSV."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".jsonl":
+        return write_jsonl(model, path)
+    if ext == ".ics":
+        return write_ics(model, path)
+    if ext == ".csv":
+        return write_csv(model, store or "films", path)
+    raise ValueError(f"Format non pris en charge : {path}")
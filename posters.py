@@ -0,0 +1,166 @@
+import io
+import os
+import queue
+import tkinter as tk
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from PIL import Image
+from requests.adapters import HTTPAdapter
+
+from tmdb import TMDB_IMAGE_URL
+
+
+def load_thumbnail(data, size):
+    """Octets JPEG/PNG -> vignette PPM d'au plus `size` pixels, prête pour tk.PhotoImage."""
+    image = Image.open(io.BytesIO(data))
+    image.draft("RGB", size)  # JPEG décodé directement à une échelle réduite
+    image = image.convert("RGB")
+    image.thumbnail(size)
+    buffer = io.BytesIO()
+    image.save(buffer, "PPM")
+    return buffer.getvalue()
+
+
+class PosterFetcher:
+    """Affiches TMDb téléchargées une fois puis lues dans `directory`.
+
+    Bloquant et sans Tk : `fetch(chemin)` renvoie la vignette décodée
+    (PPM), ou None si l'affiche est introuvable. Pour tester contre un
+    serveur local, `base_url` (ou TMDB_IMAGE_URL).
+    """
+
+    def __init__(self, directory="posters", base_url=TMDB_IMAGE_URL, size="w92", thumb=(32, 48),
+                 timeout=(3.05, 5), workers=4):
+        self.directory = directory
+        self.base_url = base_url.rstrip("/")
+        self.size = size
+        self.thumb = thumb
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        os.makedirs(directory, exist_ok=True)
+
+    def _file(self, path):
+        return os.path.join(self.directory, self.size + "_" + os.path.basename(path))
+
+    def _download(self, path):
+        try:
+            r = self.session.get(self.base_url + "/" + self.size + path, timeout=self.timeout)
+        except requests.RequestException:
+            return None
+        if r.status_code != 200 or not r.content:
+            return None
+        data = r.content
+        # Écrit à côté puis renommé : jamais de fichier à moitié écrit dans le cache
+        file = self._file(path)
+        tmp = f"{file}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, file)
+        except OSError:
+            pass
+        return data
+
+    def fetch(self, path):
+        try:
+            with open(self._file(path), "rb") as f:
+                data = f.read()
+        except OSError:
+            data = self._download(path)
+        if data is None:
+            return None
+        try:
+            return load_thumbnail(data, self.thumb)
+        except (OSError, ValueError, Image.DecompressionBombError):
+            return None
+
+    def close(self):
+        self.session.close()
+
+
+class PosterCache:
+    """Vignettes des affiches pour l'affichage, chargées hors du thread Tk.
+
+    `get(chemin)` renvoie l'image si elle est en mémoire ; sinon
+    `request(chemin, callback)` la fait lire (disque, sinon TMDb) et décoder
+    dans un pool de threads, puis appelle `callback(image)` sur le thread Tk.
+    Seules les `maxsize` dernières images servies restent en mémoire, et
+    seules les `pending` dernières demandes attendent : celles des lignes
+    qui ont défilé hors de vue sont abandonnées.
+    """
+
+    def __init__(self, widget, fetcher=None, maxsize=200, pending=32, workers=4, poll=50):
+        self.widget = widget
+        self.fetcher = fetcher if fetcher is not None else PosterFetcher(workers=workers)
+        self.maxsize = maxsize
+        self.pending = pending
+        self.poll = poll
+        self.images = OrderedDict()  # chemin -> tk.PhotoImage
+        self.missing = set()  # introuvables : pas redemandées de la session
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="posters")
+        self._waiting = OrderedDict()  # chemin -> (Future, callbacks)
+        self._results = queue.SimpleQueue()
+        self._after_id = None
+
+    def get(self, path):
+        image = self.images.get(path)
+        if image is not None:
+            self.images.move_to_end(path)
+        return image
+
+    def request(self, path, callback):
+        if path in self.missing:
+            return
+        waiting = self._waiting.get(path)
+        if waiting is not None:
+            waiting[1].append(callback)
+            self._waiting.move_to_end(path)
+            return
+        future = self.executor.submit(self._fetch, path)
+        self._waiting[path] = (future, [callback])
+        # Les plus anciennes demandes pas encore commencées sont abandonnées
+        for old in list(self._waiting)[:-self.pending]:
+            if self._waiting[old][0].cancel():
+                del self._waiting[old]
+        if self._after_id is None:
+            self._after_id = self.widget.after(self.poll, self._drain)
+
+    def _fetch(self, path):
+        try:
+            data = self.fetcher.fetch(path)
+        except Exception:  # la demande doit aboutir, sinon on l'attendrait toujours
+            data = None
+        self._results.put((path, data))
+
+    def _drain(self):
+        self._after_id = None
+        try:
+            while True:
+                path, data = self._results.get_nowait()
+                waiting = self._waiting.pop(path, None)
+                if data is None:
+                    self.missing.add(path)
+                    continue
+                image = tk.PhotoImage(master=self.widget, data=data, format="ppm")
+                self.images[path] = image
+                self.images.move_to_end(path)
+                while len(self.images) > self.maxsize:
+                    self.images.popitem(last=False)
+                for callback in waiting[1] if waiting is not None else ():
+                    callback(image)
+        except queue.Empty:
+            pass
+        if self._waiting:
+            self._after_id = self.widget.after(self.poll, self._drain)
+
+    def close(self):
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.fetcher.close()
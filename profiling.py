@@ -0,0 +1,131 @@
+import cProfile
+import json
+import math
+import time
+from collections import deque
+from functools import wraps
+
+
+def percentile(ordered, p):
+    """Centile `p` (rang le plus proche) d'une liste triée."""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(p / 100 * len(ordered)) - 1))]
+
+
+class Profiler:
+    """Mesures à la demande : durée de chemins nommés, centiles, export.
+
+    `instrument(obj, noms)` remplace, sur l'instance seulement, chaque
+    méthode nommée par une version chronométrée ; `restore` les retire.
+    Désactivé, rien n'est mesuré ni ralenti. Seules les `keep` dernières
+    durées de chaque chemin sont gardées.
+    """
+
+    def __init__(self, keep=1000):
+        self.keep = keep
+        self.samples = {}  # chemin -> durées récentes (s)
+        self.counts = {}  # chemin -> nombre total d'appels
+        self._wrapped = []  # (objet, nom) instrumentés
+        self._cprofile = None
+
+    @property
+    def enabled(self):
+        return bool(self._wrapped)
+
+    def record(self, name, seconds):
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples[name] = deque(maxlen=self.keep)
+        samples.append(seconds)
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    def timed(self, name, fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.record(name, time.perf_counter() - start)
+        return wrapper
+
+    def instrument(self, obj, names, prefix=""):
+        # Mesures notées sous `prefix` + nom de la méthode
+        for name in names:
+            if name not in vars(obj):
+                setattr(obj, name, self.timed(prefix + name, getattr(obj, name)))
+                self._wrapped.append((obj, name))
+
+    def restore(self):
+        # La méthode de la classe reprend la main
+        for obj, name in self._wrapped:
+            delattr(obj, name)
+        self._wrapped = []
+
+    def clear(self):
+        self.samples.clear()
+        self.counts.clear()
+
+    def summary(self):
+        """{chemin: {count, p50, p95, p99, max}}, durées en millisecondes."""
+        result = {}
+        for name, samples in self.samples.items():
+            ordered = sorted(samples)
+            result[name] = {"count": self.counts[name],
+                            **{f"p{p}": percentile(ordered, p) * 1000 for p in (50, 95, 99)},
+                            "max": ordered[-1] * 1000 if ordered else 0.0}
+        return result
+
+    def export_json(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"summary": self.summary(),
+                       "samples_ms": {name: [s * 1000 for s in samples] for name, samples in self.samples.items()}},
+                      f, ensure_ascii=False, indent=2)
+
+    # ---------- cProfile ----------
+    @property
+    def profiling(self):
+        return self._cprofile is not None
+
+    def start_cprofile(self):
+        # Ne voit que le thread appelant (le thread Tk)
+        self._cprofile = cProfile.Profile()
+        self._cprofile.enable()
+
+    def stop_cprofile(self, path=None):
+        """Arrête cProfile et écrit les statistiques dans `path` (lisibles par pstats)."""
+        profile, self._cprofile = self._cprofile, None
+        profile.disable()
+        if path:
+            profile.dump_stats(path)
+
+
+class LagMonitor:
+    """Retard de la boucle Tk : un réveil programmé toutes les `interval` ms
+    note de combien il arrive en retard, dans `profiler` sous `name`."""
+
+    def __init__(self, widget, profiler, interval=100, name="retard de la boucle"):
+        self.widget = widget
+        self.profiler = profiler
+        self.interval = interval
+        self.name = name
+        self._after_id = None
+        self._expected = 0.0
+
+    def start(self):
+        if self._after_id is None:
+            self._schedule()
+
+    def _schedule(self):
+        self._expected = time.perf_counter() + self.interval / 1000
+        self._after_id = self.widget.after(self.interval, self._tick)
+
+    def _tick(self):
+        self.profiler.record(self.name, max(0.0, time.perf_counter() - self._expected))
+        self._schedule()
+
+    def stop(self):
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
@@ -0,0 +1,84 @@
+import itertools
+import os
+import sys
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+# Comme les benchmarks : les modules de l'application sont à la racine du dépôt
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeWidget:
+    """Ce que les tâches de fond utilisent d'un widget Tk, sans affichage :
+    `after` et les liaisons. `run(until)` fait tourner la boucle."""
+
+    def __init__(self):
+        self.timers = {}
+        self.bindings = {}  # séquence -> script, une ligne par gestionnaire
+        self.commands = {}
+        self._ids = itertools.count(1)
+
+    def after(self, ms, callback, *args):
+        timer = f"after#{next(self._ids)}"
+        self.timers[timer] = (time.monotonic() + ms / 1000, lambda: callback(*args))
+        return timer
+
+    def after_cancel(self, timer):
+        self.timers.pop(timer, None)
+
+    def bind(self, sequence, func=None, add=None):
+        if func is None:
+            return self.bindings.get(sequence, "")
+        if isinstance(func, str):
+            self.bindings[sequence] = func
+            return None
+        funcid = f"cmd{next(self._ids)}"
+        self.commands[funcid] = func
+        line = f'if {{"[{funcid} %#]" == "break"}} break'
+        old = self.bindings.get(sequence, "") if add else ""
+        self.bindings[sequence] = f"{old}\n{line}" if old else line
+        return funcid
+
+    def deletecommand(self, funcid):
+        del self.commands[funcid]
+
+    def destroy(self):
+        for line in self.bindings.pop("<Destroy>", "").split("\n"):
+            for funcid, func in list(self.commands.items()):
+                if funcid in line:
+                    func(None)
+
+    def run(self, until, timeout=10):
+        deadline = time.monotonic() + timeout
+        while not until():
+            assert time.monotonic() < deadline, "délai dépassé"
+            due = [(when, timer) for timer, (when, _) in self.timers.items() if when <= time.monotonic()]
+            if not due:
+                time.sleep(0.005)
+                continue
+            timer = min(due)[1]
+            self.timers.pop(timer)[1]()
+
+
+@pytest.fixture
+def widget():
+    return FakeWidget()
+
+
+@pytest.fixture
+def http_server():
+    """serve(Handler) -> URL de base d'un serveur HTTP local, arrêté après le test."""
+    servers = []
+
+    def serve(handler):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_port}"
+    yield serve
+    for server in servers:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,48 @@
+from datetime import date as Date, timedelta
+
+import pytest
+
+from model import REPEATS, RecurringEvent, occurrences
+
+
+def brute_force(rule, start, end):
+    """Toutes les occurrences depuis la première, filtrées sur la période."""
+    first = Date.fromisoformat(rule.date)
+    days, months = REPEATS[rule.repeat]
+    found = []
+    k = 0
+    while True:
+        if days:
+            current = first + timedelta(days=k * days)
+        else:
+            year, month = divmod(first.month - 1 + k * months, 12)
+            try:
+                current = Date(first.year + year, month + 1, first.day)
+            except ValueError:  # pas de 31 (ou de 29 février) ce mois-là
+                k += 1
+                continue
+        if current > Date.fromisoformat(end):
+            return found
+        if current >= Date.fromisoformat(start):
+            found.append(current.isoformat())
+        k += 1
+
+
+@pytest.mark.parametrize("repeat", sorted(REPEATS))
+@pytest.mark.parametrize("first", ["2020-01-31", "2020-02-29", "2021-03-15", "2023-12-01"])
+def test_occurrences_match_brute_force(repeat, first):
+    rule = RecurringEvent(first, "évènement", repeat)
+    day = Date(2019, 11, 20)
+    while day < Date(2025, 3, 1):
+        for length in (0, 1, 6, 30, 400):
+            start, end = day.isoformat(), (day + timedelta(days=length)).isoformat()
+            assert list(occurrences(rule, start, end)) == brute_force(rule, start, end), (start, end)
+        day += timedelta(days=37)
+
+
+def test_occurrences_skip_missing_days():
+    rule = RecurringEvent("2024-01-31", "fin de mois", "monthly")
+    assert list(occurrences(rule, "2024-01-01", "2024-05-31")) == [
+        "2024-01-31", "2024-03-31", "2024-05-31"]
+    rule = RecurringEvent("2024-02-29", "bissextile", "yearly")
+    assert list(occurrences(rule, "2024-01-01", "2029-01-01")) == ["2024-02-29", "2028-02-29"]
@@ -0,0 +1,69 @@
+import random
+
+import pytest
+
+from model import Aggregate, Film, Stat, open_model
+
+
+def grouped(store, by, value=None):
+    """Même résultat qu'un Aggregate, en reparcourant la liste."""
+    counts, sums = {}, {}
+    for _, record in store.items():
+        group = getattr(record, by)
+        counts[group] = counts.get(group, 0) + 1
+        if value:
+            sums[group] = sums.get(group, 0.0) + getattr(record, value)
+    return counts, sums
+
+
+@pytest.fixture(params=["sqlite", "json"])
+def model(request, tmp_path):
+    path = tmp_path / ("app_data.db" if request.param == "sqlite" else "app_data.json")
+    model = open_model(str(path))
+    model.load({})
+    yield model
+    model.close()
+
+
+def test_aggregates_follow_changes(model):
+    rng = random.Random(1)
+    colors = ["#ff0000", "#00ff00", "#0000ff"]
+    keys = [model.stats.add(Stat("s", float(rng.randint(1, 50)), rng.choice(colors),
+                                 f"2024-01-{rng.randint(1, 5):02d}")) for _ in range(30)]
+    for _ in range(40):
+        key = rng.choice(keys)
+        if rng.random() < 0.3:
+            model.stats.delete(key)
+            keys.remove(key)
+        else:
+            stat = model.stats.get(key)
+            model.stats.update(key, stat.replace(value=stat.value + 1, color=rng.choice(colors)))
+    for aggregate, by in ((model.spending, "date"), (model.spending_by_color, "color")):
+        counts, sums = grouped(model.stats, by, "value")
+        assert aggregate.counts == counts
+        assert aggregate.sums == pytest.approx(sums)
+        assert aggregate.count == len(keys)
+        assert aggregate.total == pytest.approx(sum(sums.values()))
+
+
+def test_aggregates_computed_on_first_read(model):
+    for status in ("Bien", "Bien", "Neutre"):
+        model.films.add(Film("film", status))
+    model.load({})  # rechargé : le GROUP BY attend la première lecture
+    model.films.add(Film("film", "Mauvais"))
+    assert model.film_status.counts == {"Bien": 2, "Neutre": 1, "Mauvais": 1}
+    assert model.film_status.count == 4
+
+
+def test_last_of_group_removed():
+    aggregate = Aggregate("color", "value")
+    aggregate.reset({})
+    stats = [Stat("a", 0.1, "#fff"), Stat("b", 0.2, "#fff"), Stat("c", 5.0, "#000")]
+    for stat in stats:
+        aggregate.add(stat)
+    for stat in stats[:2]:
+        aggregate.remove(stat)
+    assert aggregate.counts == {"#000": 1}
+    assert aggregate.sums == {"#000": 5.0}
+    aggregate.remove(stats[2])
+    assert (aggregate.count, aggregate.total) == (0, 0.0)
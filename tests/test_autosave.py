@@ -0,0 +1,126 @@
+import os
+
+from model import Autosave, JsonStorage, SqliteStorage
+from profiling import Profiler
+
+
+class Timers:
+    """`after`/`after_cancel` sans Tk : les réveils sont lancés par `run`."""
+
+    def __init__(self):
+        self.pending = {}
+        self.next_id = 0
+
+    def after(self, ms, callback):
+        self.next_id += 1
+        self.pending[self.next_id] = callback
+        return self.next_id
+
+    def after_cancel(self, timer):
+        self.pending.pop(timer, None)
+
+    def run(self, autosave):
+        # Jusqu'à ce que plus rien ne soit prévu, écriture en cours comprise
+        while self.pending:
+            if autosave.future is not None:
+                autosave.future.exception()
+            self.pending.pop(min(self.pending))()
+
+
+def open_json(path, **kwargs):
+    storage = JsonStorage(str(path), **kwargs)
+    storage.load({})
+    return storage
+
+
+def start(storage):
+    timers = Timers()
+    return timers, Autosave(storage, timers.after, timers.after_cancel, delay=0, max_delay=0)
+
+
+def test_quiet_period_syncs_journal_only(tmp_path):
+    storage = open_json(tmp_path / "app_data.json", compact_every=3)
+    timers, autosave = start(storage)
+    storage.add("todo_tasks", ("a", "todo"))
+    storage.add("todo_tasks", ("b", "todo"))
+    assert not storage.journal.synced
+    timers.run(autosave)
+    assert autosave.error is None
+    assert storage.journal.synced
+    assert not os.path.exists(tmp_path / "app_data.json")  # pas d'instantané sous le seuil
+    timers.run(autosave)
+    assert storage.checkpoint() is None  # rien de nouveau
+
+
+def test_snapshot_written_on_compaction(tmp_path):
+    storage = open_json(tmp_path / "app_data.json", compact_every=3)
+    timers, autosave = start(storage)
+    for text in ("a", "b", "c", "d"):
+        storage.add("todo_tasks", (text, "todo"))
+    # Avec la sauvegarde auto, la compaction ne se fait pas sur le thread appelant
+    assert not os.path.exists(tmp_path / "app_data.json")
+    timers.run(autosave)
+    assert os.path.exists(tmp_path / "app_data.json")
+    assert not os.path.exists(tmp_path / "app_data.journal.old")
+    storage.add("todo_tasks", ("e", "todo"))
+    autosave.close()
+    storage.close()
+    storage = open_json(tmp_path / "app_data.json")
+    assert [text for _, (text, _) in storage.items("todo_tasks")] == ["a", "b", "c", "d", "e"]
+
+
+def test_failed_write_retried(tmp_path):
+    storage = open_json(tmp_path / "app_data.json", compact_every=1)
+    timers, autosave = start(storage)
+    storage.add("todo_tasks", ("a", "todo"))
+    write_snapshot = storage.journal._write_snapshot
+    calls = []
+
+    def failing(data):
+        calls.append(data)
+        if len(calls) == 1:
+            raise OSError("disque plein")
+        write_snapshot(data)
+    storage.journal._write_snapshot = failing
+    timers.run(autosave)
+    assert len(calls) == 2  # le segment resté de côté relance l'instantané
+    assert autosave.error is None
+    assert not os.path.exists(tmp_path / "app_data.journal.old")
+
+
+def test_batch_delays_checkpoint(tmp_path):
+    storage = open_json(tmp_path / "app_data.json")
+    timers, autosave = start(storage)
+    with storage.batch():
+        storage.add("todo_tasks", ("a", "todo"))
+        assert storage.checkpoint() is None
+        timers.pending.pop(min(timers.pending))()  # réveil pendant le lot : reporté
+        assert timers.pending
+    timers.run(autosave)
+    assert storage.journal.synced
+
+
+def test_sqlite_wal_checkpointed(tmp_path):
+    storage = SqliteStorage(str(tmp_path / "app_data.db"))
+    storage.load({})
+    timers, autosave = start(storage)
+    storage.add("todo_tasks", ("a", "todo"))
+    timers.run(autosave)
+    assert autosave.error is None
+    assert autosave.future is None
+    autosave.close()
+    storage.close()
+
+
+def test_checkpoint_and_write_timed(tmp_path):
+    storage = open_json(tmp_path / "app_data.json")
+    timers, autosave = start(storage)
+    profiler = Profiler()
+    profiler.instrument(autosave, ("checkpoint", "write"), prefix="autosave_")
+    storage.add("todo_tasks", ("a", "todo"))
+    timers.run(autosave)
+    summary = profiler.summary()
+    assert summary["autosave_checkpoint"]["count"] == 1
+    assert summary["autosave_write"]["count"] == 1
+    profiler.restore()
+    assert "write" not in vars(autosave)
@@ -0,0 +1,69 @@
+from http.server import BaseHTTPRequestHandler
+
+from linkcheck import CheckAll, LinkChecker
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.startswith("/redirect/"):
+            self.send_response(302)
+            self.send_header("Location", "/page/" + self.path.rsplit("/", 1)[1])
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if self.path.startswith("/missing/"):
+            self.send_error(404)
+            return
+        body = f"<html><head><title>Page &amp; {self.path}</title></head></html>".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_status_redirect_and_title(http_server):
+    base = http_server(Handler)
+    checker = LinkChecker(interval=0)
+    page = checker.check(base + "/page/1")
+    assert (page.ok, page.status, page.title, page.redirected) == (True, 200, "Page & /page/1", False)
+    moved = checker.check(base + "/redirect/2")
+    assert moved.ok and moved.redirected and moved.final_url == base + "/page/2"
+    missing = checker.check(base + "/missing/3")
+    assert (missing.ok, missing.status) == (False, 404)
+    refused = checker.check("http://127.0.0.1:9/")
+    assert not refused.ok and refused.error
+    checker.close()
+
+
+def test_check_all_counts_this_run_and_unbinds(http_server, widget):
+    base = http_server(Handler)
+    checker = LinkChecker(interval=0)
+    widget.bind("<Destroy>", lambda e: None)  # liaison de l'appli, à garder
+    results, done = [], []
+    items = [(1, base + "/page/1"), (2, base + "/missing/2"), (3, base + "/page/1")]
+    job = CheckAll(widget, checker, items, lambda key, status: results.append(key), lambda: done.append(True))
+    widget.run(lambda: done)
+    assert sorted(results) == [1, 2, 3]
+    assert (job.total, job.broken) == (2, 1)
+    assert widget.bind("<Destroy>").count("\n") == 0  # seul le gestionnaire de l'appli reste
+
+    # Deuxième vérification : seules ses réponses comptent
+    job = CheckAll(widget, checker, [(1, base + "/page/1")], lambda key, status: None)
+    widget.run(lambda: job.done == job.total)
+    assert job.broken == 0
+    assert len(widget.commands) == 1
+    checker.close()
+
+
+def test_check_all_cancelled_on_destroy(http_server, widget):
+    base = http_server(Handler)
+    checker = LinkChecker(interval=0)
+    job = CheckAll(widget, checker, [(1, base + "/page/1")], lambda key, status: None)
+    widget.destroy()
+    assert not widget.timers and not widget.commands
+    assert job._after_id is None
+    checker.close()
@@ -0,0 +1,63 @@
+import io
+import os
+from http.server import BaseHTTPRequestHandler
+
+from PIL import Image
+
+from posters import PosterFetcher, load_thumbnail
+
+
+def jpeg(size=(92, 138)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (200, 30, 30)).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+class Handler(BaseHTTPRequestHandler):
+    hits = []
+
+    def do_GET(self):
+        Handler.hits.append(self.path)
+        if "/missing" in self.path:
+            self.send_error(404)
+            return
+        body = b"pas une image" if "/broken" in self.path else jpeg()
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def ppm_size(data):
+    return Image.open(io.BytesIO(data)).size
+
+
+def test_thumbnail_fits_size():
+    assert ppm_size(load_thumbnail(jpeg(), (32, 48))) == (32, 48)
+    assert ppm_size(load_thumbnail(jpeg((300, 100)), (32, 48))) == (32, 11)
+
+
+def test_fetch_downloads_once_then_reads_disk(http_server, tmp_path):
+    Handler.hits = []
+    fetcher = PosterFetcher(str(tmp_path / "posters"), http_server(Handler), workers=1)
+    first = fetcher.fetch("/poster1.jpg")
+    assert ppm_size(first) == (32, 48)
+    assert fetcher.fetch("/poster1.jpg") == first
+    assert Handler.hits == ["/w92/poster1.jpg"]
+    assert os.listdir(tmp_path / "posters") == ["w92_poster1.jpg"]  # pas de fichier temporaire restant
+    fetcher.close()
+
+
+def test_missing_or_broken_poster(http_server, tmp_path):
+    fetcher = PosterFetcher(str(tmp_path / "posters"), http_server(Handler), workers=1)
+    assert fetcher.fetch("/missing.jpg") is None
+    assert fetcher.fetch("/broken.jpg") is None
+    assert os.listdir(tmp_path / "posters") == ["w92_broken.jpg"]  # 404 : rien d'écrit
+    refused = PosterFetcher(str(tmp_path / "posters"), "http://127.0.0.1:9", timeout=(0.5, 0.5))
+    assert refused.fetch("/poster2.jpg") is None
+    refused.close()
+    fetcher.close()
@@ -0,0 +1,50 @@
+from model import SearchIndex
+
+
+def labels(index, query):
+    return sorted(hit.label for hit in index.search(query))
+
+
+def docs(n):
+    return ((("films", i), (f"film {i}",)) for i in range(n))
+
+
+def test_put_and_remove_after_build():
+    index = SearchIndex()
+    for _ in index.build(docs(10), chunk=3):
+        pass
+    index.put(("films", 3), ("Alien",))
+    index.remove(("films", 4))
+    assert labels(index, "ali") == ["Alien"]
+    assert labels(index, "film") == sorted(f"film {i}" for i in range(10) if i not in (3, 4))
+    assert index.vocabulary == sorted(index.postings)
+
+
+def test_put_and_remove_during_build():
+    index = SearchIndex()
+    steps = index.build(docs(10), chunk=3)
+    next(steps)  # documents 0 à 2 indexés
+    assert index.live and not index.ready
+    index.put(("films", 1), ("Alien",))  # déjà indexé
+    index.put(("films", 7), ("Brazil",))  # pas encore lu : garde cette version
+    index.remove(("films", 2))
+    index.remove(("films", 8))
+    index.put(("films", 10), ("Casablanca",))  # ajouté pendant la construction
+    for _ in steps:
+        pass
+    assert index.ready and not index.building
+    assert labels(index, "film") == sorted(f"film {i}" for i in (0, 3, 4, 5, 6, 9))
+    assert labels(index, "ali") == ["Alien"]
+    assert labels(index, "braz") == ["Brazil"]
+    assert labels(index, "casa") == ["Casablanca"]
+    assert index.vocabulary == sorted(index.postings)
+
+
+def test_search_folds_accents_and_ranks_titles_first():
+    index = SearchIndex()
+    for _ in index.build([(("todo_tasks", 1), ("Écrire le rapport", "")),
+                          (("web_links", 2), ("Blog", "ecrire mieux"))]):
+        pass
+    hits = index.search("écri")
+    assert [hit.label for hit in hits] == ["Écrire le rapport", "Blog"]
+    assert index.search("ecrire rapport")[0].key == 1
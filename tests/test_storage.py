@@ -0,0 +1,134 @@
+import json
+import os
+
+import pytest
+
+from model import JsonStorage, ShardedStorage, SqliteStorage, Storage, open_storage
+
+
+def tasks(storage):
+    return [value for _, value in storage.items("todo_tasks")]
+
+
+def open_json(path, **kwargs):
+    storage = JsonStorage(str(path), **kwargs)
+    storage.load({})
+    return storage
+
+
+def test_journal_replayed(tmp_path):
+    storage = open_json(tmp_path / "app_data.json")
+    key = storage.add("todo_tasks", ("a", "todo"))
+    storage.add("todo_tasks", ("b", "todo"))
+    storage.update("todo_tasks", key, ("a", "done"))
+    storage.close()
+    storage = open_json(tmp_path / "app_data.json")
+    assert tasks(storage) == [["a", "done"], ["b", "todo"]]
+
+
+def test_torn_line_dropped(tmp_path):
+    storage = open_json(tmp_path / "app_data.json")
+    for text in ("a", "b", "c"):
+        storage.add("todo_tasks", (text, "todo"))
+    storage.close()
+    journal = tmp_path / "app_data.journal"
+    journal.write_bytes(journal.read_bytes()[:-10])  # crash au milieu de la ligne
+    storage = open_json(tmp_path / "app_data.json")
+    assert tasks(storage) == [["a", "todo"], ["b", "todo"]]
+    storage.add("todo_tasks", ("d", "todo"))
+    storage.close()
+    storage = open_json(tmp_path / "app_data.json")
+    assert tasks(storage) == [["a", "todo"], ["b", "todo"], ["d", "todo"]]
+
+
+def test_unterminated_line_dropped(tmp_path):
+    # La ligne se lit mais n'a pas sa fin de ligne : l'ajout suivant la corromprait
+    storage = open_json(tmp_path / "app_data.json")
+    for text in ("a", "b", "c"):
+        storage.add("todo_tasks", (text, "todo"))
+    storage.close()
+    journal = tmp_path / "app_data.journal"
+    journal.write_bytes(journal.read_bytes()[:-1])
+    storage = open_json(tmp_path / "app_data.json")
+    assert tasks(storage) == [["a", "todo"], ["b", "todo"]]
+    for text in ("d", "e", "f"):
+        storage.add("todo_tasks", (text, "todo"))
+    storage.close()
+    storage = open_json(tmp_path / "app_data.json")
+    assert [text for text, _ in tasks(storage)] == ["a", "b", "d", "e", "f"]
+
+
+def test_crash_between_rotate_and_snapshot(tmp_path):
+    storage = open_json(tmp_path / "app_data.json")
+    storage.add("todo_tasks", ("a", "todo"))
+    write = storage.journal.rotate(storage.data)  # l'écriture de l'instantané ne s'exécute pas
+    storage.add("todo_tasks", ("b", "todo"))
+    storage.close()
+    assert not os.path.exists(tmp_path / "app_data.json")
+    storage = open_json(tmp_path / "app_data.json")
+    assert tasks(storage) == [["a", "todo"], ["b", "todo"]]
+    # Une nouvelle rotation couvre encore le segment resté de côté
+    storage.add("todo_tasks", ("c", "todo"))
+    storage.journal.rotate(storage.data)()
+    storage.close()
+    assert not os.path.exists(tmp_path / "app_data.journal.old")
+    storage = open_json(tmp_path / "app_data.json")
+    assert [text for text, _ in tasks(storage)] == ["a", "b", "c"]
+    del write
+
+
+def test_old_segment_not_replayed_twice(tmp_path):
+    # Crash après le remplacement de l'instantané, avant la suppression du .old
+    storage = open_json(tmp_path / "app_data.json")
+    storage.add("todo_tasks", ("a", "todo"))
+    write = storage.journal.rotate(storage.data)
+    old = (tmp_path / "app_data.journal.old").read_bytes()
+    write()
+    (tmp_path / "app_data.journal.old").write_bytes(old)
+    storage.add("todo_tasks", ("b", "todo"))
+    storage.close()
+    storage = open_json(tmp_path / "app_data.json")
+    assert tasks(storage) == [["a", "todo"], ["b", "todo"]]
+
+
+def test_legacy_json_imported_into_sqlite(tmp_path):
+    legacy = {
+        "todo_tasks": [["a", "todo"], ["b", "done"]],
+        "web_links": [["Site", "https://example.org", ""]],
+        "stats": [{"title": "Poids", "value": 70.0, "color": "#000000"}],
+        "films": [{"title": "Alien", "status": "vu"}],
+        "recurring_events": [],
+        "agenda_events": {"2024-01-02": ["rendez-vous"]},
+        "theme": "dark",
+    }
+    (tmp_path / "app_data.json").write_text(json.dumps(legacy), encoding="utf-8")
+    storage = open_storage(str(tmp_path / "app_data.db"))
+    assert isinstance(storage, SqliteStorage)
+    assert storage.load({"theme": "light"}) == {"theme": "dark"}
+    assert [value for _, value in storage.items("todo_tasks")] == [("a", "todo"), ("b", "done")]
+    assert [value for _, value in storage.items("web_links")] == [("Site", "https://example.org", "")]
+    (stat,) = [value for _, value in storage.items("stats")]
+    assert stat["title"] == "Poids" and stat["date"]
+    (film,) = [value for _, value in storage.items("films")]
+    assert film == {"title": "Alien", "status": "vu", "tmdb_id": 0, "poster": ""}
+    assert storage.events_on("2024-01-02") == ["rendez-vous"]
+    storage.close()
+    # L'ancien JSON est seulement lu : pas de journal créé à côté
+    assert not os.path.exists(tmp_path / "app_data.journal")
+    # Déjà migré : le JSON n'est plus relu
+    storage = open_storage(str(tmp_path / "app_data.db"))
+    storage.load({})
+    assert len(storage.items("todo_tasks")) == 2
+    storage.close()
+
+
+def test_backend_must_implement_interface(tmp_path):
+    class Partial(Storage):
+        def load(self, settings):
+            return dict(settings)
+
+    with pytest.raises(TypeError):
+        Partial()
+    for storage in (JsonStorage(str(tmp_path / "a.json")), SqliteStorage(str(tmp_path / "a.db")),
+                    ShardedStorage(str(tmp_path / "profile"))):
+        storage.close()
@@ -0,0 +1,35 @@
+from title_index import TitleIndex
+
+
+def test_prefix_search_after_save(tmp_path):
+    path = str(tmp_path / "film_titles.idx")
+    index = TitleIndex(path)
+    index.add("The Matrix", "Matrix Reloaded", "Amélie")
+    assert sorted(index.search("matr")) == ["Matrix Reloaded", "The Matrix"]
+    index.save()
+    index.close()
+
+    index = TitleIndex(path)
+    assert sorted(index.search("matr")) == ["Matrix Reloaded", "The Matrix"]
+    assert index.search("ame") == ["Amélie"]
+    assert index.search("reloaded") == ["Matrix Reloaded"]
+    assert index.search("zz") == []
+    # Les ajouts après l'enregistrement se fusionnent au fichier
+    index.add("Mad Max", "The Matrix")
+    assert sorted(index.search("ma", limit=3)) == ["Mad Max", "Matrix Reloaded", "The Matrix"]
+    index.save()
+    index.close()
+    with open(path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert lines == sorted(set(lines))
+
+
+def test_seed_read_only_without_file(tmp_path):
+    path = str(tmp_path / "film_titles.idx")
+    index = TitleIndex(path, seed=lambda: ["Brazil"])
+    assert index.search("bra") == ["Brazil"]
+    index.save()
+    index.close()
+    index = TitleIndex(path, seed=lambda: ["Casablanca"])
+    assert index.search("casa") == []
+    assert index.search("braz") == ["Brazil"]
@@ -0,0 +1,104 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import parse_qs, urlsplit
+
+from tmdb import DebouncedSearch, TmdbClient
+
+
+class Handler(BaseHTTPRequestHandler):
+    queries = []  # (requête, langue) reçues, dans l'ordre
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        Handler.queries.append((params.get("query"), params.get("language")))
+        if url.path != "/search/movie" or params.get("api_key") != "clé":
+            self.send_error(401)
+            return
+        if params["query"] == "lent":
+            time.sleep(0.5)
+        results = [{"id": 348 + i, "title": f"{params['query']} {i}", "poster_path": f"/p{i}.jpg"}
+                   for i in range(2)]
+        body = json.dumps({"results": results}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def client(base, **kwargs):
+    Handler.queries = []
+    return TmdbClient(api_key="clé", base_url=base, **kwargs)
+
+
+def test_search_cached_by_normalized_query_and_language(http_server):
+    tmdb = client(http_server(Handler))
+    assert tmdb.search("Alien") == ["Alien 0", "Alien 1"]
+    assert tmdb.search("  ALIEN ") == ["Alien 0", "Alien 1"]
+    assert tmdb.cached("alien") == ["Alien 0", "Alien 1"]
+    assert Handler.queries == [("Alien", "fr-FR")]
+    tmdb.search("alien", language="en-US")
+    assert Handler.queries[-1] == ("alien", "en-US")
+    assert tmdb.movie("Alien 1") == (349, "/p1.jpg")
+    assert tmdb.movie("Inconnu") is None
+    tmdb.close()
+
+
+def test_errors_and_timeouts_give_no_titles(http_server):
+    base = http_server(Handler)
+    tmdb = TmdbClient(api_key="mauvaise", base_url=base)
+    assert tmdb.search("Alien") == []
+    assert tmdb.cached("Alien") is None  # une erreur n'est pas gardée
+    tmdb.close()
+    tmdb = client(base, timeout=(1, 0.1))
+    assert tmdb.search("lent") == []
+    tmdb.close()
+
+
+def test_debounce_keeps_only_the_last_query(widget):
+    searched, shown = [], []
+
+    def search(query):
+        searched.append(query)
+        return [query.upper()]
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        lookup = DebouncedSearch(widget, executor, search, shown.append, delay=20, poll=5)
+        for query in ("ali", "alie", "alien"):
+            lookup.schedule(query)
+        widget.run(lambda: shown)
+        assert searched == ["alien"]
+        assert shown == [["ALIEN"]]
+
+
+def test_newer_query_drops_stale_results(widget):
+    shown = []
+
+    def search(query):
+        if query == "lent":
+            time.sleep(0.2)
+        return [query]
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        lookup = DebouncedSearch(widget, executor, search, shown.append, delay=0, poll=5)
+        lookup.schedule("lent")
+        widget.run(lambda: lookup._future is not None)  # en cours
+        lookup.schedule("vite")
+        widget.run(lambda: shown)
+        time.sleep(0.3)
+        widget.run(lambda: not widget.timers)
+        assert shown == [["vite"]]
+
+
+def test_destroy_cancels_pending_search(widget):
+    searched = []
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        lookup = DebouncedSearch(widget, executor, searched.append, lambda titles: None, delay=10)
+        lookup.schedule("alien")
+        widget.destroy()
+        assert not widget.timers and lookup._after_id is None
+    assert searched == []
@@ -0,0 +1,149 @@
+import io
+from datetime import date as Date
+
+import pytest
+
+from model import Event, Film, Link, RecurringEvent, Stat, Task, open_model
+from model.transfer import ImportJob, export, read_csv, read_ics, read_jsonl
+
+
+@pytest.fixture
+def model(tmp_path):
+    model = open_model(str(tmp_path / "app_data.db"))
+    model.load({})
+    yield model
+    model.close()
+
+
+def fill(model):
+    model.todo.add(Task("Écrire, relire ; envoyer", "✅"))
+    model.links.add(Link("Site", "https://example.org/?a=1,b=2", "avec \"guillemets\""))
+    model.stats.add(Stat("Courses", 42.5, "#ff0000", "2024-03-01"))
+    model.films.add(Film("Alien", "Bien", 348, "/alien.jpg"))
+    model.agenda.add(Event("2024-03-02", "Réunion ; salle 3, " + " ".join(["très long texte"] * 8)))
+    model.agenda.add(Event("2024-01-31", "Loyer"), "monthly")
+
+
+def content(model):
+    stores = {name: sorted(record.astuple() for _, record in store.items())
+              for name, store in model.stores.items()}
+    stores["agenda_events"] = model.storage.events_between("", "9999-12-31")
+    return stores
+
+
+def import_file(model, path, n=2):
+    job = ImportJob(model, str(path))
+    steps = 1
+    while job.step(n):
+        steps += 1
+    return job, steps
+
+
+def test_csv_reader():
+    lines = io.StringIO("title,value,color,date\n"
+                        "Courses,\"12,5\",#00ff00,2024-02-03\n"
+                        "Sans date,3,,\n"
+                        ",1,#000000,2024-01-01\n"
+                        "Mauvaise valeur,abc,#000000,2024-01-01\n"
+                        "Mauvaise date,1,#000000,03/02/2024\n")
+    rows = list(read_csv(lines))
+    assert rows[0] == ("stats", Stat("Courses", 12.5, "#00ff00", "2024-02-03"))
+    store, undated = rows[1]
+    assert undated.date == Date.today().isoformat() and undated.color.startswith("#")
+    assert rows[2:] == [None, None, None]
+    films = list(read_csv(io.StringIO("title,status\nAlien,\nBrazil,Bien\n")))
+    assert films == [("films", Film("Alien", "Neutre")), ("films", Film("Brazil", "Bien"))]
+
+
+def test_ics_reader_unfolds_and_unescapes():
+    lines = io.StringIO("BEGIN:VCALENDAR\r\n"
+                        "BEGIN:VEVENT\r\nDTSTART;VALUE=DATE:20240302\r\n"
+                        "SUMMARY:Réunion\\, salle\r\n  3\\; fin\r\nEND:VEVENT\r\n"
+                        "BEGIN:VEVENT\r\nDTSTART:20240131T090000\r\nSUMMARY:Loyer\r\n"
+                        "RRULE:FREQ=MONTHLY;INTERVAL=1\r\nEND:VEVENT\r\n"
+                        "BEGIN:VEVENT\r\nSUMMARY:Sans date\r\nEND:VEVENT\r\n"
+                        "END:VCALENDAR\r\n")
+    assert list(read_ics(lines)) == [
+        ("agenda_events", Event("2024-03-02", "Réunion, salle 3; fin")),
+        ("recurring_events", RecurringEvent("2024-01-31", "Loyer", "monthly")),
+        None,
+    ]
+
+
+@pytest.mark.parametrize("line", [
+    '{"store": "stats", "title": "x", "value": "abc", "color": "#000000", "date": "2024-01-01"}',
+    '{"store": "stats", "title": "x", "value": true, "color": "#000000", "date": "2024-01-01"}',
+    '{"store": "stats", "title": 3, "value": 1, "color": "#000000", "date": "2024-01-01"}',
+    '{"store": "stats", "title": "x", "value": 1, "color": "#000000", "date": "01/02/2024"}',
+    '{"store": "recurring_events", "date": "2024-01-01", "text": "x", "repeat": "hourly"}',
+    '{"store": "films", "title": "x", "colour": "red"}',
+    '{"store": "inconnue", "title": "x"}',
+    '{"title": "x"}',
+    '["pas", "un", "objet"]',
+    '{"store": "films", "title": ',
+])
+def test_jsonl_reader_rejects_bad_records(line):
+    assert list(read_jsonl([line])) == [None]
+
+
+def test_jsonl_reader_converts_and_dates():
+    lines = ['{"store": "stats", "title": "x", "value": 2, "color": "#000000"}', "",
+             '{"store": "films", "title": "Alien", "tmdb_id": "348"}']
+    (_, stat), (_, film) = read_jsonl(lines)
+    assert stat == Stat("x", 2.0, "#000000", Date.today().isoformat())
+    assert film == Film("Alien", tmdb_id=348)
+
+
+def test_jsonl_round_trip(model, tmp_path):
+    fill(model)
+    path = tmp_path / "export.jsonl"
+    assert export(model, str(path)) == 6
+    copy = open_model(str(tmp_path / "copie.db"))
+    copy.load({})
+    job, steps = import_file(copy, path)
+    assert (job.added, job.skipped, steps) == (6, 0, 4)
+    assert job.titles == ["Alien"]
+    assert content(copy) == content(model)
+    copy.close()
+
+
+def test_csv_round_trip(model, tmp_path):
+    fill(model)
+    for store in ("films", "stats"):
+        path = tmp_path / f"{store}.csv"
+        assert export(model, str(path), store) == 1
+        copy = open_model(str(tmp_path / f"{store}.db"))
+        copy.load({})
+        job, _ = import_file(copy, path)
+        assert job.added == 1
+        assert content(copy)[store] == content(model)[store]
+        copy.close()
+
+
+def test_ics_round_trip(model, tmp_path):
+    fill(model)
+    path = tmp_path / "agenda.ics"
+    assert export(model, str(path)) == 2
+    assert all(len(line) <= 75 for line in path.read_bytes().split(b"\r\n"))
+    copy = open_model(str(tmp_path / "copie.db"))
+    copy.load({})
+    import_file(copy, path)
+    assert content(copy)["agenda_events"] == content(model)["agenda_events"]
+    assert content(copy)["recurring_events"] == content(model)["recurring_events"]
+    copy.close()
+
+
+def test_interrupted_import_keeps_done_slices(model, tmp_path):
+    path = tmp_path / "films.csv"
+    path.write_text("title\n" + "".join(f"Film {i}\n" for i in range(10)), encoding="utf-8")
+    job = ImportJob(model, str(path))
+    assert job.step(4)
+    job.close()
+    assert not job.step(4)
+    assert len(model.films.items()) == 4
+    assert job.fraction == 1.0
+
+
+def test_unknown_format(model, tmp_path):
+    with pytest.raises(ValueError):
+        ImportJob(model, str(tmp_path / "notes.txt"))
@@ -0,0 +1,36 @@
+from widgets import ViewCache, _View
+
+
+class Versions(dict):
+    def touch(self, store):
+        self[store] = self.get(store, 0) + 1
+
+
+def shown(cache, versions, deps):
+    # Vue affichée sans Tk : seul le relevé des versions compte ici
+    view = _View(None, deps, cache._stamp(deps))
+    refreshed = []
+    view.refresh = lambda: refreshed.append(True)
+    cache.current = view
+    return view, refreshed
+
+
+def test_change_applied_in_place_needs_no_refresh():
+    versions = Versions()
+    cache = ViewCache(None, lambda store: versions.get(store, 0))
+    _, refreshed = shown(cache, versions, ("todo_tasks", "settings"))
+    versions.touch("todo_tasks")
+    cache.mark_fresh("todo_tasks")
+    cache.refresh()
+    assert not refreshed
+
+
+def test_stale_view_stays_stale():
+    versions = Versions()
+    cache = ViewCache(None, lambda store: versions.get(store, 0))
+    _, refreshed = shown(cache, versions, ("todo_tasks",))
+    versions.touch("todo_tasks")  # modification en lot, pas montrée
+    versions.touch("todo_tasks")  # puis une modification sur place
+    cache.mark_fresh("todo_tasks", "films")
+    cache.refresh()
+    assert refreshed == [True]
@@ -0,0 +1,62 @@
+import tkinter as tk
+
+
+class Theme:
+    """Registre de thème : des rôles de couleur nommés et les widgets abonnés.
+
+    `bind(widget, bg="background", fg="text")` applique les couleurs des rôles
+    et abonne le widget ; `set(role, color)` ne reconfigure que les widgets
+    abonnés à ce rôle. `watch` abonne une fonction pour ce qui ne passe pas
+    par une option (tags d'un calendrier...). Les widgets détruits sont
+    oubliés au passage.
+    """
+
+    def __init__(self, **colors):
+        self.colors = dict(colors)
+        self._subscribers = {role: [] for role in colors}  # rôle -> [(widget, option)]
+        self._live = dict.fromkeys(colors, 0)  # taille après le dernier nettoyage
+
+    def __getitem__(self, role):
+        return self.colors[role]
+
+    def bind(self, widget, **options):
+        widget.configure({option: self.colors[role] for option, role in options.items()})
+        for option, role in options.items():
+            self._subscribe(role, widget, option)
+        return widget
+
+    def watch(self, widget, role, callback):
+        """Appelle `callback(couleur)` tout de suite puis à chaque changement
+        du rôle, tant que `widget` existe."""
+        callback(self.colors[role])
+        self._subscribe(role, widget, callback)
+
+    def _subscribe(self, role, widget, option):
+        subscribers = self._subscribers[role]
+        subscribers.append((widget, option))
+        # Les vues détruites laissent des abonnés morts : on nettoie
+        # quand la liste a doublé depuis le dernier passage
+        if len(subscribers) > 2 * self._live[role] + 64:
+            self._prune(role)
+
+    def set(self, role, color):
+        self.colors[role] = color
+        alive = []
+        for widget, option in self._subscribers[role]:
+            try:
+                if not callable(option):
+                    widget.configure({option: color})
+                elif widget.winfo_exists():
+                    option(color)
+                else:
+                    continue
+            except tk.TclError:  # widget détruit
+                continue
+            alive.append((widget, option))
+        self._subscribers[role] = alive
+        self._live[role] = len(alive)
+
+    def _prune(self, role):
+        alive = [(w, option) for w, option in self._subscribers[role] if w.winfo_exists()]
+        self._subscribers[role] = alive
+        self._live[role] = len(alive)
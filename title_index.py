@@ -0,0 +1,137 @@
+import heapq
+import mmap
+import os
+import threading
+from bisect import bisect_left
+
+from model.search import fold
+
+
+def index_lines(title):
+    """Lignes « clé<TAB>titre » : le titre entier et chaque fin commençant à un mot."""
+    title = " ".join(title.split())
+    words = fold(title).split(" ")
+    return {f"{' '.join(words[i:])}\t{title}" for i in range(len(words)) if words[i]}
+
+
+class TitleIndex:
+    """Index de titres de films pour des suggestions hors ligne, par préfixe.
+
+    Le fichier est trié ligne à ligne et recherché par dichotomie sur un
+    mmap : rien n'est lu au démarrage. Les titres ajoutés restent dans une
+    liste triée en mémoire jusqu'à `save`, qui les fusionne au fichier.
+    """
+
+    def __init__(self, path="film_titles.idx", seed=None):
+        self.path = path
+        self.seed = seed  # titres initiaux si le fichier n'existe pas encore
+        self.pending = []
+        self._map = None
+        self._opened = False
+        self._lock = threading.Lock()
+
+    # ---------- Fichier ----------
+    def _open(self):
+        if self._opened:
+            return
+        self._opened = True
+        if not os.path.exists(self.path):
+            if self.seed is not None:
+                for title in self.seed():
+                    self._add(title)
+            return
+        with open(self.path, "rb") as f:
+            if os.fstat(f.fileno()).st_size:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _lower_bound(self, target):
+        # Invariant : les lignes avant `lo` sont < target, celles dès `hi` >= target
+        m = self._map
+        lo, hi = 0, len(m)
+        while lo < hi:
+            # Première ligne commençant dans [milieu, hi), sinon celle en `lo`
+            half = (lo + hi) // 2
+            mid = m.find(b"\n", half - 1, hi) + 1 if half > lo else lo
+            if mid <= lo or mid >= hi:
+                mid = lo
+            end = m.find(b"\n", mid)
+            if m[mid:end] < target:
+                lo = end + 1
+            else:
+                hi = mid
+        return lo
+
+    def _file_lines(self, prefix):
+        if self._map is None:
+            return
+        target = prefix.encode("utf-8")
+        pos = self._lower_bound(target)
+        while pos < len(self._map):
+            end = self._map.find(b"\n", pos)
+            line = self._map[pos:end]
+            if not line.startswith(target):
+                return
+            yield line.decode("utf-8")
+            pos = end + 1
+
+    def _contains(self, line):
+        i = bisect_left(self.pending, line)
+        if i < len(self.pending) and self.pending[i] == line:
+            return True
+        if self._map is None:
+            return False
+        target = line.encode("utf-8")
+        pos = self._lower_bound(target)
+        return self._map[pos:self._map.find(b"\n", pos)] == target
+
+    # ---------- API ----------
+    def _add(self, title):
+        for line in index_lines(title):
+            if not self._contains(line):
+                self.pending.insert(bisect_left(self.pending, line), line)
+
+    def add(self, *titles):
+        with self._lock:
+            self._open()
+            for title in titles:
+                if title.strip():
+                    self._add(title)
+
+    def search(self, query, limit=20):
+        prefix = fold(query)
+        if not prefix:
+            return []
+        with self._lock:
+            self._open()
+            i = bisect_left(self.pending, prefix)
+            pending = []
+            while i < len(self.pending) and self.pending[i].startswith(prefix):
+                pending.append(self.pending[i])
+                i += 1
+            titles = []
+            for line in heapq.merge(self._file_lines(prefix), pending):
+                title = line.split("\t", 1)[1]
+                if title not in titles:
+                    titles.append(title)
+                    if len(titles) >= limit:
+                        break
+            return titles
+
+    def save(self):
+        with self._lock:
+            if not self.pending:
+                return
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8", newline="\n") as f:
+                for line in heapq.merge(self._file_lines(""), self.pending):
+                    f.write(line + "\n")
+            self.close()
+            os.replace(tmp_path, self.path)
+            self.pending = []
+
+    def close(self):
+        # Ferme le mmap ; il sera rouvert à la prochaine recherche
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._opened = False
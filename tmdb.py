@@ -0,0 +1,146 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+TMDB_API_KEY = os.environ.get("TMDB_API_KEY", "...")  # <-- mets ici ta clé TMDb
+# Modifiable pour tester contre un serveur local
+TMDB_BASE_URL = os.environ.get("TMDB_BASE_URL", "https://api.themoviedb.org/3")
+TMDB_IMAGE_URL = os.environ.get("TMDB_IMAGE_URL", "https://image.tmdb.org/t/p")
+
+
+def normalize_query(query):
+    return " ".join(query.casefold().split())
+
+
+class TTLCache:
+    """Cache LRU dont les entrées expirent après `ttl` secondes."""
+
+    def __init__(self, maxsize=256, ttl=3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+class TmdbClient:
+    """Recherche TMDb : session HTTP partagée, délais d'attente, cache LRU+TTL.
+
+    Les titres trouvés gardent leur id et leur affiche (`movie(titre)`),
+    pour un film ajouté depuis une suggestion.
+    """
+
+    def __init__(self, api_key=TMDB_API_KEY, base_url=TMDB_BASE_URL, language="fr-FR",
+                 timeout=(3.05, 5), workers=2, cache=None):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.language = language
+        self.timeout = timeout
+        self.cache = cache if cache is not None else TTLCache()
+        self.movies = TTLCache(maxsize=1024)  # titre -> (id TMDb, chemin de l'affiche)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tmdb")
+
+    def cached(self, query, language=None):
+        return self.cache.get((normalize_query(query), language or self.language))
+
+    def search(self, query, language=None):
+        """Titres correspondant à `query` ; bloquant, à appeler hors du thread Tk."""
+        language = language or self.language
+        key = (normalize_query(query), language)
+        titles = self.cache.get(key)
+        if titles is not None:
+            return titles
+        params = {"api_key": self.api_key, "query": query, "language": language}
+        try:
+            r = self.session.get(f"{self.base_url}/search/movie", params=params, timeout=self.timeout)
+            if r.status_code != 200:
+                return []
+            results = r.json().get("results", [])
+            titles = [m["title"] for m in results]
+        except (requests.RequestException, ValueError, KeyError):
+            return []
+        for m in results:
+            self.movies.put(m["title"], (m.get("id") or 0, m.get("poster_path") or ""))
+        self.cache.put(key, titles)
+        return titles
+
+    def movie(self, title):
+        """(id TMDb, chemin de l'affiche) d'un titre déjà trouvé, sinon None."""
+        return self.movies.get(title)
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+
+
+class DebouncedSearch:
+    """Lance `search(query)` dans un pool après `delay` ms sans frappe.
+
+    Une nouvelle requête annule celle en attente ; le résultat d'une requête
+    dépassée est ignoré. `on_results` est appelé sur le thread Tk via after().
+    """
+
+    def __init__(self, widget, executor, search, on_results, delay=300, poll=30):
+        self.widget = widget
+        self.executor = executor
+        self.search = search
+        self.on_results = on_results
+        self.delay = delay
+        self.poll = poll
+        self._after_id = None
+        self._future = None
+        widget.bind("<Destroy>", lambda e: self.cancel(), add="+")
+
+    def schedule(self, query):
+        self.cancel()
+        self._after_id = self.widget.after(self.delay, self._start, query)
+
+    def cancel(self):
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+        if self._future is not None:
+            self._future.cancel()
+            self._future = None
+
+    def _start(self, query):
+        self._after_id = None
+        future = self._future = self.executor.submit(self.search, query)
+        self._wait(future)
+
+    def _wait(self, future):
+        self._after_id = None
+        if not future.done():
+            self._after_id = self.widget.after(self.poll, self._wait, future)
+            return
+        self._future = None
+        if not future.cancelled() and future.exception() is None:
+            self.on_results(future.result())
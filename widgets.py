@@ -0,0 +1,273 @@
+import tkinter as tk
+from collections import OrderedDict
+
+
+_EMPTY = object()  # valeur d'une ligne vierge
+
+
+class VirtualList(tk.Frame):
+    """Liste à défilement virtuel : seules les lignes visibles existent.
+
+    Les éléments sont des paires (clé, valeur). Un pool de lignes créées par
+    `make_row(parent)` est recyclé au défilement ; `fill_row(row, key, value)`
+    y affiche un élément. `insert`, `update` et `remove` ne touchent que la
+    ligne concernée (et, pour une suppression, le placement des suivantes).
+    """
+
+    def __init__(self, master, make_row, fill_row, row_height=34, bg="white", **kwargs):
+        super().__init__(master, bg=bg, **kwargs)
+        self.make_row = make_row
+        self.fill_row = fill_row
+        self.row_height = row_height
+        self.keys = []
+        self.values = {}
+        self.top = 0  # décalage en pixels de la première ligne visible
+        self.pool = []
+        self.shown = {}  # clé -> ligne qui l'affiche
+
+        self.scrollbar = tk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.scrollbar.pack(side="right", fill="y")
+        # Les lignes sont placées (place) : la hauteur demandée vient d'ici
+        self.body = tk.Frame(self, bg=bg, height=row_height * 6)
+        self.body.pack(side="left", fill="both", expand=True)
+        self.body.bind("<Configure>", lambda e: self.layout())
+        self._bind_wheel(self.body)
+
+    # ---------- Données ----------
+    def set_items(self, items):
+        self.keys = [key for key, _ in items]
+        self.values = dict(items)
+        self.layout()
+
+    def insert(self, key, value):
+        self.keys.append(key)
+        self.values[key] = value
+        if self._is_visible(len(self.keys) - 1):
+            self.layout()
+        else:
+            self._update_scrollbar()
+
+    def update(self, key, value):
+        self.values[key] = value
+        row = self.shown.get(key)
+        if row is not None and row.value != value:
+            row.value = value
+            self.fill_row(row, key, value)
+
+    def refill(self, key):
+        """Réaffiche l'élément `key` s'il est visible, quand ce que montre
+        `fill_row` dépend d'autre chose que sa valeur."""
+        row = self.shown.get(key)
+        if row is not None:
+            self.fill_row(row, key, self.values[key])
+
+    def remove(self, key):
+        index = self.keys.index(key)
+        del self.keys[index]
+        del self.values[key]
+        if index <= self._last_visible():
+            self.layout()
+        else:
+            self._update_scrollbar()
+
+    # ---------- Défilement ----------
+    def see(self, key):
+        """Fait défiler jusqu'à l'élément `key` s'il n'est pas entièrement visible."""
+        y = self.keys.index(key) * self.row_height
+        if y < self.top or y + self.row_height > self.top + self._height():
+            self.top = y
+            self.layout()
+
+    def yview(self, *args):
+        height = self.body.winfo_height()
+        if args[0] == "moveto":
+            self.top = int(float(args[1]) * len(self.keys) * self.row_height)
+        elif args[0] == "scroll":
+            step = height if args[2] == "pages" else self.row_height
+            self.top += int(args[1]) * step
+        self.layout()
+
+    def _on_wheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self.yview("scroll", -1, "units")
+        else:
+            self.yview("scroll", 1, "units")
+        return "break"
+
+    def _bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", self._on_wheel)
+        widget.bind("<Button-4>", self._on_wheel)
+        widget.bind("<Button-5>", self._on_wheel)
+        for child in widget.winfo_children():
+            self._bind_wheel(child)
+
+    # ---------- Placement ----------
+    def _height(self):
+        return max(self.body.winfo_height(), self.row_height)
+
+    def _last_visible(self):
+        return (self.top + self._height()) // self.row_height
+
+    def _is_visible(self, index):
+        return self.top // self.row_height <= index <= self._last_visible()
+
+    def _update_scrollbar(self):
+        height = self._height()
+        total = len(self.keys) * self.row_height
+        if total > height:
+            self.scrollbar.set(self.top / total, (self.top + height) / total)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def _new_row(self):
+        row = self.make_row(self.body)
+        row.key = row.y = None
+        row.value = _EMPTY
+        self._bind_wheel(row)
+        self.pool.append(row)
+        return row
+
+    def layout(self):
+        height = self._height()
+        total = len(self.keys) * self.row_height
+        self.top = max(0, min(self.top, total - height))
+        first, shift = divmod(self.top, self.row_height)
+        wanted = self.keys[first:first + height // self.row_height + 2]
+        wanted_keys = set(wanted)
+
+        # Une ligne garde sa clé tant qu'elle reste visible ; seules les
+        # lignes libérées sont réaffectées, et seules les valeurs changées
+        # sont réécrites
+        free = [row for row in self.pool if row.key not in wanted_keys]
+        shown = {}
+        for k, key in enumerate(wanted):
+            row = self.shown.get(key)
+            if row is None:
+                row = free.pop() if free else self._new_row()
+                row.key = key
+                row.value = _EMPTY
+            value = self.values[key]
+            if row.value != value:
+                row.value = value
+                self.fill_row(row, key, value)
+            y = k * self.row_height - shift
+            if row.y != y:
+                row.y = y
+                row.place(x=0, y=y, relwidth=1, height=self.row_height)
+            shown[key] = row
+        for row in free:
+            if row.y is not None:
+                row.place_forget()
+            row.key = row.y = None
+            row.value = _EMPTY
+        self.shown = shown
+        self._update_scrollbar()
+
+
+def count_widgets(widget):
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+
+class ViewCache:
+    """Écrans construits gardés en vie et échangés par pack_forget/pack.
+
+    `show(name, build, deps)` réaffiche la vue `name` si elle existe, sinon
+    la construit avec `build(frame)`, qui renvoie sa fonction de
+    rafraîchissement. Celle-ci n'est appelée que si l'une des listes `deps`
+    a changé (`version(store)`) depuis que la vue a été construite ou
+    rafraîchie ; une vue cachée n'est pas réputée à jour. Une modification
+    que la vue affichée applique elle-même est signalée par `mark_fresh`,
+    pour ne pas la rafraîchir à son retour. Les vues
+    les moins récemment affichées sont détruites au-delà de `max_views`
+    vues ou de `max_widgets` widgets au total.
+    """
+
+    def __init__(self, master, version, max_views=6, max_widgets=5000):
+        self.master = master
+        self.version = version
+        self.max_views = max_views
+        self.max_widgets = max_widgets
+        self.views = OrderedDict()  # nom -> _View, de la plus ancienne à la plus récente
+        self.current = None
+
+    def _stamp(self, deps):
+        return tuple(self.version(store) for store in deps)
+
+    def show(self, name, build, deps=()):
+        view = self.views.get(name)
+        if self.current is not None and self.current is not view:
+            self.current.frame.pack_forget()
+        if view is None:
+            frame = tk.Frame(self.master, bg=self.master.cget("bg"))
+            view = _View(frame, deps, self._stamp(deps))
+            view.refresh = build(frame)
+            view.widgets = count_widgets(frame)
+            self.views[name] = view
+        else:
+            self.views.move_to_end(name)
+            stamp = self._stamp(deps)
+            if stamp != view.stamp:
+                view.stamp = stamp
+                if view.refresh is not None:
+                    view.refresh()
+        view.frame.pack(fill="both", expand=True)
+        self.current = view
+        self._evict()
+        return view.frame
+
+    def refresh(self):
+        """Rafraîchit la vue affichée si l'une de ses listes a changé sans
+        qu'elle le montre (modifications faites en lot)."""
+        view = self.current
+        if view is None:
+            return
+        stamp = self._stamp(view.deps)
+        if stamp != view.stamp:
+            view.stamp = stamp
+            if view.refresh is not None:
+                view.refresh()
+
+    def mark_fresh(self, *stores):
+        """La vue affichée montre déjà la dernière modification de `stores`
+        (appliquée sur place) : son relevé avance sans rafraîchissement. Une
+        vue déjà en retard d'une autre modification le reste."""
+        view = self.current
+        if view is None:
+            return
+        stamp = list(view.stamp)
+        for store in stores:
+            if store in view.deps:
+                i = view.deps.index(store)
+                version = self.version(store)
+                if stamp[i] == version - 1:
+                    stamp[i] = version
+        view.stamp = tuple(stamp)
+
+    def _evict(self):
+        total = sum(view.widgets for view in self.views.values())
+        for name in list(self.views):
+            if len(self.views) <= self.max_views and total <= self.max_widgets:
+                break
+            view = self.views[name]
+            if view is self.current:
+                continue
+            total -= view.widgets
+            del self.views[name]
+            view.frame.destroy()
+
+    def clear(self):
+        for view in self.views.values():
+            view.frame.destroy()
+        self.views.clear()
+        self.current = None
+
+
+class _View:
+    __slots__ = ("frame", "deps", "stamp", "refresh", "widgets")
+
+    def __init__(self, frame, deps, stamp):
+        self.frame = frame
+        self.deps = deps
+        self.stamp = stamp
+        self.refresh = None
+        self.widgets = 0